@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Binary Converter Benchmark
+Original prepend-a-digit loop vs. to_binary() and to_binary_batch()
+
+Three cases: 64-bit and 4096-bit scalars, and a batch of --elements
+random 64-bit integers written as 64-digit records into one preallocated
+buffer.  The original loop is quadratic and takes minutes on the full
+batch, so it runs on the first --legacy-elements values and its time per
+element is reported.
+
+Usage: python benchmarks/bench_binary_converter.py [--elements 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from array import array
+
+try:
+    import numpy
+except ImportError:  # The NumPy case is skipped without it
+    numpy = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from binary_converter import to_binary, to_binary_batch
+
+
+def legacy_convert_to_binary(num):
+    """The original implementation from tests/test_TestA.py"""
+    binary = ""
+    while num > 0:
+        binary = str(num % 2) + binary
+        num = num // 2
+    return binary
+
+
+def per_element_ns(func, numbers):
+    """Return nanoseconds per element for func(numbers)"""
+    start = time.perf_counter_ns()
+    func(numbers)
+    return (time.perf_counter_ns() - start) / len(numbers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--elements', type=int, default=1_000_000)
+    parser.add_argument('--legacy-elements', type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    scalars = {
+        '64-bit': [rng.getrandbits(64) | 1 << 63 for _ in range(20_000)],
+        '4096-bit': [rng.getrandbits(4096) | 1 << 4095 for _ in range(200)],
+    }
+    print(f"{'case':>26} {'legacy ns':>12} {'new ns':>10} {'speedup':>9}")
+    for name, numbers in scalars.items():
+        legacy = per_element_ns(lambda values: [legacy_convert_to_binary(v) for v in values],
+                                numbers)
+        new = per_element_ns(lambda values: [to_binary(v) for v in values], numbers)
+        print(f"{name + ' scalar':>26} {legacy:>12,.0f} {new:>10,.0f} {legacy / new:>8.0f}x")
+
+    batch = array('Q', (rng.getrandbits(64) for _ in range(args.elements)))
+    out = bytearray(len(batch) * 64)
+    legacy = per_element_ns(
+        lambda values: b''.join(legacy_convert_to_binary(v).zfill(64).encode() for v in values),
+        batch[:args.legacy_elements])
+    modes = [('to_binary loop', lambda values: b''.join(to_binary(v, 64).encode()
+                                                        for v in values)),
+             ('to_binary_batch', lambda values: to_binary_batch(values, 64, out))]
+    if numpy is not None:
+        values = numpy.frombuffer(batch, dtype='u8')
+        modes.append(('numpy batch', lambda _: to_binary_batch(values, 64, out)))
+    for name, func in modes:
+        new = per_element_ns(func, batch)
+        print(f"{f'{len(batch):,} {name}':>26} {legacy:>12,.0f} {new:>10,.0f}"
+              f" {legacy / new:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
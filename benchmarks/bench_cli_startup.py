@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+Cold start per cli.py subcommand, with an -X importtime breakdown
+
+Every command runs --runs times in a fresh interpreter and the median wall
+time is reported, next to the import time -X importtime measures for one
+more run, the number of modules imported and the slowest top-level
+import.  The first rows are references: a bare interpreter, and the
+imports each tool paid before cli.py (every recipe index module, and
+app.py with Flask for excuses).  Excuse and catalog commands are timed
+against SQLite and the catalog file, and against a snapshot of them.
+Commands take turns, so drift in machine speed affects them alike.
+Sources are precompiled first, so .pyc loading is what gets measured even
+with PYTHONDONTWRITEBYTECODE set.
+
+Usage: python benchmarks/bench_cli_startup.py [--runs 20] [--catalog-size 2000]
+"""
+
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+EXCUSE_DIR = os.path.join(SRC, 'ExcuseGenerator')
+CLI = os.path.join(SRC, 'cli.py')
+
+sys.path.insert(0, SRC)
+
+from recipe_catalog import write_jsonl_catalog
+from synthetic_catalog import make_catalog
+
+# What `python chocolate_cake_recipes.py` imported before its indexes became lazy
+EAGER_RECIPES = ("import ingredient_store, recipe_catalog, recipe_index, recipe_render,"
+                 " recipe_search, recipe_similarity, shopping_list, chocolate_cake_recipes")
+
+
+def import_report(stderr):
+    """Return (total ms, modules, slowest top-level import) from -X importtime output"""
+    total = 0
+    modules = 0
+    slowest = (0, '')
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules += 1
+        if not name.startswith('  '):
+            total += int(cumulative)
+            slowest = max(slowest, (int(cumulative), name.strip()))
+    return total / 1000, modules, slowest[1]
+
+
+def import_profile(argv, env, stdin):
+    """Run a command once under -X importtime and return import_report() of it"""
+    traced = subprocess.run([argv[0], '-X', 'importtime', *argv[1:]], input=stdin, env=env,
+                            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return import_report(traced.stderr.decode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--catalog-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    compileall.compile_dir(SRC, quiet=1, maxlevels=1)
+    python = sys.executable
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = os.path.join(tmp, 'catalog.jsonl')
+        write_jsonl_catalog(catalog, make_catalog(args.catalog_size))
+        database = os.path.join(tmp, 'excuses.db')
+        base = dict(os.environ, EXCUSE_DB=database, PYTHONPATH=f"{SRC}{os.pathsep}{EXCUSE_DIR}",
+                    TOOLS_SNAPSHOT=os.path.join(tmp, 'missing.snapshot'))
+        snapshot = dict(base, TOOLS_SNAPSHOT=os.path.join(tmp, 'tools.snapshot'))
+        # Seed the database and write the snapshot so no timed run pays for either
+        subprocess.run([python, CLI, 'snapshot', '--catalog', catalog], env=snapshot, check=True,
+                       stdout=subprocess.DEVNULL)
+
+        cases = [
+            ("python -c pass", [python, '-c', 'pass'], base, None),
+            ("before: recipe modules", [python, '-c', EAGER_RECIPES], base, None),
+            ("before: import app (Flask)", [python, '-c', 'import app'], base, None),
+            ("recipes show KEY", [python, CLI, 'recipes', 'show', 'classic_chocolate'], base, None),
+            ("recipes show NUMBER", [python, CLI, 'recipes', 'show', '1'], base, None),
+            ("recipes search", [python, CLI, 'recipes', 'search', 'vanilla'], base, None),
+            ("temperature --from C --to F", [python, CLI, 'temperature', '--from', 'C', '--to', 'F'],
+             base, b'100\n'),
+            ("excuses random", [python, CLI, 'excuses', 'random'], base, None),
+            ("excuses random (snapshot)", [python, CLI, 'excuses', 'random'], snapshot, None),
+            ("recipes --catalog show", [python, CLI, 'recipes', '--catalog', catalog, 'show', '1'],
+             base, None),
+            ("recipes --catalog show (snapshot)",
+             [python, CLI, 'recipes', '--catalog', catalog, 'show', '1'], snapshot, None),
+        ]
+        # Round-robin, so drift in machine speed affects every command alike
+        times = [[] for _ in cases]
+        for _ in range(args.runs):
+            for case_times, (_, argv, env, stdin) in zip(times, cases):
+                start = time.perf_counter()
+                subprocess.run(argv, input=stdin, env=env, check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                case_times.append(time.perf_counter() - start)
+
+        print(f"{'command':<36} {'median ms':>9} {'import ms':>9} {'modules':>7}  slowest import")
+        for case_times, (label, argv, env, stdin) in zip(times, cases):
+            imports, modules, slowest = import_profile(argv, env, stdin)
+            print(f"{label:<36} {statistics.median(case_times) * 1000:>9.1f} {imports:>9.1f} "
+                  f"{modules:>7}  {slowest}")
+
+if __name__ == "__main__":
+    main()
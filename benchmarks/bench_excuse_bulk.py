@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Excuse Bulk Endpoint Benchmark
+Per-excuse cost of the single-item routes vs. /api/excuses/sample and /api/add-excuses
+
+Requests go through the Flask test client against a temporary SQLite file,
+so the numbers include routing, JSON and commits but not the network;
+over a real connection the single-item routes also pay a round-trip each.
+
+Usage: python benchmarks/bench_excuse_bulk.py [--items 10 100 1000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+
+def per_item_us(func, items):
+    """Return microseconds per item for one call of func()"""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) / items * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, nargs='+', default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        import app as excuse_app
+        excuse_app.set_store(excuse_app.open_store(os.path.join(tmp, 'excuses.db')))
+        client = excuse_app.app.test_client()
+
+        print(f"{'items':>6} {'GET each us':>12} {'sample us':>10} {'speedup':>8}"
+              f" {'POST each us':>13} {'bulk us':>8} {'speedup':>8}")
+        for items in args.items:
+            def get_each():
+                for _ in range(items):
+                    client.get('/api/random-excuse')
+
+            def get_bulk():
+                client.get(f'/api/excuses/sample?n={items}')
+
+            def post_each():
+                for number in range(items):
+                    client.post('/api/add-excuse',
+                                json={'category': 'single', 'excuse': f'Excuse {number}.'})
+
+            def post_bulk():
+                client.post('/api/add-excuses',
+                            json=[{'category': 'bulk', 'excuse': f'Excuse {number}.'}
+                                  for number in range(items)])
+
+            get_single, get_many = per_item_us(get_each, items), per_item_us(get_bulk, items)
+            post_single, post_many = per_item_us(post_each, items), per_item_us(post_bulk, items)
+            print(f"{items:>6} {get_single:>12.1f} {get_many:>10.1f} {get_single / get_many:>7.1f}x"
+                  f" {post_single:>13.1f} {post_many:>8.1f} {post_single / post_many:>7.1f}x")
+        excuse_app.set_store(None).close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Excuse Durability Benchmark
+Group-commit write throughput and cold start of a large excuse log
+
+Writes: threads call ExcuseStore.add() concurrently; every commit is
+fsynced, so writes per commit shows how much group commit saves.
+Cold start: opening a store over an N-excuse log by replaying every row
+vs. loading the compacted snapshot row.
+
+Usage: python benchmarks/bench_excuse_durability.py [--excuses 1000000] [--writes 2000]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+from excuse_store import ExcuseStore
+
+
+def timed_open(path, **options):
+    """Return (seconds to open a store, excuses loaded)"""
+    start = time.perf_counter()
+    store = ExcuseStore(path, **options)
+    elapsed = time.perf_counter() - start
+    size = len(store.snapshot())
+    store.close()
+    return elapsed, size
+
+
+def write_throughput(path, threads, writes):
+    """Return (writes per second, writes per commit) for concurrent add() calls"""
+    store = ExcuseStore(path)
+    per_thread = writes // threads
+    commits = store.commits
+
+    def write(number):
+        for index in range(per_thread):
+            store.add(f"thread_{number}", f"Excuse {index} from thread {number}.")
+
+    workers = [threading.Thread(target=write, args=(number,)) for number in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    total = per_thread * threads
+    commits = store.commits - commits
+    store.close()
+    return total / elapsed, total / commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--excuses', type=int, default=1_000_000)
+    parser.add_argument('--writes', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'excuses.db')
+        store = ExcuseStore(path, compact_every=0)
+        for start in range(0, args.excuses, 100_000):
+            store.add_many((f"category_{index % 200}", f"Excuse number {index}.")
+                           for index in range(start, min(start + 100_000, args.excuses)))
+        store.close()
+
+        print(f"{'threads':>8} {'writes/s':>10} {'writes/commit':>14}")
+        for threads in (1, 4, 16, 64):
+            rate, grouped = write_throughput(path, threads, args.writes)
+            print(f"{threads:>8} {rate:>10,.0f} {grouped:>14.1f}")
+
+        # Writers above may have compacted; drop that to time a full replay
+        connection = sqlite3.connect(path)
+        connection.execute("DELETE FROM snapshot")
+        connection.commit()
+        connection.close()
+        replay, size = timed_open(path, compact_every=0)
+        store = ExcuseStore(path, compact_every=0)
+        store.compact()
+        store.close()
+        loaded, _ = timed_open(path)
+        print(f"\ncold start with {size:,} excuses")
+        print(f"{'replay every row':>22} {replay:>8.2f}s")
+        print(f"{'compacted snapshot':>22} {loaded:>8.2f}s ({replay / loaded:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Excuse Memory Stress Test
+RSS while POST /api/add-excuse is hammered, with and without memory budgets
+
+Each mode runs in its own process so RSS readings are independent.  Every
+request adds a new excuse of about --length characters to one of
+--categories categories (every tenth repeats a recent one, which is
+deduplicated) and then fetches /api/random-excuse, all through the ASGI
+app against a temporary SQLite file.  The budgeted store evicts the least
+recently served excuses once it reaches --budget-mb; the unbounded one
+keeps everything.
+
+Usage: python benchmarks/bench_excuse_memory.py [--requests 200000] [--budget-mb 8]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+SAMPLES = 10
+
+
+def hammer(args):
+    """Run one mode in this process and print a row per sample"""
+    with tempfile.TemporaryDirectory() as tmp:
+        import app as excuse_app
+        import asgi
+        import excuse_metrics
+        from excuse_store import ExcuseStore
+
+        budget = args.budget_mb * 1024 * 1024 if args.mode == 'budget' else None
+        store = ExcuseStore(os.path.join(tmp, 'stress.db'), seed=excuse_app.EXCUSES,
+                            max_bytes=budget, category_max_bytes=budget and budget // 4)
+        excuse_app.set_store(store)
+        padding = 'x' * max(args.length - 30, 0)
+        sent = []
+
+        async def receive_body(body):
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                sent.append(message['status'])
+
+        async def request(method, path, body=b''):
+            scope = {'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+                     'headers': [(b'content-type', b'application/json')]}
+            await asgi.app(scope, lambda: receive_body(body), send)
+
+        async def run():
+            start = time.perf_counter()
+            step = args.requests // SAMPLES
+            for number in range(args.requests):
+                excuse = number - 5 if number % 10 == 9 else number
+                body = json.dumps({'category': f'category_{excuse % args.categories}',
+                                   'excuse': f'Excuse number {excuse} {padding}'})
+                await request('POST', '/api/add-excuse', body.encode('utf-8'))
+                await request('GET', '/api/random-excuse')
+                if (number + 1) % step == 0:
+                    usage = store.memory_usage()
+                    rss = excuse_metrics.rss_bytes() or 0
+                    rate = (number + 1) / (time.perf_counter() - start)
+                    print(f"{args.mode:>9} {number + 1:>9} {rss / 2**20:>8.1f} "
+                          f"{usage['bytes'] / 2**20:>8.1f} {usage['excuses']:>8} "
+                          f"{usage['evicted']:>8} {usage['duplicates']:>6} {rate:>7.0f}",
+                          flush=True)
+
+        asyncio.run(run())
+        assert set(sent) == {200}, set(sent)
+        excuse_app.set_store(None).close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200_000)
+    parser.add_argument('--budget-mb', type=int, default=8)
+    parser.add_argument('--categories', type=int, default=16)
+    parser.add_argument('--length', type=int, default=120, help="characters per excuse")
+    parser.add_argument('--modes', nargs='+', choices=['budget', 'unbounded'],
+                        default=['budget', 'unbounded'])
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        hammer(args)
+        return
+
+    print(f"{'mode':>9} {'requests':>9} {'RSS MB':>8} {'pool MB':>8} {'excuses':>8} "
+          f"{'evicted':>8} {'dups':>6} {'req/s':>7}", flush=True)
+    for mode in args.modes:
+        subprocess.run([sys.executable, __file__, '--mode', mode,
+                        '--requests', str(args.requests), '--budget-mb', str(args.budget_mb),
+                        '--categories', str(args.categories), '--length', str(args.length)],
+                       check=True)
+
+
+if __name__ == "__main__":
+    main()
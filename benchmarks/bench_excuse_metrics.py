@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Excuse Metrics Overhead Benchmark
+Per-request cost of the latency histograms and counters in excuse_metrics
+
+Times METRICS.record() on its own, then the same requests through the
+ASGI app with and without its instrumentation (asgi.app vs. the bare
+dispatcher) and through the Flask test client with and without the
+before/after request hooks.  Each mode runs --rounds times, alternating,
+and the fastest round counts.
+
+Usage: python benchmarks/bench_excuse_metrics.py [--requests 20000] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+PATH = '/api/random-excuse'
+
+
+def record_ns(metrics, calls):
+    """Nanoseconds per METRICS.record() call"""
+    start = time.perf_counter_ns()
+    for number in range(calls):
+        metrics.record(PATH, 200, number * 37 % 5_000_000)
+    return (time.perf_counter_ns() - start) / calls
+
+
+def asgi_us(handler, requests):
+    """Microseconds per request driving an ASGI callable in one event loop"""
+    scope = {'type': 'http', 'method': 'GET', 'path': PATH, 'query_string': b'',
+             'headers': []}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    async def run():
+        start = time.perf_counter_ns()
+        for _ in range(requests):
+            await handler(scope, receive, send)
+        return time.perf_counter_ns() - start
+
+    return asyncio.run(run()) / requests / 1000
+
+
+def flask_us(client, requests):
+    """Microseconds per request through the Flask test client"""
+    start = time.perf_counter_ns()
+    for _ in range(requests):
+        client.get(PATH)
+    return (time.perf_counter_ns() - start) / requests / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        import app as excuse_app
+        import asgi
+        excuse_app.set_store(excuse_app.open_store(os.path.join(tmp, 'excuses.db')))
+        from excuse_metrics import RequestMetrics
+
+        best = min(record_ns(RequestMetrics(), args.requests * 10) for _ in range(args.rounds))
+        print(f"METRICS.record(): {best:.0f} ns/call")
+
+        async def bare(scope, receive, send):
+            await asgi._dispatch(scope, receive, send)
+
+        flask = excuse_app.app
+        client = flask.test_client()
+        hooks = (flask.before_request_funcs.setdefault(None, []),
+                 flask.after_request_funcs.setdefault(None, []))
+        installed = [list(funcs) for funcs in hooks]
+
+        def flask_bare(requests):
+            for funcs in hooks:
+                funcs.clear()
+            try:
+                return flask_us(client, requests)
+            finally:
+                for funcs, saved in zip(hooks, installed):
+                    funcs[:] = saved
+
+        timings = {'asgi': ([], []), 'flask': ([], [])}
+        for _ in range(args.rounds):
+            timings['asgi'][0].append(asgi_us(bare, args.requests))
+            timings['asgi'][1].append(asgi_us(asgi.app, args.requests))
+            timings['flask'][0].append(flask_bare(args.requests // 10))
+            timings['flask'][1].append(flask_us(client, args.requests // 10))
+
+        print(f"{'server':>7} {'bare us':>9} {'metrics us':>11} {'overhead us':>12}")
+        for server, (bare_times, measured_times) in timings.items():
+            bare_us, measured_us = min(bare_times), min(measured_times)
+            print(f"{server:>7} {bare_us:>9.2f} {measured_us:>11.2f} {measured_us - bare_us:>12.2f}")
+        excuse_app.set_store(None).close()
+
+
+if __name__ == "__main__":
+    main()
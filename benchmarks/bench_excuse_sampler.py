@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Excuse Sampler Benchmark
+Compare the original list-building random pick against ExcuseSampler
+
+Usage: python benchmarks/bench_excuse_sampler.py [--categories 10 1000 10000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+from excuse_sampler import ExcuseSampler
+
+
+def original_random_excuse(excuses):
+    """The original random_excuse body, minus the JSON response"""
+    category = random.choice(list(excuses.keys()))
+    return category, random.choice(excuses[category])
+
+
+def picks_per_second(func, picks):
+    """Return how many calls of func() run per second"""
+    start = time.perf_counter()
+    for _ in range(picks):
+        func()
+    return picks / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--categories', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--excuses', type=int, default=20, help="excuses per category")
+    parser.add_argument('--picks', type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{'categories':>10} {'original/s':>12} {'by size/s':>12} {'weighted/s':>12}"
+          f" {'add/s':>10}")
+    for count in args.categories:
+        excuses = {f"category_{number}": [f"excuse {number}.{index}"
+                                          for index in range(args.excuses)]
+                   for number in range(count)}
+        by_size = ExcuseSampler(excuses)
+        weighted = ExcuseSampler(excuses, weights={"category_0": 5.0})
+
+        original = picks_per_second(lambda: original_random_excuse(excuses), args.picks)
+        sized = picks_per_second(by_size.sample, args.picks)
+        alias = picks_per_second(weighted.sample, args.picks)
+        adds = picks_per_second(lambda: weighted.add("category_0", "another"), args.picks)
+        print(f"{count:>10} {original:>12,.0f} {sized:>12,.0f} {alias:>12,.0f} {adds:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Ingredient Store Benchmark
+Compare memory and build time of a dict per parsed ingredient vs IngredientStore
+
+Usage: python benchmarks/bench_ingredient_store.py [--ingredients 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ingredient_store import IngredientStore, parse_ingredient
+from synthetic_catalog import make_catalog
+
+
+def dict_per_ingredient(recipes):
+    """The naive layout: one parsed dict per ingredient"""
+    parsed = {}
+    for key, recipe in recipes.items():
+        parsed[key] = [parse_ingredient(text)._asdict() for text in recipe['ingredients']]
+    return parsed
+
+
+def measure(build, recipes):
+    """Return (result, seconds, bytes allocated) for build(recipes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(recipes)
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ingredients', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # Recipes average 11 ingredients
+    recipes = make_catalog(args.ingredients // 11)
+    rows = sum(len(recipe['ingredients']) for recipe in recipes.values())
+    print(f"{len(recipes)} recipes, {rows} ingredients")
+
+    print(f"{'layout':>22} {'build s':>8} {'MB':>8} {'bytes/row':>10}")
+    for label, build in [("dict per ingredient", dict_per_ingredient),
+                         ("IngredientStore", IngredientStore)]:
+        result, elapsed, allocated = measure(build, recipes)
+        print(f"{label:>22} {elapsed:>8.2f} {allocated / 2**20:>8.1f} "
+              f"{allocated / rows:>10.1f}")
+        del result
+
+
+if __name__ == "__main__":
+    main()
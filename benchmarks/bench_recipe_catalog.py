@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Recipe Catalog Benchmark
+Measure open time, single-recipe lookup and peak RSS for catalog files
+
+Each measurement runs in a fresh interpreter so RSS reflects only opening
+the catalog and fetching one recipe by number and one by key.
+
+Usage: python benchmarks/bench_recipe_catalog.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+from recipe_catalog import open_catalog, write_binary_catalog, write_jsonl_catalog
+from synthetic_catalog import iter_catalog
+
+
+def peak_rss_kb():
+    """Peak RSS of this process in KiB
+
+    /proc's VmHWM is reset by exec, unlike ru_maxrss on Linux, which would
+    still include the forked benchmark parent.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def probe(path):
+    """Child process: open a catalog, fetch two recipes, report JSON stats"""
+    start = time.perf_counter()
+    catalog = open_catalog(path)
+    opened = time.perf_counter() - start
+
+    middle = len(catalog) // 2
+    start = time.perf_counter()
+    key = catalog.key_at(middle)
+    by_number = time.perf_counter() - start
+    start = time.perf_counter()
+    catalog[key]
+    by_key = time.perf_counter() - start
+
+    print(json.dumps({'open': opened, 'number': by_number, 'key': by_key,
+                      'rss_kb': peak_rss_kb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--probe', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.probe:
+        probe(args.probe)
+        return
+
+    print(f"{'recipes':>10} {'format':>6} {'file MB':>8} {'open ms':>9} "
+          f"{'by number us':>13} {'by key us':>10} {'RSS MB':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            for label, writer in [("jsonl", write_jsonl_catalog),
+                                  ("rcat", write_binary_catalog)]:
+                path = os.path.join(tmp, f"catalog.{label}")
+                writer(path, iter_catalog(size))
+                output = subprocess.run([sys.executable, __file__, '--probe', path],
+                                        check=True, capture_output=True, text=True).stdout
+                stats = json.loads(output)
+                print(f"{size:>10} {label:>6} {os.path.getsize(path) / 2**20:>8.1f} "
+                      f"{stats['open'] * 1000:>9.2f} {stats['number'] * 1e6:>13.1f} "
+                      f"{stats['key'] * 1e6:>10.1f} {stats['rss_kb'] / 1024:>7.1f}")
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
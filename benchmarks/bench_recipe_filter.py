@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Recipe Range Filter Benchmark
+Time and servings filters: re-parsing every recipe per query vs. RecipeRangeIndex
+
+The baseline keeps only each recipe's raw prep_time, bake_time and
+servings and parses them on every query, as filtering the catalog dicts
+directly would.  Keyword queries intersect RecipeIndex results with the
+range filters, as find_recipes() does.
+
+Usage: python benchmarks/bench_recipe_filter.py [--sizes 100000 1000000] [--no-keyword]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from recipe_index import RecipeIndex, RecipeRangeIndex, parse_minutes, parse_servings
+from synthetic_catalog import iter_catalog
+
+QUERIES = [
+    ("total <= 32", None, {'total': (None, 32)}),
+    ("total <= 45", None, {'total': (None, 45)}),
+    ("bake 25-35", None, {'bake': (25, 35)}),
+    ("servings >= 10", None, {'servings': (10, None)}),
+    ("total <= 50, serves 14+", None, {'total': (None, 50), 'servings': (14, None)}),
+    ("prep 10-15, bake <= 25", None, {'prep': (10, 15), 'bake': (None, 25)}),
+    ("'pecans' + total <= 40", "pecans", {'total': (None, 40)}),
+]
+
+
+def reparse(raw, keyword_keys, filters):
+    """Filter by parsing every recipe's fields again"""
+    matches = []
+    for key, prep_time, bake_time, servings in raw:
+        if keyword_keys is not None and key not in keyword_keys:
+            continue
+        prep, bake = parse_minutes(prep_time), parse_minutes(bake_time)
+        ranges = {'prep': prep, 'bake': bake, 'servings': parse_servings(servings),
+                  'total': (prep[0] + bake[0], prep[1] + bake[1])}
+        if all((low is None or ranges[field][0] >= low)
+               and (high is None or ranges[field][1] <= high)
+               for field, (low, high) in filters.items()):
+            matches.append(key)
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--no-keyword', action='store_true',
+                        help="skip building the keyword index and its query")
+    args = parser.parse_args()
+
+    print(f"{'recipes':>9} {'query':>26} {'matches':>8} {'reparse ms':>11} "
+          f"{'index ms':>9} {'speedup':>8}")
+    for size in args.sizes:
+        raw = []
+        ranges = RecipeRangeIndex()
+        keywords = None if args.no_keyword else RecipeIndex()
+
+        def pairs():
+            for key, recipe in iter_catalog(size):
+                raw.append((key, recipe['prep_time'], recipe['bake_time'], recipe['servings']))
+                if keywords is not None:
+                    keywords.add(key, recipe)
+                yield key, recipe
+
+        start = time.perf_counter()
+        ranges.extend(pairs())
+        label = '(build)' if keywords is None else '(build + keyword index)'
+        print(f"{size:>9} {label:>26} {'':>8} {'':>11} "
+              f"{(time.perf_counter() - start) * 1000:>9.0f}")
+
+        for label, keyword, filters in QUERIES:
+            if keyword is not None and keywords is None:
+                continue
+            start = time.perf_counter()
+            keyword_keys = None
+            if keyword is not None:
+                keyword_keys = {key for key, _ in keywords.search(keyword)}
+            expected = reparse(raw, keyword_keys, filters)
+            baseline = time.perf_counter() - start
+
+            start = time.perf_counter()
+            keys = None
+            if keyword is not None:
+                keys = [key for key, _ in keywords.search(keyword)]
+            matches = ranges.query(filters, keys)
+            indexed = time.perf_counter() - start
+            assert [key for key, _ in matches] == expected, label
+            print(f"{size:>9} {label:>26} {len(matches):>8} {baseline * 1000:>11.0f} "
+                  f"{indexed * 1000:>9.1f} {baseline / indexed:>7.0f}x")
+        del raw, ranges, keywords
+
+
+if __name__ == "__main__":
+    main()
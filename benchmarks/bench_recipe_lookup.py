@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Recipe Lookup Benchmark
+Compare per-call list(keys) lookup by number against OrderedKeyIndex
+
+Usage: python benchmarks/bench_recipe_lookup.py [--sizes 1000 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from recipe_index import OrderedKeyIndex
+from synthetic_catalog import make_catalog
+
+
+def list_lookup(recipes, recipe_number):
+    """The original get_recipe_by_number: rebuild the key list per call"""
+    recipe_keys = list(recipes.keys())
+    if 1 <= recipe_number <= len(recipe_keys):
+        return recipe_keys[recipe_number - 1]
+    return None
+
+
+def index_lookup(order, recipe_number):
+    """get_recipe_by_number over an OrderedKeyIndex"""
+    if 1 <= recipe_number <= len(order):
+        return order.key_at(recipe_number - 1)
+    return None
+
+
+def per_call(func, numbers):
+    """Return the mean seconds per call of func over numbers"""
+    start = time.perf_counter()
+    for number in numbers:
+        func(number)
+    return (time.perf_counter() - start) / len(numbers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1_000, 10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'recipes':>10} {'list(keys) us':>14} {'index us':>9}")
+    for size in args.sizes:
+        recipes = make_catalog(size)
+        order = OrderedKeyIndex(recipes)
+        numbers = [rng.randint(1, size) for _ in range(10_000)]
+        for number in numbers[:100]:
+            assert list_lookup(recipes, number) == index_lookup(order, number)
+
+        # The list rebuild is slow, so time it on fewer calls
+        slow = per_call(lambda n: list_lookup(recipes, n), numbers[:max(10, 100_000 // size)])
+        fast = per_call(lambda n: index_lookup(order, n), numbers)
+        print(f"{size:>10} {slow * 1e6:>14.2f} {fast * 1e6:>9.3f}")
+        del recipes, order
+
+
+if __name__ == "__main__":
+    main()
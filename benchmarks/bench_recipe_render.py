@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Recipe Render Benchmark
+Compare print-per-line output against RecipeRenderer when dumping a catalog
+
+Usage: python benchmarks/bench_recipe_render.py [--recipes 100000]
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from recipe_render import RecipeRenderer
+from synthetic_catalog import make_catalog
+
+
+def print_recipe(recipe):
+    """The original display_recipe body: one print call per line"""
+    print(f"\n{'='*60}")
+    print(f"🍰 {recipe['name']} 🍰")
+    print(f"{'='*60}")
+    print(f"Servings: {recipe['servings']}")
+    print(f"Prep Time: {recipe['prep_time']}")
+    print(f"Bake Time: {recipe['bake_time']}")
+    print(f"\n📋 INGREDIENTS:")
+    print("-" * 30)
+    for ingredient in recipe['ingredients']:
+        print(f"• {ingredient}")
+    print(f"\n👩‍🍳 INSTRUCTIONS:")
+    print("-" * 30)
+    for i, instruction in enumerate(recipe['instructions'], 1):
+        print(f"{i}. {instruction}")
+    print("=" * 60)
+
+
+def timed(func, path):
+    """Run func with an open text file and return (seconds, bytes written)"""
+    with open(path, 'w', encoding='utf-8') as stream:
+        start = time.perf_counter()
+        func(stream)
+        stream.flush()
+        elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--recipes', type=int, default=100_000)
+    args = parser.parse_args()
+
+    recipes = make_catalog(args.recipes)
+    renderer = RecipeRenderer(recipes)
+
+    def per_line(stream):
+        with contextlib.redirect_stdout(stream):
+            for recipe in recipes.values():
+                print_recipe(recipe)
+
+    def warm_cards(stream):
+        for key in recipes:
+            renderer.write_card(key, stream)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.txt')
+        baseline, size = timed(per_line, path)
+        print(f"{'mode':>22} {'seconds':>8} {'speedup':>8}")
+        print(f"{'print per line':>22} {baseline:>8.2f} {1:>7.1f}x")
+        for label, func in [("render_all", renderer.render_all),
+                            ("card per write", warm_cards)]:
+            elapsed, written = timed(func, path)
+            assert written == size, label
+            print(f"{label:>22} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
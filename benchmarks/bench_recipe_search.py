@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Recipe Search Benchmark
+Compare the linear keyword scan against RecipeIndex on synthetic catalogs
+
+Usage: python benchmarks/bench_recipe_search.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from recipe_index import RecipeIndex
+from synthetic_catalog import make_catalog
+
+KEYWORDS = ["espresso", "Mug", "chocolate chips", "pecan", "vinegar", "zz"]
+
+
+def linear_search(recipes, keyword):
+    """The original search: lower-case every name and ingredient per call"""
+    if not keyword or not keyword.strip():
+        return []
+    matching_recipes = []
+    keyword_lower = keyword.lower()
+    for key, recipe in recipes.items():
+        if keyword_lower in recipe['name'].lower():
+            matching_recipes.append((key, recipe['name']))
+            continue
+        for ingredient in recipe['ingredients']:
+            if keyword_lower in ingredient.lower():
+                matching_recipes.append((key, recipe['name']))
+                break
+    return matching_recipes
+
+
+def best_of(func, repeat):
+    """Return the fastest of repeat timed calls to func"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'recipes':>10} {'keyword':>16} {'matches':>9} "
+          f"{'linear ms':>10} {'index ms':>9} {'speedup':>8}")
+    for size in args.sizes:
+        recipes = make_catalog(size)
+        start = time.perf_counter()
+        index = RecipeIndex(recipes)
+        build = time.perf_counter() - start
+        print(f"{size:>10} {'(build)':>16} {'':>9} {'':>10} {build * 1000:>9.1f}")
+        for keyword in KEYWORDS:
+            expected = linear_search(recipes, keyword)
+            assert index.search(keyword) == expected, keyword
+            linear = best_of(lambda: linear_search(recipes, keyword), args.repeat)
+            indexed = best_of(lambda: index.search(keyword), args.repeat)
+            print(f"{size:>10} {keyword!r:>16} {len(expected):>9} "
+                  f"{linear * 1000:>10.2f} {indexed * 1000:>9.2f} "
+                  f"{linear / indexed:>7.1f}x")
+        del recipes, index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Ranked Search Benchmark
+Time top-20 ranked queries against scoring and sorting every match
+
+Usage: python benchmarks/bench_recipe_search_ranked.py [--sizes 100000 1000000]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from recipe_search import RankedRecipeIndex, tokenize
+from synthetic_catalog import iter_catalog
+
+QUERIES = ["chocolate", "chocolat", "espresso pecan", "buttermlk", "molten lava cake",
+           "raspbery jam vinegar"]
+
+
+def score_all(index, query, k):
+    """Accumulate every matching recipe's score, then sort them all"""
+    scores = {}
+    for term in tokenize(query):
+        for match, similarity in index.expand(term):
+            postings = index._postings[match]
+            idf = math.log(1 + len(index) / len(postings.docs))
+            for doc_id, weight in zip(postings.docs, postings.weights):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * similarity * idf
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return ranked[:k], len(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('-k', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'recipes':>10} {'query':>22} {'matches':>9} {'sort all ms':>12} "
+          f"{'first ms':>9} {'top-k ms':>9}")
+    for size in args.sizes:
+        start = time.perf_counter()
+        index = RankedRecipeIndex()
+        for key, recipe in iter_catalog(size):
+            index.add(key, recipe)
+        print(f"{size:>10} {'(build)':>22} {'':>9} {'':>12} "
+              f"{(time.perf_counter() - start) * 1000:>9.0f}")
+        for query in QUERIES:
+            start = time.perf_counter()
+            _, matches = score_all(index, query, args.k)
+            full = time.perf_counter() - start
+
+            # The first query for a term also builds its impact order
+            start = time.perf_counter()
+            index.search(query, args.k)
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            index.search(query, args.k)
+            warm = time.perf_counter() - start
+            print(f"{size:>10} {query!r:>22} {matches:>9} {full * 1000:>12.1f} "
+                  f"{first * 1000:>9.1f} {warm * 1000:>9.2f}")
+        del index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Recipe Similarity Benchmark
+MinHash/LSH neighbor index build time, recall and lookup cost vs. brute force
+
+Recall is measured on --sample recipes against an exact scan of the
+whole catalog: the share of returned neighbors scoring at least as high
+as the exact k-th best.  The brute-force column is that scan's time per
+recipe, so the catalog-wide cost of computing neighbors live is
+roughly recipes x that.
+
+Usage: python benchmarks/bench_recipe_similarity.py [--sizes 10000 100000] [-k 5]
+           [--window 32]
+"""
+
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from recipe_similarity import BUCKET_WINDOW, RecipeSimilarityIndex
+from synthetic_catalog import iter_catalog
+
+
+def exact_kth(index, recipe_id, k):
+    """Score one recipe against every other; return the k-th best score"""
+    features = index._features[recipe_id]
+    scores = (index._score(features, other) for other_id, other in index._features.items()
+              if other_id != recipe_id)
+    best = heapq.nlargest(k, scores)
+    return best[-1] if len(best) == k else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--sample', type=int, default=100)
+    parser.add_argument('--metric', choices=['jaccard', 'cosine'], default='jaccard')
+    parser.add_argument('--window', type=int, default=BUCKET_WINDOW,
+                        help="bucket members compared per recipe and band")
+    args = parser.parse_args()
+
+    print(f"{'recipes':>9} {'build s':>8} {'recall':>7} {'brute ms':>9} "
+          f"{'lookup us':>10} {'add us':>8}")
+    for size in args.sizes:
+        start = time.perf_counter()
+        index = RecipeSimilarityIndex(k=args.k, metric=args.metric, bucket_window=args.window)
+        index.extend(iter_catalog(size))
+        build = time.perf_counter() - start
+
+        keys = list(index._ids)
+        sample = random.Random(1).sample(keys, min(args.sample, len(keys)))
+        hits = 0
+        start = time.perf_counter()
+        for key in sample:
+            kth = exact_kth(index, index._ids[key], args.k)
+            hits += sum(1 for *_, score in index.neighbors(key) if score >= kth)
+        brute = (time.perf_counter() - start) / len(sample)
+        recall = hits / (len(sample) * args.k)
+
+        start = time.perf_counter()
+        for key in keys[:100_000]:
+            index.neighbors(key)
+        lookup = (time.perf_counter() - start) / min(len(keys), 100_000)
+
+        extra = list(iter_catalog(100, seed=7))
+        start = time.perf_counter()
+        for number, (key, recipe) in enumerate(extra):
+            index.add(f"new_{number}_{key}", recipe)
+            index.refresh()
+        add = (time.perf_counter() - start) / len(extra)
+        print(f"{size:>9} {build:>8.1f} {recall:>7.2f} {brute * 1000:>9.1f} "
+              f"{lookup * 1e6:>10.2f} {add * 1e6:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
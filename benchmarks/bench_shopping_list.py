@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Shopping List Benchmark
+Compare ShoppingListEngine against a naive per-recipe parse-and-scale loop
+
+Usage: python benchmarks/bench_shopping_list.py [--recipes 10000] [--requests 1000 10000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from fractions import Fraction
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ingredient_store import IngredientStore, parse_ingredient
+from shopping_list import ShoppingListEngine, from_base_unit, to_base_unit
+from synthetic_catalog import make_catalog
+
+
+def naive_shopping_list(recipes, requests):
+    """Parse, scale and merge each requested recipe's strings one at a time"""
+    totals = {}
+    for recipe_key, servings in requests:
+        recipe = recipes[recipe_key]
+        factor = Fraction(servings, recipe['servings'])
+        for text in recipe['ingredients']:
+            ingredient = parse_ingredient(text)
+            if ingredient.quantity is None:
+                totals.setdefault((ingredient.item.lower(), ingredient.unit), None)
+                continue
+            quantity, base_unit = to_base_unit(ingredient.quantity * factor, ingredient.unit)
+            group = (ingredient.item.lower(), base_unit)
+            totals[group] = (totals.get(group) or 0) + quantity
+    return {(item, from_base_unit(total, unit) if total is not None else (None, unit))
+            for (item, unit), total in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--recipes', type=int, default=10_000)
+    parser.add_argument('--requests', type=int, nargs='+', default=[1_000, 10_000])
+    args = parser.parse_args()
+
+    recipes = make_catalog(args.recipes)
+    store = IngredientStore(recipes)
+    keys = list(recipes)
+    rng = random.Random(0)
+
+    print(f"{'requests':>9} {'naive req/s':>12} {'engine cold':>12} "
+          f"{'engine warm':>12} {'speedup':>8}")
+    for count in args.requests:
+        requests = [(rng.choice(keys), rng.randint(1, 24)) for _ in range(count)]
+
+        start = time.perf_counter()
+        expected = naive_shopping_list(recipes, requests)
+        naive = time.perf_counter() - start
+
+        # Cold includes compiling each recipe; warm reuses compiled recipes
+        engine = ShoppingListEngine(recipes, store)
+        start = time.perf_counter()
+        engine.shopping_list(requests)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        result = engine.shopping_list(requests)
+        warm = time.perf_counter() - start
+
+        assert {(i.item, (i.quantity, i.unit)) for i in result} == expected
+        print(f"{count:>9} {count / naive:>12.0f} {count / cold:>12.0f} "
+              f"{count / warm:>12.0f} {naive / warm:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
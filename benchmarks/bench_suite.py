@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Time the hot paths of every tool and gate them against a JSON baseline
+
+Runs offline on a synthetic catalog of --size recipes: keyword, ranked and
+filtered recipe search, lookup by number, card rendering and similar
+recipes; scalar and batch temperature conversion; binary conversion; and
+the read-only ExcuseGenerator routes through Flask's test client, against
+a temporary database.  Excuse writes fsync and are left to
+bench_excuse_durability.py.
+
+Each benchmark is calibrated to run for about --min-time seconds, repeated
+--repeat times, and the fastest repeat is kept (the least disturbed by
+other work on the machine).  Next to seconds per call, each benchmark gets
+a relative time: its runs divided by a fixed reference workload timed
+around them, which cancels out spells of a slower CPU.  --save records the
+results in the baseline file.  Otherwise they are compared with it, and
+the exit status is 1 if any benchmark's relative time is still more than
+--threshold (a fraction, 0.25 = 25%) above its baseline after RETRIES
+re-timings.  Baselines only compare within one machine and one --size, so
+record one where the gate runs.
+
+Usage: python benchmarks/bench_suite.py [--size 10000] [--only recipes temperature] [--save]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from array import array
+from itertools import cycle
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+from synthetic_catalog import make_catalog
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Slowdown over the baseline that fails the run, as a fraction
+THRESHOLD = 0.25
+
+# Times a benchmark that looks slower than the threshold is re-timed before
+# it counts as a regression
+RETRIES = 2
+
+# _reference() calls timed around every run to gauge the machine's speed
+REFERENCE_CALLS = 5
+
+# name -> setup(size) returning the zero-argument call to time
+BENCHMARKS = {}
+
+# Size of the synthetic catalog chocolate_cake_recipes is serving, if any
+_catalog_size = None
+
+
+def benchmark(name):
+    """Register a setup function under a dotted benchmark name"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _recipes(size):
+    """Serve a synthetic catalog of size recipes through chocolate_cake_recipes"""
+    global _catalog_size
+    import chocolate_cake_recipes
+    if _catalog_size != size:
+        chocolate_cake_recipes.use_recipes(make_catalog(size))
+        _catalog_size = size
+    return chocolate_cake_recipes
+
+
+@benchmark('recipes.search_keyword')
+def _search_keyword(size):
+    recipes = _recipes(size)
+    keywords = cycle(["vegan", "espresso", "raspberry jam", "pecan", "velvet"])
+    recipes.search_recipes_by_keyword("warm up")
+    return lambda: recipes.search_recipes_by_keyword(next(keywords))
+
+
+@benchmark('recipes.search_ranked')
+def _search_ranked(size):
+    recipes = _recipes(size)
+    queries = cycle(["fudgy espreso", "vegan coconut", "molten lava cake", "raspbery"])
+    recipes.search_recipes_ranked("warm up")
+    return lambda: recipes.search_recipes_ranked(next(queries), 20)
+
+
+@benchmark('recipes.find')
+def _find(size):
+    recipes = _recipes(size)
+    recipes.find_recipes(total=(None, 45))
+    filters = cycle([{'total': (None, 45)}, {'bake': (25, 35)},
+                     {'keyword': "vegan", 'servings': (10, None)}])
+    return lambda: recipes.find_recipes(**next(filters))
+
+
+@benchmark('recipes.lookup_by_number')
+def _lookup_by_number(size):
+    recipes = _recipes(size)
+    numbers = cycle(range(1, size + 1, max(1, size // 997)))
+    return lambda: recipes.get_recipe_by_number(next(numbers))
+
+
+@benchmark('recipes.render_card')
+def _render_card(size):
+    from recipe_render import render_recipe
+    recipes = _recipes(size)
+    # Uncached rendering; display_recipe serves repeat views from a cache
+    cards = cycle(recipe for _, recipe in recipes.list_recipes(0, 1000))
+    return lambda: render_recipe(next(cards))
+
+
+@benchmark('recipes.similar')
+def _similar(size):
+    recipes = _recipes(size)
+    keys = cycle([key for key, _ in recipes.list_recipes(0, 1000)])
+    recipes.similar_recipes(next(keys))
+    return lambda: recipes.similar_recipes(next(keys), 5)
+
+
+@benchmark('temperature.scalar')
+def _temperature_scalar(size):
+    from temperature_converter import celsius_to_fahrenheit, convert
+    readings = cycle([-40.0, 0.0, 21.5, 37.0, 100.0])
+
+    def run():
+        celsius_to_fahrenheit(next(readings))
+        convert(next(readings), 'K', 'R')
+    return run
+
+
+@benchmark('temperature.batch_100k')
+def _temperature_batch(size):
+    from temperature_converter import convert_batch
+    values = array('d', (float(number % 400 - 100) for number in range(100_000)))
+    out = array('d', bytes(len(values) * values.itemsize))
+    return lambda: convert_batch(values, 'C', 'F', out=out)
+
+
+@benchmark('binary.to_binary')
+def _to_binary(size):
+    from binary_converter import to_binary
+    numbers = cycle([0, 1, 255, 65_535, 2 ** 40 + 12_345, 2 ** 63 - 1])
+    return lambda: to_binary(next(numbers), 64)
+
+
+@contextlib.contextmanager
+def _excuse_store(path):
+    """Serve the excuse app from a new database at path, then restore its store"""
+    import app
+    previous = app.set_store(app.open_store(path))
+    try:
+        yield
+    finally:
+        app.set_store(previous).close()
+
+
+def _excuse_client():
+    """Return a Flask test client for the excuse app"""
+    import app
+    return app.app.test_client()
+
+
+@benchmark('excuses.random')
+def _excuses_random(size):
+    client = _excuse_client()
+    return lambda: client.get('/api/random-excuse')
+
+
+@benchmark('excuses.list')
+def _excuses_list(size):
+    client = _excuse_client()
+    return lambda: client.get('/api/excuses')
+
+
+@benchmark('excuses.category')
+def _excuses_category(size):
+    client = _excuse_client()
+    categories = cycle(['late_home', 'general', 'forgot_event', 'forgot_chore'])
+    return lambda: client.get(f'/api/excuse/{next(categories)}')
+
+
+@benchmark('excuses.sample_10')
+def _excuses_sample(size):
+    client = _excuse_client()
+    return lambda: client.get('/api/excuses/sample?n=10')
+
+
+def _reference():
+    """Fixed pure-Python work (formatting, allocation, sorting) that machine speed scales"""
+    return sorted([str(number * 7919 % 10007) for number in range(2000)])
+
+
+def time_call(call, repeat, min_time):
+    """Time call and return {'seconds': per call, 'relative': per call in reference units}
+
+    seconds is the fastest of repeat runs of about min_time seconds, and
+    relative divides it by the fastest reference timing taken before and
+    after each run, so a machine that is slow for a while slows both.
+    """
+    timer = timeit.Timer(call)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    reference = timeit.Timer(_reference)
+    references = []
+    seconds = float('inf')
+    for _ in range(repeat):
+        references.append(reference.timeit(REFERENCE_CALLS))
+        seconds = min(seconds, timer.timeit(number) / number)
+        references.append(reference.timeit(REFERENCE_CALLS))
+    return {'seconds': seconds, 'relative': seconds / (min(references) / REFERENCE_CALLS)}
+
+
+def compare(results, baseline, threshold):
+    """Return {name: current / baseline relative time} for results more than threshold slower"""
+    ratios = {name: result['relative'] / baseline[name]['relative']
+              for name, result in results.items() if name in baseline}
+    return {name: ratio for name, ratio in ratios.items() if ratio > 1 + threshold}
+
+
+def load_baseline(path, size):
+    """Return the baseline results recorded at size, {} if there are none"""
+    try:
+        with open(path) as handle:
+            recorded = json.load(handle)
+    except FileNotFoundError:
+        return {}
+    if recorded['size'] != size:
+        raise ValueError(f"{path} was recorded with --size {recorded['size']}, not {size}")
+    return recorded['results']
+
+
+def save_baseline(path, size, results):
+    """Merge results into the baseline file, replacing one recorded at another size"""
+    try:
+        baseline = load_baseline(path, size)
+    except ValueError:
+        baseline = {}
+    baseline.update(results)
+    with open(path, 'w') as handle:
+        json.dump({'size': size, 'python': platform.python_version(),
+                   'machine': platform.machine(), 'results': dict(sorted(baseline.items()))},
+                  handle, indent=2)
+        handle.write('\n')
+
+
+def report(name, result, baseline, threshold):
+    """Print one row: time per call and the change in relative time from the baseline"""
+    line = f"{name:<26} {result['seconds'] * 1e6:>10.2f}"
+    if name in baseline:
+        change = result['relative'] / baseline[name]['relative'] - 1
+        flag = "  REGRESSED" if change > threshold else ""
+        line += f" {baseline[name]['seconds'] * 1e6:>10.2f} {change:>+8.1%}{flag}"
+    print(line, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=10_000, help="synthetic catalog size")
+    parser.add_argument('--only', nargs='+', default=[], metavar='PREFIX',
+                        help="run benchmarks whose names start with a prefix, e.g. recipes")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="seconds each repeat runs for (default: 0.2)")
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f"allowed slowdown as a fraction (default: {THRESHOLD})")
+    parser.add_argument('--save', action='store_true', help="record results as the baseline")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS
+             if not args.only or name.startswith(tuple(args.only))]
+    if not names:
+        parser.error(f"no benchmark matches {' '.join(args.only)}")
+    try:
+        baseline = {} if args.save else load_baseline(args.baseline, args.size)
+    except ValueError as error:
+        parser.error(str(error))
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.ExitStack() as stack:
+        if any(name.startswith('excuses.') for name in names):
+            stack.enter_context(_excuse_store(os.path.join(tmp, 'excuses.db')))
+        calls = {}
+        results = {}
+        print(f"{'benchmark':<26} {'us/call':>10} {'baseline':>10} {'change':>8}")
+        for name in names:
+            calls[name] = BENCHMARKS[name](args.size)
+            results[name] = time_call(calls[name], args.repeat, args.min_time)
+            report(name, results[name], baseline, args.threshold)
+
+        # A regression has to show up again: one slow spell should not fail the run
+        for attempt in range(RETRIES):
+            regressed = compare(results, baseline, args.threshold)
+            if not regressed:
+                break
+            print(f"Re-timing {', '.join(sorted(regressed))} ({attempt + 1}/{RETRIES})")
+            for name in sorted(regressed):
+                retimed = time_call(calls[name], args.repeat, args.min_time)
+                results[name] = {key: min(value, retimed[key])
+                                 for key, value in results[name].items()}
+                report(name, results[name], baseline, args.threshold)
+
+    if args.save:
+        save_baseline(args.baseline, args.size, results)
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}; record one with --save")
+        return 0
+    regressed = compare(results, baseline, args.threshold)
+    if regressed:
+        print(f"{len(regressed)} benchmark(s) slower than the baseline by more than "
+              f"{args.threshold:.0%}: {', '.join(sorted(regressed))}")
+        return 1
+    print(f"No benchmark slower than the baseline by more than {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
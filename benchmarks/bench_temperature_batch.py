@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Temperature Batch Benchmark
+Compare the per-reading scalar loop against the batch and in-place converters
+
+Usage: python benchmarks/bench_temperature_batch.py [--readings 10000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from array import array
+
+try:
+    import numpy
+except ImportError:  # The NumPy case is skipped without it
+    numpy = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from temperature_converter import celsius_to_fahrenheit, celsius_to_fahrenheit_batch
+
+
+def timed(func):
+    """Return the seconds taken by func()"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readings', type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    readings = array('d', (float(i % 2000) / 10 - 50 for i in range(args.readings)))
+
+    def scalar_loop():
+        array('d', [celsius_to_fahrenheit(value) for value in readings])
+
+    def batch_copy():
+        celsius_to_fahrenheit_batch(readings)
+
+    def batch_in_place():
+        view = memoryview(readings)
+        celsius_to_fahrenheit_batch(view, out=view)
+
+    modes = [("scalar loop", scalar_loop), ("batch (new array)", batch_copy),
+             ("batch in place", batch_in_place)]
+    if numpy is not None:
+        values = numpy.frombuffer(readings, dtype='d').copy()
+        modes.append(("numpy in place",
+                      lambda: celsius_to_fahrenheit_batch(values, out=values)))
+
+    baseline = None
+    print(f"{'mode':>20} {'seconds':>8} {'readings/s':>14} {'speedup':>8}")
+    for label, func in modes:
+        elapsed = timed(func)
+        baseline = baseline or elapsed
+        print(f"{label:>20} {elapsed:>8.2f} {args.readings / elapsed:>14,.0f}"
+              f" {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
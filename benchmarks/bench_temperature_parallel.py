@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Parallel Temperature Benchmark
+Measure convert_files throughput and scaling on 1, 2, 4 and 8 workers
+
+Usage: python benchmarks/bench_temperature_parallel.py [--files 8] [--megabytes 64]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from temperature_parallel import convert_files
+
+
+def write_inputs(directory, files, megabytes, binary):
+    """Write files of random Celsius readings and return their paths"""
+    rng = random.Random(42)
+    paths = []
+    for number in range(files):
+        if binary:
+            path = os.path.join(directory, f"sensor{number}.f64")
+            readings = array('d', (rng.uniform(-50, 50) for _ in range(megabytes << 17)))
+            with open(path, 'wb') as stream:
+                readings.tofile(stream)
+        else:
+            path = os.path.join(directory, f"sensor{number}.txt")
+            line_count = (megabytes << 20) // 8  # lines like "-12.345\n"
+            with open(path, 'w', encoding='ascii') as stream:
+                stream.writelines(f"{rng.uniform(-50, 50):.3f}\n" for _ in range(line_count))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=8)
+    parser.add_argument('--megabytes', type=int, default=64, help="size of each file")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"CPUs available: {os.cpu_count()}")
+    print(f"{'format':>7} {'workers':>8} {'seconds':>8} {'readings/s':>14}"
+          f" {'speedup':>8} {'efficiency':>11}")
+    for binary in (True, False):
+        label = "binary" if binary else "text"
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_inputs(tmp, args.files, args.megabytes, binary)
+            output_dir = os.path.join(tmp, 'out')
+            os.mkdir(output_dir)
+            baseline = None
+            for workers in args.workers:
+                start = time.perf_counter()
+                total = sum(convert_files(paths, output_dir, 'C', 'F', binary, workers))
+                elapsed = time.perf_counter() - start
+                baseline = baseline or elapsed * args.workers[0]
+                speedup = baseline / elapsed
+                print(f"{label:>7} {workers:>8} {elapsed:>8.2f} {total / elapsed:>14,.0f}"
+                      f" {speedup:>7.2f}x {speedup / workers:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
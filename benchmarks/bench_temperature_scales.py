@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Temperature Scales Benchmark
+Compare the original C/F formulas against the precomposed affine transforms
+
+Usage: python benchmarks/bench_temperature_scales.py [--readings 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from temperature_converter import (
+    celsius_to_fahrenheit,
+    convert,
+    convert_batch,
+)
+
+
+def original_celsius_to_fahrenheit(celsius):
+    """The original scalar formula"""
+    return (celsius * 9/5) + 32
+
+
+def original_celsius_to_rankine(celsius):
+    """A chained conversion written by hand: C -> F -> R"""
+    return original_celsius_to_fahrenheit(celsius) + 459.67
+
+
+def timed(func, readings):
+    """Return the seconds taken by func(readings)"""
+    start = time.perf_counter()
+    func(readings)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readings', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    readings = array('d', (float(i % 2000) / 10 - 50 for i in range(args.readings)))
+
+    cases = [
+        ("C->F scalar", [
+            ("original formula", lambda values: [original_celsius_to_fahrenheit(v) for v in values]),
+            ("celsius_to_fahrenheit", lambda values: [celsius_to_fahrenheit(v) for v in values]),
+            ("convert()", lambda values: [convert(v, 'C', 'F') for v in values]),
+        ]),
+        ("C->F buffer", [
+            ("original formula", lambda values: array('d', [(v * 9/5) + 32 for v in values])),
+            ("convert_batch", lambda values: convert_batch(values, 'C', 'F')),
+        ]),
+        ("C->R buffer", [
+            ("chained by hand", lambda values: array('d', [original_celsius_to_rankine(v) for v in values])),
+            ("convert_batch", lambda values: convert_batch(values, 'C', 'R')),
+        ]),
+    ]
+
+    print(f"{'case':>12} {'implementation':>22} {'seconds':>8} {'ns/reading':>11} {'speedup':>8}")
+    for case, implementations in cases:
+        baseline = None
+        for label, func in implementations:
+            elapsed = timed(func, readings)
+            baseline = baseline or elapsed
+            print(f"{case:>12} {label:>22} {elapsed:>8.3f}"
+                  f" {elapsed / args.readings * 1e9:>11.1f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
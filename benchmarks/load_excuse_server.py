@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Excuse Server Load Test
+p50/p99 latency and requests per second for the Flask dev server vs. the ASGI server
+
+Starts each server on a local port with a fresh database, then drives it
+with keep-alive HTTP/1.1 connections (reconnecting whenever the server
+closes one) cycling through the read routes.
+
+Usage: python benchmarks/load_excuse_server.py [--connections 32] [--seconds 10]
+           [--modes flask asgi] [--workers N]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'ExcuseGenerator')
+
+PATHS = ['/api/random-excuse', '/api/excuses', '/api/excuse/general']
+
+# The deployment's current setup: the dev server with debug mode on
+FLASK_COMMAND = ("import app; app.app.run(host='127.0.0.1', port={port},"
+                 " debug=True, use_reloader=False)")
+
+
+def free_port():
+    """Return a currently unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, database, workers):
+    """Start a server subprocess and wait until it accepts connections"""
+    if mode == 'flask':
+        command = [sys.executable, '-c', FLASK_COMMAND.format(port=port)]
+    else:
+        command = [sys.executable, 'serve.py', '--port', str(port), '--workers', str(workers)]
+    server = subprocess.Popen(command, cwd=APP_DIR, env=dict(os.environ, EXCUSE_DB=database),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"{mode} server exited with code {server.returncode}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+async def read_response(reader):
+    """Read one response; return (status, keep the connection open)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    version, status = lines[0].split(' ')[:2]
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip().lower()
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+        keep_alive = (headers.get('connection') != 'close'
+                      and (version == 'HTTP/1.1' or headers.get('connection') == 'keep-alive'))
+    else:
+        await reader.read()
+        keep_alive = False
+    return int(status), keep_alive
+
+
+async def client(port, stop_at, latencies, errors, offset):
+    """One connection issuing requests back to back until stop_at"""
+    reader = writer = None
+    number = offset
+    while time.monotonic() < stop_at:
+        path = PATHS[number % len(PATHS)]
+        number += 1
+        request = (f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+                   f"Connection: keep-alive\r\n\r\n").encode('ascii')
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            status, keep_alive = await read_response(reader)
+        except (OSError, asyncio.IncompleteReadError):
+            errors.append(path)
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(path)
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def drive(port, connections, seconds):
+    """Run the load; return (sorted latencies, error count, elapsed seconds)"""
+    latencies = []
+    errors = []
+    start = time.monotonic()
+    stop_at = start + seconds
+    await asyncio.gather(*(client(port, stop_at, latencies, errors, offset)
+                           for offset in range(connections)))
+    return sorted(latencies), len(errors), time.monotonic() - start
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--modes', nargs='+', choices=['flask', 'asgi'], default=['flask', 'asgi'])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="ASGI worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    print(f"{'mode':>6} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            server = start_server(mode, port, os.path.join(tmp, 'excuses.db'), args.workers)
+            try:
+                asyncio.run(drive(port, args.connections, 1.0))  # warm up
+                latencies, errors, elapsed = asyncio.run(
+                    drive(port, args.connections, args.seconds))
+            finally:
+                server.terminate()
+                server.wait()
+        if not latencies:
+            print(f"{mode:>6} no successful requests ({errors} errors)")
+            continue
+        print(f"{mode:>6} {len(latencies):>9} {errors:>7} {len(latencies) / elapsed:>9,.0f}"
+              f" {percentile(latencies, 0.50) * 1000:>8.2f}"
+              f" {percentile(latencies, 0.99) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
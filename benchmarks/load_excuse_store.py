@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Excuse Store Load Test
+Read throughput of ExcuseStore snapshots while threads and processes write
+
+Usage: python benchmarks/load_excuse_store.py [--readers 4] [--seconds 3]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+from excuse_store import ExcuseStore
+
+SEED = {f"category_{number}": [f"excuse {number}.{index}" for index in range(20)]
+        for number in range(50)}
+
+
+def process_writer(path, stop_at, counter):
+    """Another worker process adding excuses to the shared database"""
+    store = ExcuseStore(path)
+    writes = 0
+    while time.monotonic() < stop_at:
+        store.add("from_other_process", f"excuse {writes}")
+        writes += 1
+    store.close()
+    with counter.get_lock():
+        counter.value += writes
+
+
+def run(path, readers, writer_threads, writer_processes, seconds):
+    """Return (reads/s, local writes/s, remote writes/s, excuses seen at the end)"""
+    store = ExcuseStore(path, seed=SEED)
+    stop_at = time.monotonic() + seconds
+    reads = [0] * readers
+    writes = [0] * writer_threads
+
+    def read(slot):
+        count = 0
+        while time.monotonic() < stop_at:
+            for _ in range(100):
+                store.snapshot().sample()
+            count += 100
+        reads[slot] = count
+
+    def write(slot):
+        count = 0
+        while time.monotonic() < stop_at:
+            store.add("from_thread", f"excuse {slot}.{count}")
+            count += 1
+        writes[slot] = count
+
+    counter = multiprocessing.Value('q', 0)
+    processes = [multiprocessing.Process(target=process_writer, args=(path, stop_at, counter))
+                 for _ in range(writer_processes)]
+    threads = [threading.Thread(target=read, args=(slot,)) for slot in range(readers)]
+    threads += [threading.Thread(target=write, args=(slot,)) for slot in range(writer_threads)]
+    for worker in processes + threads:
+        worker.start()
+    for worker in processes + threads:
+        worker.join()
+
+    time.sleep(store.refresh_interval)
+    seen = len(store.snapshot())
+    store.close()
+    return sum(reads) / seconds, sum(writes) / seconds, counter.value / seconds, seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'writer threads':>14} {'writer procs':>12} {'reads/s':>12}"
+          f" {'writes/s':>10} {'remote/s':>10} {'excuses':>8}")
+    for writer_threads, writer_processes in [(0, 0), (1, 0), (4, 0), (1, 1), (2, 2)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'excuses.db')
+            reads, writes, remote, seen = run(path, args.readers, writer_threads,
+                                              writer_processes, args.seconds)
+            expected = sum(len(texts) for texts in SEED.values())
+            expected += round((writes + remote) * args.seconds)
+            assert seen == expected, (seen, expected)
+            print(f"{writer_threads:>14} {writer_processes:>12} {reads:>12,.0f}"
+                  f" {writes:>10,.0f} {remote:>10,.0f} {seen:>8}")
+
+
+if __name__ == "__main__":
+    main()
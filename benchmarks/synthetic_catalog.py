@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Synthetic Recipe Catalogs
+Generate large, deterministic recipe catalogs shaped like CHOCOLATE_CAKE_RECIPES
+"""
+
+import random
+
+ADJECTIVES = [
+    "Classic", "Fudgy", "German", "Vegan", "Rich", "Moist", "Easy", "Triple",
+    "Double", "Dark", "Molten", "Spiced", "Salted", "Marbled", "Mocha",
+    "Midnight", "Flourless", "Gooey", "Velvet", "Rustic",
+]
+STYLES = [
+    "Layer", "Bundt", "Sheet", "Mug", "Lava", "Fudge", "Sponge", "Pound",
+    "Cream", "Mousse", "Buttermilk", "Espresso", "Raspberry", "Orange",
+]
+QUANTITIES = ["1", "2", "3", "4", "1/4", "1/3", "1/2", "2/3", "3/4",
+              "1 1/2", "1 3/4", "2 1/2"]
+UNITS = ["cup", "cups", "tablespoon", "tablespoons", "teaspoon", "teaspoons",
+         "oz", "large", "pinch"]
+ITEMS = [
+    "all-purpose flour", "cake flour", "granulated sugar", "brown sugar",
+    "unsweetened cocoa powder", "dark cocoa powder", "baking soda",
+    "baking powder", "salt", "eggs", "egg yolks", "buttermilk", "sour cream",
+    "strong black coffee", "hot water", "vegetable oil", "melted butter",
+    "butter, softened", "vanilla extract", "dark chocolate chips",
+    "mini chocolate chips", "chocolate syrup", "heavy cream", "espresso powder",
+    "white vinegar", "almond milk", "coconut oil", "chopped pecans",
+    "shredded coconut", "raspberry jam", "orange zest", "ground cinnamon",
+]
+INSTRUCTIONS = [
+    "Preheat oven to 350°F (175°C). Grease and flour the pans.",
+    "Whisk together the dry ingredients in a large bowl.",
+    "In another bowl, beat the eggs with the wet ingredients.",
+    "Gradually add wet ingredients to dry ingredients, mixing until smooth.",
+    "Fold in chocolate chips and any mix-ins.",
+    "Pour batter into the prepared pan and smooth the top.",
+    "Bake until a toothpick inserted in the center comes out clean.",
+    "Cool in the pan for 10 minutes, then turn out onto a wire rack.",
+    "Frost once the cake has cooled completely.",
+]
+
+
+def make_catalog(size, seed=0):
+    """Return a dict of size synthetic recipes keyed like the real catalog"""
+    return dict(iter_catalog(size, seed))
+
+
+def iter_catalog(size, seed=0):
+    """Yield (key, recipe) pairs one at a time, for streaming very large catalogs"""
+    rng = random.Random(seed)
+    ingredient_pool = [f"{quantity} {unit} {item}"
+                       for quantity in QUANTITIES
+                       for unit in UNITS
+                       for item in ITEMS]
+    for number in range(size):
+        adjective = rng.choice(ADJECTIVES)
+        style = rng.choice(STYLES)
+        prep = rng.randrange(10, 45, 5)
+        bake = rng.randrange(20, 60, 5)
+        bake_time = (f"{bake}-{bake + 5} minutes" if rng.random() < 0.5
+                     else f"{bake} minutes")
+        yield f"{adjective.lower()}_{style.lower()}_{number}", {
+            "name": f"{adjective} {style} Chocolate Cake",
+            "servings": rng.randint(4, 16),
+            "prep_time": f"{prep} minutes",
+            "bake_time": bake_time,
+            "ingredients": rng.sample(ingredient_pool, rng.randint(8, 14)),
+            "instructions": rng.sample(INSTRUCTIONS, rng.randint(5, 8)),
+        }
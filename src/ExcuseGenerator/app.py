@@ -1,86 +1,160 @@
-import random
-import json
-from flask import Flask, jsonify, render_template, request
+import os
+import threading
+import time
+from flask import Flask, abort, g, jsonify, render_template, request
+
+import excuse_api
+import excuse_metrics
+from excuse_defaults import (CATEGORY_WEIGHTS, DATABASE, EVICTION_POLICY, EXCUSES,
+                             MAX_CATEGORY_BYTES, MAX_EXCUSE_BYTES, open_store)
+from excuse_metrics import METRICS, PROFILER
 
 app = Flask(__name__, static_url_path='/static')
 
-# List of excuses categorized by type
-EXCUSES = {
-    "forgot_event": [
-        "My phone calendar glitched and didn't send me any reminders.",
-        "I set it in my calendar for next week by accident.",
-        "I was preparing a surprise for you and got completely sidetracked.",
-        "I had it written down but my notes app crashed and lost it.",
-        "The notification came through but I was driving and forgot after.",
-    ],
-    "late_home": [
-        "Traffic was horrible because of an accident on the highway.",
-        "My boss called an emergency meeting right when I was leaving.",
-        "I stopped to help someone with a flat tire.",
-        "I took a detour to pick something up for us.",
-        "My car wouldn't start and I had to wait for help.",
-    ],
-    "forgot_chore": [
-        "I was in the middle of it when an urgent work email came through.",
-        "I started, but then realized we were out of supplies.",
-        "I thought we agreed you'd handle that this week.",
-        "I did it but must have done it wrong, let me fix it.",
-        "I got halfway through and got called away for something urgent.",
-    ],
-    "general": [
-        "I was planning something special for our anniversary and got distracted.",
-        "My phone died so I couldn't let you know.",
-        "I thought I told you about this last week.",
-        "I've been so stressed about work that it completely slipped my mind.",
-        "My alarm didn't go off this morning and threw off my whole day.",
-    ]
-}
+# Excuses and store settings live in excuse_defaults; they are re-exported here.
+# The store opens on first use, so importing the app touches no database.
+_store = None
+_store_lock = threading.Lock()
+
+# Serve /metrics and /debug/* to loopback clients only
+METRICS_LOCAL_ONLY = True
+
+# Behind a reverse proxy every client looks like loopback: EXCUSE_BEHIND_PROXY=1
+# stops trusting it, and the diagnostics routes are then refused to everyone
+TRUST_LOOPBACK = not os.environ.get('EXCUSE_BEHIND_PROXY')
+
+# EXCUSE_PROFILE=1 starts the sampling profiler with the app
+if os.environ.get('EXCUSE_PROFILE'):
+    PROFILER.start()
+
+@app.before_request
+def _start_timer():
+    """Note when the request started, for the latency histogram"""
+    g.request_start = time.perf_counter_ns()
+
+@app.after_request
+def _record_request(response):
+    """Count the request under its route template"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        rule = request.url_rule
+        METRICS.record(rule.rule if rule is not None else excuse_metrics.UNMATCHED,
+                       response.status_code, time.perf_counter_ns() - start)
+    return response
+
+def get_store():
+    """Return the ExcuseStore the routes serve, opening DATABASE on first use"""
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                set_store(open_store())
+    return _store
+
+def set_store(store):
+    """Serve store from now on and return the previous one (None if none was open)"""
+    global _store
+    previous, _store = _store, store
+    return previous
+
+def diagnostics_allowed(address):
+    """Whether a client address may use /metrics and /debug/*"""
+    return not METRICS_LOCAL_ONLY or (TRUST_LOOPBACK and excuse_metrics.is_local(address))
+
+def _local_only():
+    """Refuse the diagnostics routes to remote clients"""
+    if not diagnostics_allowed(request.remote_addr):
+        abort(403)
 
 @app.route('/')
 def index():
     """Render the main page"""
-    return render_template('index.html')
+    start = time.perf_counter_ns()
+    page = render_template('index.html')
+    METRICS.add_phase('render', time.perf_counter_ns() - start)
+    return page
+
+def _send(response):
+    """Turn an excuse_api Response into a Flask response"""
+    return app.response_class(response.body, status=response.status,
+                              headers=response.headers, mimetype='application/json')
 
 @app.route('/api/excuses')
 def get_excuses():
     """Return all available excuse categories"""
-    return jsonify(list(EXCUSES.keys()))
+    return _send(excuse_api.list_categories(get_store(), request.headers.get('If-None-Match')))
 
 @app.route('/api/excuse/<category>')
 def get_excuse(category):
     """Get a random excuse from the specified category"""
-    if category in EXCUSES:
-        return jsonify({
-            'category': category,
-            'excuse': random.choice(EXCUSES[category])
-        })
-    return jsonify({'error': 'Category not found'}), 404
+    return _send(excuse_api.excuse_from(get_store(), category))
 
 @app.route('/api/random-excuse')
 def random_excuse():
     """Get a random excuse from any category"""
-    category = random.choice(list(EXCUSES.keys()))
-    return jsonify({
-        'category': category,
-        'excuse': random.choice(EXCUSES[category])
-    })
+    return _send(excuse_api.random_excuse(get_store()))
+
+def _too_large(limit):
+    """Whether the declared request body is longer than limit bytes"""
+    return request.content_length is not None and request.content_length > limit
 
 @app.route('/api/add-excuse', methods=['POST'])
 def add_excuse():
     """Add a new excuse to a category"""
-    data = request.get_json()
-    
-    if not data or 'category' not in data or 'excuse' not in data:
-        return jsonify({'error': 'Missing category or excuse'}), 400
-    
-    category = data['category']
-    excuse = data['excuse']
-    
-    if category not in EXCUSES:
-        EXCUSES[category] = []
-    
-    EXCUSES[category].append(excuse)
-    return jsonify({'success': True, 'message': 'Excuse added successfully'})
+    if _too_large(excuse_api.MAX_EXCUSE_BODY):
+        return _send(excuse_api.payload_too_large())
+    if not request.is_json:
+        return _send(excuse_api.unsupported_media_type())
+    data = request.get_json(silent=True)
+    if data is None and request.get_data():
+        return _send(excuse_api.invalid_json())
+    return _send(excuse_api.add_excuse(get_store(), data))
+
+@app.route('/api/excuses/sample')
+def sample_excuses():
+    """Get several random excuses in one response"""
+    return _send(excuse_api.sample_excuses(get_store(), request.args.get('n', '1'),
+                                           request.args.get('category'),
+                                           request.args.get('replace', 'true')))
+
+@app.route('/api/add-excuses', methods=['POST'])
+def add_excuses():
+    """Add a list of excuses atomically"""
+    if _too_large(excuse_api.MAX_BATCH_BODY):
+        return _send(excuse_api.payload_too_large())
+    if not request.is_json:
+        return _send(excuse_api.unsupported_media_type())
+    data = request.get_json(silent=True)
+    if data is None and request.get_data():
+        return _send(excuse_api.invalid_json())
+    return _send(excuse_api.add_excuses(get_store(), data))
+
+@app.route('/api/stats')
+def get_stats():
+    """Return response and serialization counters for this process"""
+    return _send(excuse_api.stats())
+
+@app.route('/metrics')
+def metrics():
+    """Return request metrics in the Prometheus text format"""
+    _local_only()
+    return app.response_class(excuse_metrics.render(),
+                              content_type=excuse_metrics.CONTENT_TYPE)
+
+@app.route('/debug/profile', methods=['GET', 'POST'])
+def profile():
+    """Return the profiler's collapsed stacks, or start and stop it"""
+    _local_only()
+    if request.method == 'GET':
+        return app.response_class(PROFILER.collapsed(), mimetype='text/plain')
+    status, payload = excuse_metrics.toggle_profiler(request.get_json(silent=True))
+    return jsonify(payload), status
+
+@app.route('/debug/memory')
+def memory():
+    """Return the excuse pool's memory against its budgets and the pick distribution"""
+    _local_only()
+    return jsonify(excuse_metrics.memory_report(get_store()))
 
 if __name__ == '__main__':
+    # Development server; use serve.py for the production ASGI server
     app.run(debug=True)
@@ -0,0 +1,273 @@
+"""
+Excuse Generator ASGI App
+The Flask app's routes served directly on an ASGI event loop
+
+Same URLs and JSON bodies as app.py, sharing its ExcuseStore and route
+logic, but without WSGI, Werkzeug request objects or debug mode.  HEAD
+gets the GET headers without a body, and POST bodies over the route's
+limit are refused with 413 before they are fully read.  The
+index page and static files are rendered and read once at import.
+Requests are recorded in excuse_metrics under the same route templates
+Flask uses, and /metrics and the /debug routes are guarded as in app.py.
+
+Run it with serve.py, or any ASGI server:
+    uvicorn asgi:app --workers 4 --no-access-log
+"""
+
+import asyncio
+import json
+import mimetypes
+import os
+import time
+from urllib.parse import parse_qs
+
+import excuse_api
+import excuse_metrics
+from app import app as flask_app, diagnostics_allowed, get_store
+from excuse_metrics import METRICS, PROFILER
+
+_STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
+
+_EXCUSE_PREFIX = '/api/excuse/'
+_STATIC_ROUTE = '/static/<path:filename>'
+
+# Path -> (handler, largest body read)
+_POST_ROUTES = {
+    '/api/add-excuse': (excuse_api.add_excuse, excuse_api.MAX_EXCUSE_BODY),
+    '/api/add-excuses': (excuse_api.add_excuses, excuse_api.MAX_BATCH_BODY),
+}
+
+# Largest body read by POST /debug/profile, which takes {"running": bool}
+_MAX_PROFILE_BODY = 1024
+
+# _read_body result when the body is over its limit
+_TOO_LARGE = object()
+
+_JSON_HEADERS = [(b'content-type', b'application/json')]
+
+
+def _load_static_files():
+    """Read every static file once: url path -> (content type, body)"""
+    files = {}
+    for directory, _, names in os.walk(_STATIC_DIR):
+        for name in names:
+            path = os.path.join(directory, name)
+            url = '/static/' + os.path.relpath(path, _STATIC_DIR).replace(os.sep, '/')
+            content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            if content_type.startswith('text/') or content_type.endswith('javascript'):
+                content_type += '; charset=utf-8'
+            with open(path, 'rb') as stream:
+                files[url] = (content_type.encode('ascii'), stream.read())
+    return files
+
+
+def _render_index():
+    """Render the Jinja index page through Flask once"""
+    with flask_app.test_request_context('/'):
+        return flask_app.jinja_env.get_template('index.html').render().encode('utf-8')
+
+
+STATIC_FILES = _load_static_files()
+INDEX_PAGE = _render_index()
+
+
+async def _send(send, status, body, headers):
+    """Send a complete response with a Content-Length, keeping the connection open
+
+    Returns the status, which the dispatcher reports to the metrics.
+    """
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': headers + [(b'content-length', str(len(body)).encode('ascii'))]})
+    await send({'type': 'http.response.body', 'body': body})
+    return status
+
+
+async def _send_response(send, response):
+    """Send an excuse_api Response as JSON"""
+    headers = [(name.lower().encode('ascii'), value.encode('ascii'))
+               for name, value in response.headers]
+    return await _send(send, response.status, response.body, _JSON_HEADERS + headers)
+
+
+async def _not_found(send):
+    """Send the plain 404 used for unknown paths"""
+    return await _send(send, 404, b'Not Found', [(b'content-type', b'text/plain')])
+
+
+def _header(scope, name):
+    """Return a request header as text, or None"""
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+async def _read_body(scope, receive, limit):
+    """Collect the request body from http.request messages
+
+    Returns None if the client went away, or _TOO_LARGE as soon as the
+    declared or received length passes limit bytes.
+    """
+    length = _header(scope, b'content-length')
+    if length is not None and length.isdigit() and int(length) > limit:
+        return _TOO_LARGE
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            return _TOO_LARGE
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def _is_json(content_type):
+    """Whether a Content-Type is JSON by the rule Flask's request.is_json uses"""
+    mimetype = content_type.split(';')[0].strip().lower()
+    return (mimetype == 'application/json'
+            or (mimetype.startswith('application/') and mimetype.endswith('+json')))
+
+
+async def _post_json(scope, receive, send, handler, limit):
+    """Decode a JSON POST body like Flask does, then run handler(store, data)
+
+    Returns the status sent, or None if the client went away.
+    """
+    body = await _read_body(scope, receive, limit)
+    if body is None:
+        return None
+    if body is _TOO_LARGE:
+        return await _send_response(send, excuse_api.payload_too_large())
+    if not _is_json(_header(scope, b'content-type') or ''):
+        return await _send_response(send, excuse_api.unsupported_media_type())
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        return await _send_response(send, excuse_api.invalid_json())
+    # The SQLite insert runs off the event loop
+    return await _send_response(send, await asyncio.to_thread(handler, get_store(), data))
+
+
+async def _profile(scope, receive, send):
+    """GET or POST /debug/profile"""
+    if scope['method'] in ('GET', 'HEAD'):
+        return await _send(send, 200, PROFILER.collapsed().encode('utf-8'),
+                           [(b'content-type', b'text/plain; charset=utf-8')])
+    if scope['method'] != 'POST':
+        return await _send(send, 405, b'Method Not Allowed',
+                           [(b'content-type', b'text/plain'), (b'allow', b'GET, HEAD, POST')])
+    body = await _read_body(scope, receive, _MAX_PROFILE_BODY)
+    if body is None:
+        return None
+    if body is _TOO_LARGE:
+        return await _send(send, 413, b'Request Entity Too Large',
+                           [(b'content-type', b'text/plain')])
+    try:
+        data = json.loads(body)
+    except ValueError:
+        data = None
+    status, payload = excuse_metrics.toggle_profiler(data)
+    return await _send(send, status, json.dumps(payload).encode('utf-8'), _JSON_HEADERS)
+
+
+async def _lifespan(receive, send):
+    """Acknowledge server startup and shutdown"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Open the store before the first request rather than during it
+            get_store()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+def _headers_only(send):
+    """Wrap send so that a HEAD response keeps its headers but drops the body"""
+    async def send_head(message):
+        if message['type'] == 'http.response.body':
+            message = dict(message, body=b'')
+        await send(message)
+    return send_head
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+    if scope['method'] == 'HEAD':
+        send = _headers_only(send)
+    start = time.perf_counter_ns()
+    try:
+        route, status = await _dispatch(scope, receive, send)
+    except BaseException:
+        METRICS.record(excuse_metrics.UNMATCHED, 500, time.perf_counter_ns() - start)
+        raise
+    if status is not None:
+        METRICS.record(route, status, time.perf_counter_ns() - start)
+
+
+async def _dispatch(scope, receive, send):
+    """Route one HTTP request; return (route template, status sent)"""
+    path = scope['path']
+    method = scope['method']
+    if path in _POST_ROUTES:
+        if method == 'POST':
+            return path, await _post_json(scope, receive, send, *_POST_ROUTES[path])
+        return excuse_metrics.UNMATCHED, await _send(
+            send, 405, b'Method Not Allowed',
+            [(b'content-type', b'text/plain'), (b'allow', b'POST')])
+
+    if path in ('/metrics', '/debug/profile', '/debug/memory'):
+        client = scope.get('client')
+        if not diagnostics_allowed(client[0] if client else None):
+            return path, await _send(send, 403, b'Forbidden', [(b'content-type', b'text/plain')])
+        if path == '/debug/profile':
+            return path, await _profile(scope, receive, send)
+
+    if method not in ('GET', 'HEAD'):
+        return excuse_metrics.UNMATCHED, await _send(
+            send, 405, b'Method Not Allowed',
+            [(b'content-type', b'text/plain'), (b'allow', b'GET, HEAD')])
+
+    if path == '/api/random-excuse':
+        return path, await _send_response(send, excuse_api.random_excuse(get_store()))
+    if path == '/api/excuses':
+        if_none_match = _header(scope, b'if-none-match')
+        return path, await _send_response(
+            send, excuse_api.list_categories(get_store(), if_none_match))
+    if path.startswith(_EXCUSE_PREFIX) and '/' not in path[len(_EXCUSE_PREFIX):]:
+        category = path[len(_EXCUSE_PREFIX):]
+        if category:
+            return '/api/excuse/<category>', await _send_response(
+                send, excuse_api.excuse_from(get_store(), category))
+        return excuse_metrics.UNMATCHED, await _not_found(send)
+    if path == '/api/excuses/sample':
+        query = parse_qs(scope['query_string'].decode('latin-1'))
+        return path, await _send_response(send, excuse_api.sample_excuses(
+            get_store(), query.get('n', ['1'])[0], query.get('category', [None])[0],
+            query.get('replace', ['true'])[0]))
+    if path == '/api/stats':
+        return path, await _send_response(send, excuse_api.stats())
+    if path == '/metrics':
+        return path, await _send(send, 200, excuse_metrics.render(),
+                                 [(b'content-type', excuse_metrics.CONTENT_TYPE.encode('ascii'))])
+    if path == '/debug/memory':
+        report = json.dumps(excuse_metrics.memory_report(get_store())).encode('utf-8')
+        return path, await _send(send, 200, report, _JSON_HEADERS)
+    if path == '/':
+        return path, await _send(send, 200, INDEX_PAGE,
+                                 [(b'content-type', b'text/html; charset=utf-8')])
+    if path in STATIC_FILES:
+        content_type, body = STATIC_FILES[path]
+        return _STATIC_ROUTE, await _send(send, 200, body, [(b'content-type', content_type)])
+    return excuse_metrics.UNMATCHED, await _not_found(send)
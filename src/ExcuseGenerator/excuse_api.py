@@ -0,0 +1,256 @@
+"""
+Excuse API
+Route logic shared by the Flask app and the ASGI server
+
+Each handler takes the ExcuseStore and returns a Response of ready-made
+JSON bytes, so both front ends serve identical URLs, bodies and headers.
+
+Bodies are serialized once and reused:
+
+- the category list is cached on the store's current snapshot and carries
+  an ETag, so clients revalidating with If-None-Match get a 304 and no body
+- each (category, excuse) pair is encoded the first time it is picked,
+  in a cache that is emptied whenever it reaches MAX_CACHED_BODIES
+- the fixed error bodies are encoded at import
+
+Bulk responses are assembled by joining the cached per-pick bytes.
+
+STATS counts responses, bytes, serialization work and the time spent
+picking excuses in this process.
+"""
+
+import json
+import time
+from collections import namedtuple
+
+# Most excuses one bulk request may fetch or add
+MAX_SAMPLE = 1000
+MAX_BATCH = 10000
+
+# Longest category name and excuse text accepted, in characters
+MAX_CATEGORY_LENGTH = 100
+MAX_EXCUSE_LENGTH = 1000
+
+# Largest request bodies read, in bytes: room for every character escaped as \uXXXX
+MAX_EXCUSE_BODY = 6 * (MAX_CATEGORY_LENGTH + MAX_EXCUSE_LENGTH) + 64
+MAX_BATCH_BODY = MAX_BATCH * MAX_EXCUSE_BODY
+
+# Encoded picks kept before the cache is emptied, so it cannot outgrow the pool
+MAX_CACHED_BODIES = 10000
+
+Response = namedtuple('Response', 'body status headers')
+
+# Revalidate on every use: the category list changes whenever an excuse is added
+CACHE_REVALIDATE = 'no-cache'
+# Random picks must never be replayed from a cache
+CACHE_NEVER = 'no-store'
+
+STATS = {
+    'responses': 0,
+    'not_modified': 0,
+    'bytes_served': 0,
+    'serializations': 0,
+    'serialization_ns': 0,
+    'picks': 0,
+    'pick_ns': 0,
+}
+
+_excuse_bodies = {}    # (category, excuse) -> encoded pick
+
+
+def _encode(payload):
+    """Serialize a payload to compact JSON bytes, counting the work"""
+    start = time.perf_counter_ns()
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    STATS['serialization_ns'] += time.perf_counter_ns() - start
+    STATS['serializations'] += 1
+    return body
+
+
+def _respond(body, status, cache_control, etag=None):
+    """Build a Response and count the bytes it serves"""
+    STATS['responses'] += 1
+    STATS['bytes_served'] += len(body)
+    headers = [('Cache-Control', cache_control)]
+    if etag is not None:
+        headers.append(('ETag', etag))
+    return Response(body, status, headers)
+
+
+def _error(message, status):
+    """Return a function answering with a fixed, pre-encoded error body"""
+    body = _encode({'error': message})
+
+    def respond():
+        return _respond(body, status, CACHE_NEVER)
+    return respond
+
+
+category_not_found = _error('Category not found', 404)
+missing_fields = _error('Missing category or excuse', 400)
+invalid_json = _error('Invalid JSON body', 400)
+unsupported_media_type = _error('Content-Type must be application/json', 415)
+payload_too_large = _error('Request body too large', 413)
+
+INVALID_EXCUSE = (f'category and excuse must be strings of 1 to {MAX_CATEGORY_LENGTH}'
+                  f' and 1 to {MAX_EXCUSE_LENGTH} characters')
+invalid_excuse = _error(INVALID_EXCUSE, 400)
+
+invalid_count = _error(f'n must be an integer from 1 to {MAX_SAMPLE}', 400)
+invalid_replace = _error('replace must be true or false', 400)
+batch_not_list = _error(f'Body must be a list of 1 to {MAX_BATCH} excuses', 400)
+
+_ADDED = _encode({'success': True, 'message': 'Excuse added successfully'})
+_DUPLICATE = _encode({'success': True, 'duplicate': True, 'message': 'Excuse already exists'})
+
+
+def _etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header value covers etag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(','))
+    return etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+
+def list_categories(store, if_none_match=None):
+    """Response for GET /api/excuses"""
+    sampler = store.snapshot()
+    cached = sampler.responses.get('categories')
+    if cached is None or cached[0] != sampler.version:
+        cached = sampler.responses['categories'] = (sampler.version, _encode(sampler.categories),
+                                                    f'"categories-{sampler.version}"')
+    _, body, etag = cached
+    if _etag_matches(if_none_match, etag):
+        STATS['not_modified'] += 1
+        return _respond(b'', 304, CACHE_REVALIDATE, etag)
+    return _respond(body, 200, CACHE_REVALIDATE, etag)
+
+
+def _count_pick(start):
+    """Count one random pick that began at perf_counter_ns() start"""
+    STATS['pick_ns'] += time.perf_counter_ns() - start
+    STATS['picks'] += 1
+
+
+def _pick_body(category, excuse):
+    """Return the encoded pick for a pair, encoding each pair only once"""
+    key = (category, excuse)
+    body = _excuse_bodies.get(key)
+    if body is None:
+        if len(_excuse_bodies) >= MAX_CACHED_BODIES:
+            _excuse_bodies.clear()
+        body = _excuse_bodies[key] = _encode({'category': category, 'excuse': excuse})
+    return body
+
+
+def cached_bodies():
+    """Number of encoded picks currently cached"""
+    return len(_excuse_bodies)
+
+
+def _pick(category, excuse):
+    """Response for a single picked excuse"""
+    return _respond(_pick_body(category, excuse), 200, CACHE_NEVER)
+
+
+def excuse_from(store, category):
+    """Response for GET /api/excuse/<category>"""
+    start = time.perf_counter_ns()
+    sampler = store.snapshot()
+    if category not in sampler:
+        return category_not_found()
+    excuse = sampler.choice(category)
+    _count_pick(start)
+    return _pick(category, excuse)
+
+
+def random_excuse(store):
+    """Response for GET /api/random-excuse"""
+    start = time.perf_counter_ns()
+    category, excuse = store.snapshot().sample()
+    _count_pick(start)
+    return _pick(category, excuse)
+
+
+def valid_excuse(category, excuse):
+    """Whether a category and excuse are non-empty strings within the length limits"""
+    return (isinstance(category, str) and isinstance(excuse, str)
+            and 0 < len(category) <= MAX_CATEGORY_LENGTH and 0 < len(excuse) <= MAX_EXCUSE_LENGTH)
+
+
+def add_excuse(store, data):
+    """Response for POST /api/add-excuse, given the decoded JSON body
+
+    An excuse already stored in the category is not added again.
+    """
+    if not isinstance(data, dict) or 'category' not in data or 'excuse' not in data:
+        return missing_fields()
+    if not valid_excuse(data['category'], data['excuse']):
+        return invalid_excuse()
+    added = store.add(data['category'], data['excuse'])
+    return _respond(_ADDED if added else _DUPLICATE, 200, CACHE_NEVER)
+
+
+def sample_excuses(store, n='1', category=None, replace='true'):
+    """Response for GET /api/excuses/sample?n=&category=&replace=
+
+    Query values arrive as strings; replace=false samples without
+    replacement and may return fewer than n excuses.
+    """
+    try:
+        count = int(n)
+    except (TypeError, ValueError):
+        return invalid_count()
+    if not 1 <= count <= MAX_SAMPLE:
+        return invalid_count()
+    flag = (replace or 'true').lower()
+    if flag not in ('true', 'false', '1', '0'):
+        return invalid_replace()
+    start = time.perf_counter_ns()
+    sampler = store.snapshot()
+    if category is not None and category not in sampler:
+        return category_not_found()
+    picks = sampler.sample_many(count, category, replace=flag in ('true', '1'))
+    _count_pick(start)
+    body = b'{"excuses":[' + b','.join([_pick_body(*pick) for pick in picks]) + b']}'
+    return _respond(body, 200, CACHE_NEVER)
+
+
+def add_excuses(store, data):
+    """Response for POST /api/add-excuses: a JSON list of {category, excuse}
+
+    Every item is validated before any is stored, and all are stored in
+    one transaction.  Excuses already stored are counted as duplicates.
+    """
+    if not isinstance(data, list) or not 1 <= len(data) <= MAX_BATCH:
+        return batch_not_list()
+    pairs = []
+    for index, item in enumerate(data):
+        if not isinstance(item, dict) or 'category' not in item or 'excuse' not in item:
+            return _respond(_encode({'error': f'Item {index} is missing category or excuse'}),
+                            400, CACHE_NEVER)
+        if not valid_excuse(item['category'], item['excuse']):
+            return _respond(_encode({'error': f'Item {index} has an invalid category or excuse'}),
+                            400, CACHE_NEVER)
+        pairs.append((item['category'], item['excuse']))
+    added = store.add_many(pairs)
+    body = _encode({'success': True, 'added': added, 'duplicates': len(pairs) - added,
+                    'message': f'{added} excuses added successfully'})
+    return _respond(body, 200, CACHE_NEVER)
+
+
+def stats():
+    """Response for GET /api/stats: this process's counters and averages"""
+    snapshot = dict(STATS)
+    responses = snapshot['responses'] or 1
+    serializations = snapshot['serializations'] or 1
+    picks = snapshot['picks'] or 1
+    snapshot['bytes_per_response'] = snapshot['bytes_served'] / responses
+    snapshot['serialization_us_avg'] = snapshot['serialization_ns'] / serializations / 1000
+    snapshot['pick_us_avg'] = snapshot['pick_ns'] / picks / 1000
+    # Encoded directly: the stats must not count their own serialization
+    body = json.dumps(snapshot, separators=(',', ':')).encode('utf-8')
+    return Response(body, 200, [('Cache-Control', CACHE_NEVER)])
+
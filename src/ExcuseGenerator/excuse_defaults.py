@@ -0,0 +1,63 @@
+"""
+Excuse Defaults
+Built-in excuses and ExcuseStore settings shared by every front end
+
+Kept apart from app.py so the command line (src/cli.py) can open the
+store, or read a snapshot of it, without importing Flask.
+"""
+
+import os
+
+# List of excuses categorized by type
+EXCUSES = {
+    "forgot_event": [
+        "My phone calendar glitched and didn't send me any reminders.",
+        "I set it in my calendar for next week by accident.",
+        "I was preparing a surprise for you and got completely sidetracked.",
+        "I had it written down but my notes app crashed and lost it.",
+        "The notification came through but I was driving and forgot after.",
+    ],
+    "late_home": [
+        "Traffic was horrible because of an accident on the highway.",
+        "My boss called an emergency meeting right when I was leaving.",
+        "I stopped to help someone with a flat tire.",
+        "I took a detour to pick something up for us.",
+        "My car wouldn't start and I had to wait for help.",
+    ],
+    "forgot_chore": [
+        "I was in the middle of it when an urgent work email came through.",
+        "I started, but then realized we were out of supplies.",
+        "I thought we agreed you'd handle that this week.",
+        "I did it but must have done it wrong, let me fix it.",
+        "I got halfway through and got called away for something urgent.",
+    ],
+    "general": [
+        "I was planning something special for our anniversary and got distracted.",
+        "My phone died so I couldn't let you know.",
+        "I thought I told you about this last week.",
+        "I've been so stressed about work that it completely slipped my mind.",
+        "My alarm didn't go off this morning and threw off my whole day.",
+    ]
+}
+
+# Relative weight of each category for random excuses, e.g. {"general": 2.0};
+# None picks categories in proportion to how many excuses they hold
+CATEGORY_WEIGHTS = None
+
+# SQLite file shared by every worker process; EXCUSES seeds it on first run
+DATABASE = os.environ.get('EXCUSE_DB', os.path.join(os.path.dirname(__file__), 'excuses.db'))
+
+# Approximate memory budgets in bytes for all stored excuses and for each
+# category (None for no limit), and which excuses are evicted first when one
+# is exceeded: 'lru' (least recently served) or 'oldest'
+MAX_EXCUSE_BYTES = 64 * 1024 * 1024
+MAX_CATEGORY_BYTES = 4 * 1024 * 1024
+EVICTION_POLICY = 'lru'
+
+
+def open_store(path=None):
+    """Open the ExcuseStore at path (default DATABASE) with the settings above"""
+    from excuse_store import ExcuseStore  # sqlite3 and json load only when a store is opened
+    return ExcuseStore(DATABASE if path is None else path, seed=EXCUSES,
+                       weights=CATEGORY_WEIGHTS, max_bytes=MAX_EXCUSE_BYTES,
+                       category_max_bytes=MAX_CATEGORY_BYTES, eviction=EVICTION_POLICY)
@@ -0,0 +1,321 @@
+"""
+Excuse Metrics
+Per-route latency histograms, request counters and a sampling profiler
+
+app.py and asgi.py call METRICS.record() once per request with the route
+template, status and elapsed nanoseconds; the cost is one lock, one bisect
+and a few integer additions.  render() formats these, the excuse_api
+counters and the time spent per phase (JSON encoding, random picks,
+template rendering) in the Prometheus text format for GET /metrics.
+
+PROFILER samples every thread's stack from a background thread while it is
+running, and can be started and stopped at runtime through
+POST /debug/profile; GET /debug/profile returns the sampled stacks in the
+collapsed format flamegraph tools read.
+
+memory_report() answers GET /debug/memory with the excuse pool's
+approximate size against its budgets, the process RSS and, per category,
+the expected and observed share of random picks.
+
+Everything is counted per process, so with several workers each one
+reports only the requests it served.
+"""
+
+import heapq
+import os
+import sys
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+import excuse_api
+
+# Upper bounds in seconds of the latency histogram buckets; +Inf is implied
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Seconds between profiler samples, and the deepest stack one records
+PROFILE_INTERVAL = 0.005
+PROFILE_DEPTH = 48
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Route label for requests that matched no route
+UNMATCHED = 'unmatched'
+
+# Categories listed by GET /debug/memory, largest first
+REPORT_CATEGORIES = 50
+
+
+class _RouteStats:
+    """Latency histogram and status counts for one route"""
+
+    __slots__ = ('buckets', 'sum_ns', 'statuses')
+
+    def __init__(self, buckets):
+        self.buckets = [0] * (buckets + 1)  # per bucket, not cumulative; last is +Inf
+        self.sum_ns = 0
+        self.statuses = {}
+
+
+class RequestMetrics:
+    """Request counters, per-route latency histograms and phase timers"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.enabled = True
+        self.buckets = tuple(buckets)
+        self._bounds_ns = tuple(round(bound * 1e9) for bound in self.buckets)
+        self._routes = {}
+        self._phases = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, status, elapsed_ns):
+        """Count one request to a route template with its status and latency"""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = _RouteStats(len(self._bounds_ns))
+            stats.buckets[bisect_left(self._bounds_ns, elapsed_ns)] += 1
+            stats.sum_ns += elapsed_ns
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def add_phase(self, phase, elapsed_ns):
+        """Count time spent in one named phase of request handling"""
+        if not self.enabled:
+            return
+        with self._lock:
+            calls, total_ns = self._phases.get(phase, (0, 0))
+            self._phases[phase] = (calls + 1, total_ns + elapsed_ns)
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._routes = {}
+            self._phases = {}
+
+    def routes(self):
+        """Return {route: (cumulative bucket counts, sum in ns, {status: count})}"""
+        with self._lock:
+            items = [(route, list(stats.buckets), stats.sum_ns, dict(stats.statuses))
+                     for route, stats in self._routes.items()]
+        routes = {}
+        for route, buckets, sum_ns, statuses in items:
+            running = 0
+            cumulative = []
+            for count in buckets:
+                running += count
+                cumulative.append(running)
+            routes[route] = (cumulative, sum_ns, statuses)
+        return routes
+
+    def phases(self):
+        """Return {phase: (calls, total ns)}, including the excuse_api timers"""
+        stats = excuse_api.STATS
+        phases = {'encode': (stats['serializations'], stats['serialization_ns']),
+                  'pick': (stats['picks'], stats['pick_ns'])}
+        with self._lock:
+            phases.update(self._phases)
+        return phases
+
+
+class SamplingProfiler:
+    """Counts the stacks of every other thread at a fixed interval while running"""
+
+    def __init__(self, interval=PROFILE_INTERVAL, depth=PROFILE_DEPTH):
+        self.interval = interval
+        self.depth = depth
+        self.samples = 0
+        self._stacks = Counter()
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        """Whether the sampling thread is active"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=None):
+        """Start sampling, optionally at a new interval; no-op if running"""
+        with self._lock:
+            if interval is not None:
+                if interval <= 0:
+                    raise ValueError("interval must be positive")
+                self.interval = interval
+            if self.running:
+                return
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                            name='excuse-profiler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the thread; the samples are kept"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stop.set()
+        if thread is not None:
+            thread.join()
+
+    def reset(self):
+        """Discard the samples taken so far"""
+        with self._lock:
+            self._stacks = Counter()
+            self.samples = 0
+
+    def collapsed(self):
+        """Return the samples as 'outer;...;inner count' lines, most frequent first"""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def _run(self, stop):
+        """Sample until stop is set"""
+        own = threading.get_ident()
+        while not stop.wait(self.interval):
+            frames = sys._current_frames()
+            stacks = []
+            for ident, frame in frames.items():
+                if ident != own:
+                    stacks.append(self._stack(frame))
+            del frames
+            with self._lock:
+                self._stacks.update(stacks)
+                self.samples += 1
+
+    def _stack(self, frame):
+        """Collapse a frame and its callers into 'outer;...;inner'"""
+        names = []
+        while frame is not None and len(names) < self.depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+
+METRICS = RequestMetrics()
+PROFILER = SamplingProfiler()
+
+
+def is_local(address):
+    """Whether a client address is loopback; None (a Unix socket or test client) counts"""
+    return address is None or address == '::1' or address.startswith(('127.', '::ffff:127.'))
+
+
+def _labels(**labels):
+    """Format Prometheus labels, escaping their values"""
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"')
+                         .replace('\n', r'\n'))
+        for name, value in labels.items())
+
+
+def _header(lines, name, kind, text):
+    """Append the HELP and TYPE lines of one metric family"""
+    lines.append(f"# HELP {name} {text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def render(metrics=None, profiler=None):
+    """Return everything in the Prometheus text exposition format, as bytes"""
+    metrics = metrics or METRICS
+    profiler = profiler or PROFILER
+    routes = sorted(metrics.routes().items())
+    lines = []
+
+    _header(lines, 'excuse_requests_total', 'counter', 'Requests served, by route and status')
+    for route, (_, _, statuses) in routes:
+        for status, count in sorted(statuses.items()):
+            lines.append(f"excuse_requests_total{{{_labels(route=route, status=status)}}} {count}")
+
+    _header(lines, 'excuse_request_errors_total', 'counter',
+            'Requests answered with a 5xx status, by route')
+    for route, (_, _, statuses) in routes:
+        errors = sum(count for status, count in statuses.items() if status >= 500)
+        lines.append(f"excuse_request_errors_total{{{_labels(route=route)}}} {errors}")
+
+    _header(lines, 'excuse_request_duration_seconds', 'histogram',
+            'Time spent handling a request, by route')
+    for route, (cumulative, sum_ns, _) in routes:
+        for bound, count in zip(metrics.buckets + ('+Inf',), cumulative):
+            lines.append("excuse_request_duration_seconds_bucket"
+                         f"{{{_labels(route=route, le=bound)}}} {count}")
+        lines.append(f"excuse_request_duration_seconds_sum{{{_labels(route=route)}}}"
+                     f" {sum_ns / 1e9:.9f}")
+        lines.append(f"excuse_request_duration_seconds_count{{{_labels(route=route)}}}"
+                     f" {cumulative[-1]}")
+
+    phases = sorted(metrics.phases().items())
+    _header(lines, 'excuse_phase_seconds_total', 'counter',
+            'Time spent in JSON encoding, random picks and template rendering')
+    for phase, (_, total_ns) in phases:
+        lines.append(f"excuse_phase_seconds_total{{{_labels(phase=phase)}}} {total_ns / 1e9:.9f}")
+    _header(lines, 'excuse_phase_calls_total', 'counter', 'Times each phase ran')
+    for phase, (calls, _) in phases:
+        lines.append(f"excuse_phase_calls_total{{{_labels(phase=phase)}}} {calls}")
+
+    stats = excuse_api.STATS
+    _header(lines, 'excuse_response_bytes_total', 'counter', 'JSON response body bytes served')
+    lines.append(f"excuse_response_bytes_total {stats['bytes_served']}")
+    _header(lines, 'excuse_not_modified_total', 'counter', 'Category lists answered with 304')
+    lines.append(f"excuse_not_modified_total {stats['not_modified']}")
+
+    _header(lines, 'excuse_profiler_running', 'gauge', 'Whether the sampling profiler is on')
+    lines.append(f"excuse_profiler_running {int(profiler.running)}")
+    _header(lines, 'excuse_profiler_samples_total', 'counter', 'Profiler sampling rounds taken')
+    lines.append(f"excuse_profiler_samples_total {profiler.samples}")
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def toggle_profiler(data, profiler=None):
+    """Apply a POST /debug/profile body: {"enabled": bool, "interval": s, "reset": bool}
+
+    Returns (status, JSON-ready payload).
+    """
+    profiler = profiler or PROFILER
+    if not isinstance(data, dict) or not isinstance(data.get('enabled'), bool):
+        return 400, {'error': 'Body must be {"enabled": true or false}'}
+    interval = data.get('interval')
+    if interval is not None and (isinstance(interval, bool)
+                                 or not isinstance(interval, (int, float)) or interval <= 0):
+        return 400, {'error': 'interval must be a positive number of seconds'}
+    if data.get('reset'):
+        profiler.reset()
+    if data['enabled']:
+        profiler.start(interval)
+    else:
+        profiler.stop()
+    return 200, {'enabled': profiler.running, 'interval': profiler.interval,
+                 'samples': profiler.samples}
+
+
+def rss_bytes():
+    """Resident memory of this process in bytes, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as stream:
+            return int(stream.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def memory_report(store, limit=REPORT_CATEGORIES):
+    """Return the GET /debug/memory payload for an ExcuseStore
+
+    Lists the limit largest categories with their expected share of
+    random picks and the share this process actually served, which also
+    counts picks from a single category.
+    """
+    report = store.memory_usage()
+    report['rss_bytes'] = rss_bytes()
+    report['cached_bodies'] = excuse_api.cached_bodies()
+    distribution = store.snapshot().distribution()
+    report['picks'] = picks = sum(entry[4] for entry in distribution)
+    report['by_category'] = [
+        {'category': name, 'excuses': count, 'bytes': size,
+         'expected_share': round(expected, 6), 'picks': served,
+         'served_share': round(served / picks, 6) if picks else 0.0}
+        for name, count, size, expected, served
+        in heapq.nlargest(limit, distribution, key=lambda entry: entry[2])]
+    return report
@@ -0,0 +1,461 @@
+"""
+Excuse Sampler
+Constant-time random and weighted excuse picks over a flat excuse pool
+"""
+
+import heapq
+import itertools
+import random
+import sys
+from array import array
+from bisect import bisect_left
+
+# Approximate bytes of bookkeeping per stored excuse on top of its string:
+# pool slot, owner, category member, row id and last-served tick
+EXCUSE_OVERHEAD = 32
+
+# Approximate bytes per category on top of its name: member array, id
+# mapping and per-category counters
+CATEGORY_OVERHEAD = 200
+
+EVICTION_POLICIES = ('lru', 'oldest')
+
+
+def _intern(text):
+    """Return the interned copy of a string; other values pass through"""
+    return sys.intern(text) if type(text) is str else text
+
+
+class _ServedSince:
+    """Last-served ticks of a sampler whose copy took over its array
+
+    Reads fall through to the shared array unless this sampler served the
+    excuse since the copy; writes stay here, so the copy never sees them.
+    """
+
+    __slots__ = ('_shared', '_ticks')
+
+    def __init__(self, shared):
+        self._shared = shared
+        self._ticks = {}
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return array('Q', [self[index] for index in range(*position.indices(len(self._shared)))])
+        tick = self._ticks.get(position)
+        return self._shared[position] if tick is None else tick
+
+    def __setitem__(self, position, tick):
+        self._ticks[position] = tick
+
+
+class ExcuseSampler:
+    """Flat pool of excuses with O(1) uniform and weighted sampling
+
+    Every excuse lives once in a flat list, and each category keeps an
+    array of its positions in that list.  Picks never build lists:
+
+    - with no configured weights, a category is chosen in proportion to
+      its size, which is the same as one uniform index into the pool
+    - with configured weights, categories are chosen through a Walker/Vose
+      alias table, rebuilt only when a new category appears
+
+    Appending to an existing category is O(1) and leaves the alias table
+    alone, since a category's weight does not depend on its size.
+
+    Each excuse also carries a row id (its database id, increasing with
+    pool position) and the tick it was last served, and each category
+    counts its picks, so memory budgets can be enforced by dropping the
+    least recently served or oldest excuses.  Removal is done in batches
+    by without(), which builds a compact new sampler.  Category names and
+    excuse texts are interned, so the same text in several categories is
+    stored once.
+
+    The pool is append-only, so copy() shares it: each sampler only sees
+    the first _size excuses and the first _counts[id] members of each
+    category.  The usage counters are written by every pick, so the copy
+    takes over the last-served array and the original, still held by
+    readers of the old snapshot, keeps its later ticks in a dict on the
+    side; a copy costs O(categories) however large the pool (copying
+    the original again takes a private array).  A sampler
+    that finds the shared pool extended past its view by a copy, or that
+    has handed its counters to one, detaches onto a private prefix before
+    adding, so copies never see each other's additions.
+
+    version counts the excuses ever added, so it changes on every write and
+    samplers built from the same additions agree on it.  responses holds
+    bodies the API has encoded from this sampler; copies start empty.
+    """
+
+    def __init__(self, excuses=None, weights=None, default_weight=1.0, rng=None):
+        self._excuses = []          # pool position -> excuse text (shared)
+        self._owners = array('I')   # pool position -> category id (shared)
+        self._names = []            # category id -> category name (shared)
+        self._ids = {}              # category name -> category id (shared)
+        self._members = []          # category id -> array of pool positions (shared)
+        self._row_ids = array('Q')  # pool position -> database row id (shared)
+        self._served = array('Q')   # pool position -> tick it was last served (handed to copies)
+        self._picks = array('Q')    # category id -> times served (copied)
+        self._ticks = itertools.count(1)
+        self._size = 0              # excuses visible to this sampler
+        self._counts = array('I')   # category id -> members visible to this sampler
+        self._bytes = 0             # approximate memory of the visible pool
+        self._category_bytes = array('Q')  # category id -> approximate memory
+        self._weights = None if weights is None else dict(weights)
+        self._default_weight = default_weight
+        self._alias_probability = array('d')
+        self._alias = array('I')
+        self._rng = rng or random
+        self._random = self._rng.random
+        self.version = 0
+        self.responses = {}
+        for category, texts in (excuses or {}).items():
+            for text in texts:
+                self.add(category, text)
+
+    @classmethod
+    def from_columns(cls, names, owners, excuses, row_ids=None, **options):
+        """Rebuild a sampler from to_columns() output without re-adding excuses
+
+        row_ids defaults to 1, 2, 3, ... in pool order.
+        """
+        sampler = cls(**options)
+        sampler._names = [_intern(name) for name in names]
+        sampler._ids = {name: category_id for category_id, name in enumerate(sampler._names)}
+        sampler._owners = array('I', owners)
+        sampler._excuses = [_intern(excuse) for excuse in excuses]
+        sampler._members = [array('I') for _ in sampler._names]
+        appends = [members.append for members in sampler._members]
+        for position, owner in enumerate(sampler._owners):
+            appends[owner](position)
+        sampler._size = len(sampler._excuses)
+        sampler._row_ids = array('Q', range(1, sampler._size + 1) if row_ids is None else row_ids)
+        sampler._served = array('Q', [0]) * sampler._size
+        sampler._picks = array('Q', [0]) * len(sampler._names)
+        sampler._counts = array('I', [len(members) for members in sampler._members])
+        sampler._measure()
+        sampler.version = sampler._size
+        if sampler._weights is not None and sampler._names:
+            sampler._build_alias_table()
+        return sampler
+
+    def to_columns(self):
+        """Return (category names, category id per excuse, excuses, row ids) for storage"""
+        return (self._names[:len(self._counts)], self._owners[:self._size],
+                self._excuses[:self._size], self._row_ids[:self._size])
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, category):
+        category_id = self._ids.get(category)
+        return category_id is not None and category_id < len(self._counts)
+
+    @property
+    def categories(self):
+        """Category names in the order they were first added"""
+        return self._names[:len(self._counts)]
+
+    def excuses(self, category):
+        """Return the excuses of one category, oldest first"""
+        category_id = self._category_id(category)
+        excuses = self._excuses
+        members = self._members[category_id][:self._counts[category_id]]
+        return [excuses[position] for position in members]
+
+    def memory_usage(self, category=None):
+        """Approximate bytes held by the pool, or by one category"""
+        if category is None:
+            return self._bytes
+        return self._category_bytes[self._category_id(category)]
+
+    def over_budget(self, max_bytes=None, category_max_bytes=None):
+        """Whether the pool or any category is above its byte budget (None: no limit)"""
+        if max_bytes is not None and self._bytes > max_bytes:
+            return True
+        return (category_max_bytes is not None and len(self._category_bytes) > 0
+                and max(self._category_bytes) > category_max_bytes)
+
+    def copy(self):
+        """Return a sampler with the same excuses that can be extended on its own"""
+        clone = object.__new__(ExcuseSampler)
+        clone.__dict__.update(self.__dict__)
+        clone.responses = {}
+        clone._counts = array('I', self._counts)
+        clone._category_bytes = array('Q', self._category_bytes)
+        # Picks from readers still holding this sampler must not reach the
+        # copy: it takes the served array, and this sampler writes aside
+        if type(self._served) is _ServedSince:
+            clone._served = self._served[:self._size]
+        else:
+            self._served = _ServedSince(self._served)
+        self._picks = array('Q', self._picks)
+        return clone
+
+    def add(self, category, excuse, row_id=None):
+        """Append an excuse, creating its category if needed
+
+        row_id must be larger than every row id already in the pool; it
+        defaults to one more than the last.
+        """
+        if len(self._excuses) != self._size or type(self._served) is _ServedSince:
+            self._detach()
+        if row_id is None:
+            row_id = self._row_ids[self._size - 1] + 1 if self._size else 1
+        category_id = self._ids.get(category)
+        if category_id is None:
+            category = _intern(category)
+            category_id = self._ids[category] = len(self._names)
+            self._names.append(category)
+            self._members.append(array('I'))
+            self._counts.append(0)
+            self._picks.append(0)
+            self._category_bytes.append(CATEGORY_OVERHEAD + sys.getsizeof(category))
+            self._bytes += self._category_bytes[category_id]
+            if self._weights is not None:
+                self._build_alias_table()
+        excuse = _intern(excuse)
+        size = sys.getsizeof(excuse) + EXCUSE_OVERHEAD
+        self._members[category_id].append(self._size)
+        self._counts[category_id] += 1
+        self._category_bytes[category_id] += size
+        self._bytes += size
+        self._owners.append(category_id)
+        self._excuses.append(excuse)
+        self._row_ids.append(row_id)
+        # New excuses count as just served, so LRU eviction does not take them first
+        self._served.append(next(self._ticks))
+        self._size += 1
+        self.version += 1
+
+    def choice(self, category):
+        """Return a uniformly random excuse from one category"""
+        category_id = self._category_id(category)
+        position = self._members[category_id][int(self._random() * self._counts[category_id])]
+        self._served[position] = next(self._ticks)
+        self._picks[category_id] += 1
+        return self._excuses[position]
+
+    def sample(self):
+        """Return a weighted random (category, excuse) pair"""
+        if not self._size:
+            raise IndexError("no excuses to sample from")
+        if self._weights is None:
+            position = int(self._random() * self._size)
+            category_id = self._owners[position]
+        else:
+            scaled = self._random() * len(self._counts)
+            category_id = int(scaled)
+            if scaled - category_id >= self._alias_probability[category_id]:
+                category_id = self._alias[category_id]
+            position = self._members[category_id][int(self._random() * self._counts[category_id])]
+        self._served[position] = next(self._ticks)
+        self._picks[category_id] += 1
+        return self._names[category_id], self._excuses[position]
+
+    def sample_many(self, count, category=None, replace=True):
+        """Return count (category, excuse) pairs, from one category if given
+
+        With replace=False no excuse repeats, and fewer than count pairs
+        come back when the pool (or category) is smaller than count.
+        """
+        if category is not None:
+            category_id = self._category_id(category)
+            members = self._members[category_id]
+            size = self._counts[category_id]
+            if replace:
+                positions = [members[int(self._random() * size)] for _ in range(count)]
+            else:
+                positions = self._rng.sample(members[:size], min(count, size))
+        elif replace:
+            return [self.sample() for _ in range(count)]
+        elif self._weights is None:
+            positions = self._rng.sample(range(self._size), min(count, self._size))
+        else:
+            positions = self._weighted_positions(count)
+        names, owners, excuses = self._names, self._owners, self._excuses
+        served, picks, ticks = self._served, self._picks, self._ticks
+        for position in positions:
+            served[position] = next(ticks)
+            picks[owners[position]] += 1
+        return [(names[owners[position]], excuses[position]) for position in positions]
+
+    def distribution(self):
+        """Return (category, excuses, bytes, expected share, picks) per category
+
+        The expected share is the chance that sample() picks the category:
+        its share of the pool, or of the configured weights.  picks counts
+        the excuses actually served from it by this sampler, including
+        those served by the sampler it was copied from before the copy.
+        """
+        count = len(self._counts)
+        if self._weights is None:
+            shares = [size / (self._size or 1) for size in self._counts]
+        else:
+            weights = [max(self._weights.get(name, self._default_weight), 0.0)
+                       for name in self._names[:count]]
+            shares = [weight / (sum(weights) or 1.0) for weight in weights]
+        return [(self._names[category_id], self._counts[category_id],
+                 self._category_bytes[category_id], shares[category_id],
+                 self._picks[category_id]) for category_id in range(count)]
+
+    def positions_of(self, row_ids):
+        """Return the pool positions of those row ids that are in the pool"""
+        positions = []
+        for row_id in row_ids:
+            position = bisect_left(self._row_ids, row_id, 0, self._size)
+            if position < self._size and self._row_ids[position] == row_id:
+                positions.append(position)
+        return positions
+
+    def row_ids(self, positions):
+        """Return the row ids stored at pool positions"""
+        return [self._row_ids[position] for position in positions]
+
+    def victims(self, max_bytes=None, category_max_bytes=None, policy='lru', fill=1.0):
+        """Return the positions to drop so the pool fits its byte budgets
+
+        Each category above category_max_bytes, then the pool if still
+        above max_bytes, is trimmed to fill times its budget.  policy
+        'lru' drops the least recently served excuses first and 'oldest'
+        the earliest added.  A category left empty frees its overhead too.
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(EVICTION_POLICIES)}")
+        excuses, owners = self._excuses, self._owners
+        served = self._served.__getitem__ if policy == 'lru' else None
+        dropped = set()
+        remaining = array('I', self._counts)
+        total = self._bytes
+
+        def drop(position):
+            """Mark one excuse dropped and return the bytes that frees"""
+            dropped.add(position)
+            category_id = owners[position]
+            remaining[category_id] -= 1
+            freed = sys.getsizeof(excuses[position]) + EXCUSE_OVERHEAD
+            if not remaining[category_id]:
+                freed += CATEGORY_OVERHEAD + sys.getsizeof(self._names[category_id])
+            return freed
+
+        if category_max_bytes is not None:
+            target = category_max_bytes * fill
+            for category_id, used in enumerate(self._category_bytes):
+                if used <= category_max_bytes:
+                    continue
+                members = self._members[category_id][:self._counts[category_id]]
+                for position in members if served is None else sorted(members, key=served):
+                    if used <= target:
+                        break
+                    freed = drop(position)
+                    used -= freed
+                    total -= freed
+
+        if max_bytes is not None and total > max_bytes:
+            target = max_bytes * fill
+            positions = range(self._size)
+            for position in positions if served is None else sorted(positions, key=served):
+                if total <= target:
+                    break
+                if position not in dropped:
+                    total -= drop(position)
+        return sorted(dropped)
+
+    def without(self, positions):
+        """Return a compact sampler without the excuses at the given positions
+
+        Categories left empty are dropped.  Row ids, last-served ticks and
+        pick counts carry over, and version counts the removals as well.
+        """
+        dropped = set(positions)
+        remaining = array('I', self._counts)
+        owners = self._owners
+        for position in dropped:
+            remaining[owners[position]] -= 1
+        live = [category_id for category_id, count in enumerate(remaining) if count]
+        renumber = array('I', [0]) * len(remaining)
+        for new_id, category_id in enumerate(live):
+            renumber[category_id] = new_id
+        kept = [position for position in range(self._size) if position not in dropped]
+        excuses, row_ids, served = self._excuses, self._row_ids, self._served
+        sampler = ExcuseSampler.from_columns(
+            [self._names[category_id] for category_id in live],
+            [renumber[owners[position]] for position in kept],
+            [excuses[position] for position in kept],
+            [row_ids[position] for position in kept],
+            weights=self._weights, default_weight=self._default_weight, rng=self._rng)
+        sampler._served = array('Q', [served[position] for position in kept])
+        sampler._picks = array('Q', [self._picks[category_id] for category_id in live])
+        sampler._ticks = self._ticks
+        sampler.version = self.version + len(dropped)
+        return sampler
+
+    def _category_id(self, category):
+        """Return a visible category's id, raising KeyError otherwise"""
+        if category not in self:
+            raise KeyError(category)
+        return self._ids[category]
+
+    def _measure(self):
+        """Recompute the approximate memory of the visible pool"""
+        category_bytes = array('Q', [CATEGORY_OVERHEAD + sys.getsizeof(name)
+                                     for name in self._names[:len(self._counts)]])
+        excuses, owners = self._excuses, self._owners
+        for position in range(self._size):
+            category_bytes[owners[position]] += sys.getsizeof(excuses[position]) + EXCUSE_OVERHEAD
+        self._category_bytes = category_bytes
+        self._bytes = sum(category_bytes)
+
+    def _detach(self):
+        """Take a private copy of the visible prefix of the shared pool"""
+        categories = len(self._counts)
+        self._excuses = self._excuses[:self._size]
+        self._owners = self._owners[:self._size]
+        self._row_ids = self._row_ids[:self._size]
+        self._served = self._served[:self._size]
+        self._picks = self._picks[:categories]
+        self._names = self._names[:categories]
+        self._ids = {name: category_id for category_id, name in enumerate(self._names)}
+        self._members = [self._members[category_id][:self._counts[category_id]]
+                         for category_id in range(categories)]
+
+    def _weighted_positions(self, count):
+        """Draw distinct positions by configured category weight (Efraimidis-Spirakis)
+
+        Each excuse gets weight = its category's weight / category size and
+        the key random() ** (1 / weight); the count largest keys win.
+        """
+        keys = []
+        for category_id, size in enumerate(self._counts):
+            weight = self._weights.get(self._names[category_id], self._default_weight)
+            if weight <= 0:
+                continue
+            exponent = size / weight
+            keys.extend((self._random() ** exponent, position)
+                        for position in self._members[category_id][:size])
+        return [position for _, position in heapq.nlargest(count, keys)]
+
+    def _build_alias_table(self):
+        """Rebuild the Vose alias table over the configured category weights"""
+        count = len(self._counts)
+        weights = [self._weights.get(name, self._default_weight)
+                   for name in self._names[:count]]
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("category weights must have a positive sum")
+        scaled = [weight * count / total for weight in weights]
+        probability = array('d', [1.0]) * count
+        alias = array('I', range(count))
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            low = small.pop()
+            high = large[-1]
+            probability[low] = scaled[low]
+            alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            if scaled[high] < 1.0:
+                small.append(large.pop())
+        # Leftovers are 1.0 up to rounding error
+        self._alias_probability = probability
+        self._alias = alias
@@ -0,0 +1,397 @@
+"""
+Excuse Store
+Copy-on-write excuse snapshots shared between threads and worker processes
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+
+from excuse_sampler import EVICTION_POLICIES, ExcuseSampler
+
+# Seconds between checks for excuses added by other worker processes
+REFRESH_INTERVAL = 0.25
+
+# Rows appended after the last compacted snapshot before a new one is written
+COMPACT_EVERY = 50000
+
+# Share of a byte budget the pool is trimmed to once it is exceeded, so a
+# full pool is rebuilt once per tenth of its budget rather than on every add
+EVICT_TO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS excuses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT NOT NULL,
+    excuse TEXT NOT NULL,
+    digest BLOB
+);
+CREATE UNIQUE INDEX IF NOT EXISTS excuses_digest ON excuses (digest);
+CREATE TABLE IF NOT EXISTS evictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    excuse_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot (
+    slot INTEGER PRIMARY KEY CHECK (slot = 0),
+    last_id INTEGER NOT NULL,
+    last_eviction INTEGER NOT NULL,
+    byteorder TEXT NOT NULL,
+    names TEXT NOT NULL,
+    owners BLOB NOT NULL,
+    row_ids BLOB NOT NULL,
+    excuses TEXT NOT NULL
+);
+"""
+
+# Only a duplicate digest is skipped; NULLs still fail the whole batch
+_INSERT = ("INSERT INTO excuses (category, excuse, digest) VALUES (?, ?, ?)"
+           " ON CONFLICT (digest) DO NOTHING")
+
+
+def _digest(category, excuse):
+    """16-byte content hash of a (category, excuse) pair; None unless both are text"""
+    if type(category) is not str or type(excuse) is not str:
+        return None
+    return hashlib.blake2b(f'{category}\0{excuse}'.encode('utf-8'), digest_size=16).digest()
+
+
+class _PendingWrite:
+    """One add_many() call waiting for the next group commit"""
+
+    __slots__ = ('rows', 'done', 'error', 'added')
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.done = False
+        self.error = None
+        self.added = 0
+
+
+class ExcuseStore:
+    """Excuses persisted in SQLite and served from immutable snapshots
+
+    Readers call snapshot() and get an ExcuseSampler that is never modified
+    afterwards, so they take no lock.  Writers queue their rows; whichever
+    writer takes the lock first commits every queued batch in one
+    transaction (one fsync), then publishes a copy of the current snapshot
+    extended with every row it has not seen yet, by swapping a reference.
+
+    The excuses table is an append-only log in WAL mode, so gunicorn
+    workers sharing the file read while another writes, and each process
+    pulls rows with ids above the last one it saw, at most every
+    refresh_interval seconds.  Every compact_every rows the whole pool is
+    also saved as one snapshot row, so startup loads that and replays only
+    the log written since.
+
+    Each row carries a hash of its category and text under a unique
+    index, so adding an excuse that is already stored is a no-op.  When
+    the pool or a category grows past max_bytes or category_max_bytes
+    (approximate memory, None for no limit), the writer deletes the
+    excuses chosen by the eviction policy ('lru': least recently served
+    by this process, 'oldest': earliest added) until it is back to
+    EVICT_TO of the budget, and logs their ids in the evictions table so
+    every process drops them too.  Compaction prunes that log; a process
+    that falls behind the pruned part reloads from the snapshot row.
+    """
+
+    def __init__(self, path, seed=None, weights=None, refresh_interval=REFRESH_INTERVAL,
+                 compact_every=COMPACT_EVERY, max_bytes=None, category_max_bytes=None,
+                 eviction='lru'):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"eviction must be one of {', '.join(EVICTION_POLICIES)}")
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.compact_every = compact_every
+        self.max_bytes = max_bytes
+        self.category_max_bytes = category_max_bytes
+        self.eviction = eviction
+        self.commits = 0
+        self.duplicates = 0
+        self.evicted = 0
+        self._weights = weights
+        self._lock = threading.Lock()
+        self._queue_lock = threading.Lock()
+        self._queue = []
+        self._connection = sqlite3.connect(path, check_same_thread=False,
+                                           isolation_level=None, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Every commit is fsynced; group commit keeps that affordable
+        self._connection.execute("PRAGMA synchronous=FULL")
+        self._migrate()
+        self._connection.executescript(_SCHEMA)
+        if seed:
+            self._seed(seed)
+        self._checked = 0.0
+        with self._lock:
+            self._snapshot, self._last_id, self._last_eviction = self._load_compacted()
+            self._compacted_id = self._last_id
+            self._refresh()
+            self._enforce_budgets()
+            self._compact_if_due()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    def snapshot(self):
+        """Return the current sampler; treat it as read-only"""
+        if time.monotonic() - self._checked >= self.refresh_interval:
+            # Never wait on a writer: if one holds the lock it will publish soon
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._refresh()
+                finally:
+                    self._lock.release()
+        return self._snapshot
+
+    def add(self, category, excuse):
+        """Persist an excuse and publish a snapshot that includes it
+
+        Returns False if the excuse was already stored.
+        """
+        return self.add_many([(category, excuse)]) == 1
+
+    def add_many(self, excuses):
+        """Persist (category, excuse) pairs atomically, all or none
+
+        Returns the number of pairs that were not already stored, once the
+        rows are committed and visible in snapshot().
+        """
+        pending = _PendingWrite([(category, excuse, _digest(category, excuse))
+                                 for category, excuse in excuses])
+        with self._queue_lock:
+            self._queue.append(pending)
+        with self._lock:
+            # An earlier lock holder may have committed this batch already
+            if not pending.done:
+                self._commit_queued()
+        if pending.error is not None:
+            raise pending.error
+        return pending.added
+
+    def compact(self):
+        """Save the whole pool as the snapshot row now"""
+        with self._lock:
+            self._refresh()
+            self._write_compacted()
+
+    def memory_usage(self):
+        """Return the pool's approximate size against its budgets, and the counters"""
+        snapshot = self.snapshot()
+        return {
+            'bytes': snapshot.memory_usage(),
+            'max_bytes': self.max_bytes,
+            'category_max_bytes': self.category_max_bytes,
+            'eviction': self.eviction,
+            'excuses': len(snapshot),
+            'categories': len(snapshot.categories),
+            'duplicates': self.duplicates,
+            'evicted': self.evicted,
+        }
+
+    def _commit_queued(self):
+        """Commit every queued batch in one transaction; the lock must be held"""
+        with self._queue_lock:
+            batches, self._queue = self._queue, []
+        connection = self._connection
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for batch in batches:
+                    # A savepoint per batch, so one bad batch fails alone
+                    connection.execute("SAVEPOINT batch")
+                    try:
+                        batch.added = connection.executemany(_INSERT, batch.rows).rowcount
+                    except sqlite3.Error as error:
+                        connection.execute("ROLLBACK TO batch")
+                        batch.error = error
+                    connection.execute("RELEASE batch")
+                connection.execute("COMMIT")
+                self.commits += 1
+            except BaseException:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+        except BaseException as error:
+            for batch in batches:
+                batch.error = batch.error or error
+            raise
+        finally:
+            for batch in batches:
+                batch.done = True
+        self.duplicates += sum(len(batch.rows) - batch.added for batch in batches
+                               if batch.error is None)
+        self._refresh()
+        self._enforce_budgets()
+        self._compact_if_due()
+
+    def _enforce_budgets(self):
+        """Evict excuses until the pool fits its budgets; the lock must be held"""
+        if not self._snapshot.over_budget(self.max_bytes, self.category_max_bytes):
+            return
+        connection = self._connection
+        # The write lock makes this process's view current before choosing
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._refresh()
+            snapshot = self._snapshot
+            positions = snapshot.victims(self.max_bytes, self.category_max_bytes,
+                                         self.eviction, EVICT_TO)
+            row_ids = [(row_id,) for row_id in snapshot.row_ids(positions)]
+            connection.executemany("DELETE FROM excuses WHERE id = ?", row_ids)
+            connection.executemany("INSERT INTO evictions (excuse_id) VALUES (?)", row_ids)
+            last_eviction = connection.execute("SELECT last_insert_rowid()").fetchone()[0]
+            connection.execute("COMMIT")
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        if positions:
+            self._last_eviction = last_eviction
+            self._publish(snapshot.without(positions))
+            self.evicted += len(positions)
+
+    def _migrate(self):
+        """Bring a database written by an older version up to the current schema
+
+        Adds and fills the digest column, dropping duplicate excuses (the
+        oldest copy is kept), and drops a snapshot row in the old format;
+        the log is replayed once and compacted again.
+        """
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(excuses)")]
+            if columns and 'digest' not in columns:
+                connection.execute("ALTER TABLE excuses ADD COLUMN digest BLOB")
+                rows = connection.execute("SELECT id, category, excuse FROM excuses").fetchall()
+                connection.executemany("UPDATE excuses SET digest = ? WHERE id = ?",
+                                       [(_digest(category, excuse), row_id)
+                                        for row_id, category, excuse in rows])
+                connection.execute(
+                    "DELETE FROM excuses WHERE digest IS NOT NULL AND id NOT IN"
+                    " (SELECT MIN(id) FROM excuses WHERE digest IS NOT NULL GROUP BY digest)")
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(snapshot)")]
+            if columns and 'row_ids' not in columns:
+                connection.execute("DROP TABLE snapshot")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _seed(self, excuses):
+        """Insert the seed excuses once, however many workers start at once"""
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if connection.execute("SELECT 1 FROM excuses LIMIT 1").fetchone() is None:
+                connection.executemany(_INSERT, [(category, text, _digest(category, text))
+                                                 for category, texts in excuses.items()
+                                                 for text in texts])
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _load_compacted(self):
+        """Return (sampler, last id, last eviction) from the snapshot row, or an empty sampler"""
+        row = self._connection.execute(
+            "SELECT last_id, last_eviction, byteorder, names, owners, row_ids, excuses"
+            " FROM snapshot").fetchone()
+        if row is None:
+            return ExcuseSampler(weights=self._weights), 0, 0
+        last_id, last_eviction, byteorder, names, owner_bytes, row_id_bytes, excuses = row
+        owners = array('I')
+        owners.frombytes(owner_bytes)
+        row_ids = array('Q')
+        row_ids.frombytes(row_id_bytes)
+        if byteorder != sys.byteorder:
+            owners.byteswap()
+            row_ids.byteswap()
+        sampler = ExcuseSampler.from_columns(json.loads(names), owners, json.loads(excuses),
+                                             row_ids, weights=self._weights)
+        sampler.version = last_id + last_eviction
+        return sampler, last_id, last_eviction
+
+    def _compact_if_due(self):
+        """Write a snapshot row once compact_every rows have been appended since"""
+        if self.compact_every and self._last_id - self._compacted_id >= self.compact_every:
+            self._write_compacted()
+
+    def _write_compacted(self):
+        """Replace the snapshot row with the current pool and prune the eviction log
+
+        The lock must be held.  Evictions the snapshot row already reflects
+        are deleted, whichever process wrote it.
+        """
+        names, owners, excuses, row_ids = self._snapshot.to_columns()
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO snapshot (slot, last_id, last_eviction, byteorder,"
+                " names, owners, row_ids, excuses) SELECT 0, ?, ?, ?, ?, ?, ?, ?"
+                " WHERE ? > COALESCE((SELECT last_id + last_eviction FROM snapshot), 0)",
+                (self._last_id, self._last_eviction, sys.byteorder, json.dumps(names),
+                 owners.tobytes(), row_ids.tobytes(), json.dumps(excuses),
+                 self._last_id + self._last_eviction))
+            connection.execute(
+                "DELETE FROM evictions WHERE id <= (SELECT last_eviction FROM snapshot)")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._compacted_id = self._last_id
+
+    def _refresh(self):
+        """Publish a new snapshot if the database has changes this one lacks
+
+        Must be called with the lock held.  Reads in one transaction, so
+        the rows, the evictions and the pruning mark agree.
+        """
+        connection = self._connection
+        nested = connection.in_transaction
+        if not nested:
+            connection.execute("BEGIN")
+        try:
+            pruned = connection.execute("SELECT last_eviction FROM snapshot").fetchone()
+            if pruned is not None and pruned[0] > self._last_eviction:
+                # Evictions this process never applied were pruned: start over
+                snapshot, self._last_id, self._last_eviction = self._load_compacted()
+                self._snapshot = snapshot
+                self._compacted_id = self._last_id
+            evictions = connection.execute(
+                "SELECT id, excuse_id FROM evictions WHERE id > ? ORDER BY id",
+                (self._last_eviction,)).fetchall()
+            rows = connection.execute(
+                "SELECT id, category, excuse FROM excuses WHERE id > ? ORDER BY id",
+                (self._last_id,)).fetchall()
+        finally:
+            if not nested:
+                connection.execute("COMMIT")
+        self._checked = time.monotonic()
+        if not rows and not evictions:
+            return
+        snapshot = self._snapshot
+        positions = ()
+        if evictions:
+            # Evicted rows are deleted with their log entry, so they are never in rows
+            positions = snapshot.positions_of([excuse_id for _, excuse_id in evictions])
+            self._last_eviction = evictions[-1][0]
+        snapshot = snapshot.without(positions) if positions else snapshot.copy()
+        for row_id, category, excuse in rows:
+            snapshot.add(category, excuse, row_id)
+        if rows:
+            self._last_id = rows[-1][0]
+        self._publish(snapshot)
+
+    def _publish(self, snapshot):
+        """Make snapshot the current one, numbering it by the log positions it reflects"""
+        # Every process that has read the same rows and evictions agrees on this
+        snapshot.version = self._last_id + self._last_eviction
+        self._snapshot = snapshot
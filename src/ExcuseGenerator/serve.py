@@ -0,0 +1,48 @@
+"""
+Excuse Generator Production Server
+Run the ASGI app under uvicorn with several worker processes
+
+Workers share excuses through the SQLite file named by EXCUSE_DB.
+Connections are kept alive between requests, and access logging and
+debug mode stay off.
+
+/metrics and /debug/* answer loopback clients only.  Set
+EXCUSE_BEHIND_PROXY=1 when a reverse proxy on the same host forwards
+requests, since every client then looks like loopback; the routes are
+then refused to all clients.
+
+Usage: python serve.py [--host 0.0.0.0] [--port 8000] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+
+try:
+    import uvicorn
+except ImportError:  # only needed to serve; app.py keeps working without it
+    uvicorn = None
+
+# Seconds an idle keep-alive connection stays open
+KEEP_ALIVE = 30
+
+
+def main(argv=None):
+    """Start the production server"""
+    parser = argparse.ArgumentParser(description="Serve the Excuse Generator over ASGI")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    if uvicorn is None:
+        sys.exit("serve.py needs uvicorn: pip install uvicorn")
+    uvicorn.run('asgi:app', host=args.host, port=args.port, workers=args.workers,
+                app_dir=os.path.dirname(os.path.abspath(__file__)),
+                timeout_keep_alive=KEEP_ALIVE, access_log=False,
+                log_level='warning', lifespan='on')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Binary Converter
+Convert integers to base-2 digit strings, one at a time or in bulk
+
+to_binary() formats one integer of any size in time linear in its bit
+length, with optional zero padding and a choice of how negatives are
+written.  to_binary_batch() writes a whole array of integers as
+fixed-width ASCII records into one preallocated buffer.
+
+Usage: python binary_converter.py [--width N] [--twos] NUMBER [NUMBER ...]
+"""
+
+import argparse
+import sys
+from itertools import repeat
+
+# Integers formatted per step in batch mode, bounding temporary strings
+BATCH_SIZE = 65536
+
+# How negative numbers are written
+NEGATIVE_MODES = ('sign', 'twos', 'error')
+
+_ZERO = ord('0')
+
+
+def _check_negative(negative):
+    """Reject unknown negative modes"""
+    if negative not in NEGATIVE_MODES:
+        raise ValueError(f"negative must be one of {', '.join(NEGATIVE_MODES)}")
+
+
+def _twos_complement(number, width):
+    """Return number as an unsigned width-bit two's complement value"""
+    if width < 1 or not -(1 << (width - 1)) <= number < 1 << (width - 1):
+        raise ValueError(f"{number} does not fit in {width} bits of two's complement")
+    return number + (1 << width) if number < 0 else number
+
+
+def to_binary(number, width=0, negative='sign', empty_zero=False):
+    """Return the binary digits of an integer, e.g. to_binary(5) == '101'
+
+    width zero-pads the digits to at least that many; a '-' sign is not
+    counted.  negative='sign' writes -5 as '-101', 'twos' writes it in
+    width-bit two's complement (width is then required, and positives
+    must leave the top bit clear) and 'error' raises ValueError.  empty_zero=True keeps the original behaviour of
+    returning '' for 0.
+    """
+    _check_negative(negative)
+    if number == 0 and empty_zero and not width:
+        return ''
+    if number < 0:
+        if negative == 'error':
+            raise ValueError(f"negative number {number} not allowed")
+        if negative == 'sign':
+            return '-' + to_binary(-number, width)
+        number = _twos_complement(number, width)
+    elif negative == 'twos' and width:
+        _twos_complement(number, width)
+    # int -> binary string is a single linear pass in CPython
+    return format(number, f'0{width}b') if width else format(number, 'b')
+
+
+def convert_to_binary(num):
+    """Original conversion: digits of a positive number, '' for 0 and negatives"""
+    return to_binary(num, empty_zero=True) if num > 0 else ''
+
+
+def batch_width(numbers, negative='error'):
+    """Return the smallest record width that fits every number"""
+    if not len(numbers):
+        return 1
+    low, high = min(numbers), max(numbers)
+    if negative == 'twos':
+        # One more bit than the widest magnitude, so the sign bit is free
+        return max(int(high).bit_length(), int(~low).bit_length() if low < 0 else 0) + 1
+    return max(int(high).bit_length(), 1)
+
+
+def to_binary_batch(numbers, width=None, out=None, negative='error'):
+    """Write each number as width ASCII binary digits, back to back, into out
+
+    numbers is any sequence of integers (list, array.array or a NumPy
+    integer array).  width defaults to batch_width(numbers).  out is any
+    writable bytes-like object with room for len(numbers) * width bytes
+    and is allocated as a bytearray when None; record i occupies
+    out[i * width:(i + 1) * width].  Negatives raise ValueError unless
+    negative='twos', which in turn rejects positives that would set the
+    sign bit.  Returns out.
+    """
+    if negative not in ('twos', 'error'):
+        raise ValueError("batch records are fixed width: negative must be 'twos' or 'error'")
+    if width is None:
+        width = batch_width(numbers, negative)
+    if width < 1:
+        raise ValueError("width must be positive")
+    count = len(numbers)
+    if out is None:
+        out = bytearray(count * width)
+    view = memoryview(out).cast('B')
+    if len(view) < count * width:
+        raise ValueError(f"out needs {count * width} bytes, has {len(view)}")
+
+    # Only take the vectorised path when the caller has already loaded NumPy
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and width <= 64 and _numpy_integers(numpy, numbers):
+        _numpy_batch(numpy, numpy.asarray(numbers), width, view, negative)
+        return out
+
+    spec = f'0{width}b'
+    limit = 1 << width
+    for start in range(0, count, BATCH_SIZE):
+        chunk = numbers[start:start + BATCH_SIZE]
+        if not len(chunk):
+            continue
+        low = min(chunk)
+        _check_range(low, max(chunk), width, negative)
+        if low < 0:
+            chunk = [number + limit if number < 0 else number for number in chunk]
+        text = ''.join(map(format, chunk, repeat(spec)))
+        view[start * width:start * width + len(text)] = text.encode('ascii')
+    return out
+
+
+def _check_range(low, high, width, negative):
+    """Raise ValueError unless every value in [low, high] fits width digits"""
+    if negative == 'twos':
+        _twos_complement(int(low), width)
+        _twos_complement(int(high), width)
+        return
+    if high >= 1 << width:
+        raise ValueError(f"{high} does not fit in {width} binary digits")
+    if low < 0:
+        raise ValueError(f"negative number {low} not allowed")
+
+
+def _numpy_integers(numpy, numbers):
+    """Whether numbers is a NumPy array (or array.array) of integers"""
+    if isinstance(numbers, numpy.ndarray):
+        return numbers.dtype.kind in 'iu'
+    return getattr(numbers, 'typecode', 'd') in 'bBhHiIlLqQ'
+
+
+def _numpy_batch(numpy, numbers, width, view, negative):
+    """to_binary_batch for integer arrays of at most 64 bits, via unpackbits"""
+    target = numpy.frombuffer(view, dtype=numpy.uint8, count=len(numbers) * width)
+    target = target.reshape(len(numbers), width)
+    for start in range(0, len(numbers), BATCH_SIZE):
+        chunk = numbers[start:start + BATCH_SIZE]
+        if not len(chunk):
+            continue
+        _check_range(int(chunk.min()), int(chunk.max()), width, negative)
+        # Big-endian 64-bit two's complement: the last width bits are the record
+        octets = chunk.astype('>i8' if chunk.dtype.kind == 'i' else '>u8').view(numpy.uint8)
+        bits = numpy.unpackbits(octets.reshape(-1, 8), axis=1)
+        numpy.add(bits[:, 64 - width:], _ZERO, out=target[start:start + len(chunk)])
+
+
+def main(argv=None):
+    """Print the binary form of each number given on the command line"""
+    parser = argparse.ArgumentParser(description="Convert integers to binary")
+    parser.add_argument('numbers', nargs='+', type=int)
+    parser.add_argument('--width', type=int, default=0, help="zero-pad to this many digits")
+    parser.add_argument('--twos', action='store_true',
+                        help="write negatives in --width-bit two's complement")
+    args = parser.parse_args(argv)
+    try:
+        for number in args.numbers:
+            print(to_binary(number, args.width, 'twos' if args.twos else 'sign'))
+    except ValueError as error:
+        sys.exit(f"Error: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,17 @@ Chocolate Cake Recipes Application
 Display different recipes for chocolate cakes
 """
 
-# Recipe database with different chocolate cake recipes
-CHOCOLATE_CAKE_RECIPES = {
+import sys
+
+from ingredient_store import RecipeCatalogView
+
+# The index, catalog and renderer modules are imported by the functions that
+# first need them, so a script that only lists or shows recipes never pays
+# for parsing, search or similarity code (see cli.py)
+
+# Recipe database with different chocolate cake recipes; ingredients are kept
+# parsed in one IngredientStore, which is only filled when first needed
+CHOCOLATE_CAKE_RECIPES = RecipeCatalogView({
     "classic_chocolate": {
         "name": "Classic Chocolate Cake",
         "servings": 8,
@@ -148,72 +157,283 @@ CHOCOLATE_CAKE_RECIPES = {
             "Cool completely before serving."
         ]
     }
-}
+})
+
+# Active recipe catalog: the built-in view, or a file catalog after load_catalog()
+_recipes = CHOCOLATE_CAKE_RECIPES
+
+# Rendered recipe cards, cached by recipe key; created on first display
+_renderer = None
+
+def _get_renderer():
+    """Return the recipe card renderer, creating it on first use"""
+    global _renderer
+    if _renderer is None:
+        from recipe_render import RecipeRenderer
+        _renderer = RecipeRenderer(_recipes)
+    return _renderer
 
 def display_recipe(recipe_key):
     """Display a complete recipe with formatting"""
-    if recipe_key not in CHOCOLATE_CAKE_RECIPES:
+    if recipe_key not in _recipes:
         print("Recipe not found!")
         return
     
-    recipe = CHOCOLATE_CAKE_RECIPES[recipe_key]
-    
-    print(f"\n{'='*60}")
-    print(f"🍰 {recipe['name']} 🍰")
-    print(f"{'='*60}")
-    print(f"Servings: {recipe['servings']}")
-    print(f"Prep Time: {recipe['prep_time']}")
-    print(f"Bake Time: {recipe['bake_time']}")
-    
-    print(f"\n📋 INGREDIENTS:")
-    print("-" * 30)
-    for ingredient in recipe['ingredients']:
-        print(f"• {ingredient}")
-    
-    print(f"\n👩‍🍳 INSTRUCTIONS:")
-    print("-" * 30)
-    for i, instruction in enumerate(recipe['instructions'], 1):
-        print(f"{i}. {instruction}")
-    print("=" * 60)
+    _get_renderer().write_card(recipe_key, sys.stdout)
+
+def render_all(stream=None):
+    """Write every recipe card to a stream (stdout by default) in bulk"""
+    _get_renderer().render_all(stream or sys.stdout)
+
+# Keyword search index, built from the active catalog on first search
+_search_index = None
+
+# Typo-tolerant ranked search index, built from the active catalog on first use
+_ranked_index = None
+
+# Parsed time and servings ranges in sorted arrays, built on first filtered query
+_range_index = None
+
+# Precomputed "you might also like" neighbors, built on first lookup
+_similarity_index = None
+
+# Parsed ingredient records for catalogs that are not a RecipeCatalogView,
+# built from the active catalog on first use
+_ingredient_store = None
+
+# Recipe scaler over the ingredient store, created on first use
+_shopping_engine = None
+
+# Recipe keys in display order, built on first lookup by number
+_key_order = None
+
+def _get_search_index():
+    """Return the keyword search index, building it on first use"""
+    global _search_index
+    if _search_index is None:
+        from recipe_index import RecipeIndex
+        _search_index = RecipeIndex(_recipes)
+    return _search_index
+
+def _get_ranked_index():
+    """Return the ranked search index, building it on first use"""
+    global _ranked_index
+    if _ranked_index is None:
+        from recipe_search import RankedRecipeIndex
+        _ranked_index = RankedRecipeIndex(_recipes)
+    return _ranked_index
+
+def _get_range_index():
+    """Return the time and servings range index, building it on first use"""
+    global _range_index
+    if _range_index is None:
+        from recipe_index import RecipeRangeIndex
+        _range_index = RecipeRangeIndex(_recipes)
+    return _range_index
+
+def _get_similarity_index():
+    """Return the similar-recipes index, building it on first use"""
+    global _similarity_index
+    if _similarity_index is None:
+        from recipe_similarity import RecipeSimilarityIndex
+        _similarity_index = RecipeSimilarityIndex(_recipes)
+    return _similarity_index
+
+def _get_ingredient_store():
+    """Return the parsed ingredient store, building it on first use"""
+    global _ingredient_store
+    # A view already reads through its own store; another copy would double it
+    if isinstance(_recipes, RecipeCatalogView):
+        return _recipes.store
+    if _ingredient_store is None:
+        from ingredient_store import IngredientStore
+        _ingredient_store = IngredientStore(_recipes)
+    return _ingredient_store
+
+def _get_key_order():
+    """Return the positional key index, building it on first use"""
+    global _key_order
+    if _key_order is None:
+        # File catalogs already support lookups by position
+        if hasattr(_recipes, 'key_at'):
+            _key_order = _recipes
+        else:
+            from recipe_index import OrderedKeyIndex
+            _key_order = OrderedKeyIndex(_recipes)
+    return _key_order
+
+def _get_shopping_engine():
+    """Return the recipe scaling engine, creating it on first use"""
+    global _shopping_engine
+    if _shopping_engine is None:
+        from shopping_list import ShoppingListEngine
+        _shopping_engine = ShoppingListEngine(_recipes, _get_ingredient_store())
+    return _shopping_engine
+
+def load_catalog(path=None):
+    """Serve recipes from a JSON Lines or binary catalog file
+
+    Passing None switches back to the built-in CHOCOLATE_CAKE_RECIPES.
+    File catalogs are read-only, and derived indexes are rebuilt lazily.
+    """
+    if path is None:
+        return use_recipes(CHOCOLATE_CAKE_RECIPES)
+    from recipe_catalog import open_catalog
+    return use_recipes(open_catalog(path))
+
+def use_recipes(recipes):
+    """Serve recipes from a mapping, such as a dict loaded from a snapshot
+
+    Derived indexes are rebuilt lazily; a file catalog being replaced is closed.
+    """
+    global _recipes, _renderer, _search_index, _ranked_index, _range_index
+    global _similarity_index, _ingredient_store, _shopping_engine, _key_order
+    previous = _recipes
+    _recipes = recipes
+    _renderer = _search_index = _ranked_index = _range_index = _similarity_index = None
+    _ingredient_store = _shopping_engine = _key_order = None
+    if previous is not _recipes and hasattr(previous, 'close'):
+        previous.close()
+    return _recipes
+
+def add_recipe(recipe_key, recipe):
+    """Add or replace a recipe and keep the derived indexes up to date"""
+    is_new = recipe_key not in _recipes
+    _recipes[recipe_key] = recipe
+    if is_new and _key_order is not None:
+        _key_order.append(recipe_key)
+    if _renderer is not None:
+        _renderer.invalidate(recipe_key)
+    if _search_index is not None:
+        _search_index.add(recipe_key, recipe)
+    if _ranked_index is not None:
+        _ranked_index.add(recipe_key, recipe)
+    if _range_index is not None:
+        _range_index.add(recipe_key, recipe)
+    if _similarity_index is not None:
+        _similarity_index.add(recipe_key, recipe)
+    if _ingredient_store is not None:
+        _ingredient_store.add(recipe_key, recipe['ingredients'])
+    if _shopping_engine is not None:
+        _shopping_engine.forget(recipe_key)
+
+def remove_recipe(recipe_key):
+    """Remove a recipe and drop it from the derived indexes"""
+    recipe = _recipes.pop(recipe_key, None)
+    if recipe is not None:
+        if _renderer is not None:
+            _renderer.invalidate(recipe_key)
+        if _key_order is not None:
+            _key_order.remove(recipe_key)
+        if _search_index is not None:
+            _search_index.remove(recipe_key)
+        if _ranked_index is not None:
+            _ranked_index.remove(recipe_key)
+        if _range_index is not None:
+            _range_index.remove(recipe_key)
+        if _similarity_index is not None:
+            _similarity_index.remove(recipe_key)
+        if _ingredient_store is not None:
+            _ingredient_store.remove(recipe_key)
+        if _shopping_engine is not None:
+            _shopping_engine.forget(recipe_key)
+    return recipe
+
+def get_parsed_ingredients(recipe_key):
+    """Return a recipe's ingredients as parsed Ingredient records"""
+    if recipe_key not in _recipes:
+        return None
+    return _get_ingredient_store().ingredients(recipe_key)
+
+def scale_recipe(recipe_key, servings):
+    """Return a recipe's parsed ingredients scaled to a number of servings"""
+    if recipe_key not in _recipes:
+        return None
+    return _get_shopping_engine().scale_recipe(recipe_key, servings)
+
+def build_shopping_list(requests):
+    """Merge (recipe key, servings) requests into one aggregated shopping list"""
+    return _get_shopping_engine().shopping_list(requests)
 
 def search_recipes_by_keyword(keyword):
     """Search recipes by keyword in name or ingredients"""
-    if not keyword or not keyword.strip():
+    return _get_search_index().search(keyword)
+
+def search_recipes_ranked(query, limit=20):
+    """Search name, ingredients and instructions, tolerating typos
+
+    Returns up to limit (key, name, score) tuples, best match first.
+    """
+    if not query or not query.strip():
         return []
-    
-    matching_recipes = []
-    keyword_lower = keyword.lower()
-    
-    for key, recipe in CHOCOLATE_CAKE_RECIPES.items():
-        # Search in recipe name
-        if keyword_lower in recipe['name'].lower():
-            matching_recipes.append((key, recipe['name']))
-            continue
-        
-        # Search in ingredients
-        for ingredient in recipe['ingredients']:
-            if keyword_lower in ingredient.lower():
-                matching_recipes.append((key, recipe['name']))
-                break
-    
-    return matching_recipes
+    return _get_ranked_index().search(query, limit)
+
+def find_recipes(keyword=None, total=None, prep=None, bake=None, servings=None):
+    """Filter recipes by keyword and by minute or servings ranges in one query
+
+    Each range is a (low, high) pair with None for an open end, e.g.
+    find_recipes(total=(None, 45)) for recipes ready within 45 minutes,
+    find_recipes(bake=(25, 35)) or find_recipes("vegan", servings=(10, None)).
+    A recipe's whole parsed range must fall inside the filter.  Returns
+    (key, name) pairs in display order.
+    """
+    filters = {field: bounds for field, bounds in
+               (('total', total), ('prep', prep), ('bake', bake), ('servings', servings))
+               if bounds is not None}
+    keys = None
+    if keyword is not None:
+        keys = [key for key, _ in search_recipes_by_keyword(keyword)]
+        if not keys:
+            return []
+    return _get_range_index().query(filters, keys)
+
+def similar_recipes(recipe_key, limit=None):
+    """Return up to limit (key, name, score) recipes sharing the most ingredients
+
+    Neighbor lists are precomputed, so each lookup is O(limit); recipes
+    added or removed since are folded in before the next lookup.
+    """
+    if recipe_key not in _recipes:
+        return []
+    return _get_similarity_index().neighbors(recipe_key, limit)
 
 def list_all_recipes():
     """Display a list of all available recipes"""
-    print("\n🍫 Available Chocolate Cake Recipes:")
-    print("=" * 50)
-    for i, (key, recipe) in enumerate(CHOCOLATE_CAKE_RECIPES.items(), 1):
-        print(f"{i}. {recipe['name']}")
-        print(f"   Servings: {recipe['servings']} | Prep: {recipe['prep_time']} | Bake: {recipe['bake_time']}")
-    print("=" * 50)
+    # Once lookups by number have started, list the numbers they answer to
+    numbered = _key_order.numbered() if hasattr(_key_order, 'numbered') else None
+    _get_renderer().write_listing(sys.stdout, numbered)
+
+def get_recipe(recipe_key):
+    """Return a recipe by key, or None if there is no such recipe"""
+    return _recipes.get(recipe_key)
 
 def get_recipe_by_number(recipe_number):
-    """Get recipe key by its display number"""
-    recipe_keys = list(CHOCOLATE_CAKE_RECIPES.keys())
-    if 1 <= recipe_number <= len(recipe_keys):
-        return recipe_keys[recipe_number - 1]
+    """Get recipe key by its display number
+
+    Numbers are stable: removing a recipe retires its number without
+    renumbering the others, and None is returned for a retired number.
+    """
+    key_order = _get_key_order()
+    if 1 <= recipe_number <= len(key_order):
+        return key_order.key_at(recipe_number - 1)
     return None
 
+def list_recipes(offset=0, limit=20):
+    """Return one page of (key, recipe) pairs in display order
+
+    Only the recipes on the requested page are read, so paging through a
+    large file catalog never loads the rest of it.
+    """
+    if offset < 0 or limit < 0:
+        raise ValueError("offset and limit must not be negative")
+    key_order = _get_key_order()
+    if hasattr(key_order, 'page'):
+        keys = key_order.page(offset, limit)
+    else:
+        stop = min(offset + limit, len(key_order))
+        keys = [key_order.key_at(position) for position in range(offset, stop)]
+    return [(key, _recipes[key]) for key in keys]
+
 def main():
     """Main function to run the chocolate cake recipes application"""
     print("🍰 Chocolate Cake Recipes Collection 🍰")
@@ -239,7 +459,7 @@ def main():
             elif choice == 2:
                 list_all_recipes()
                 try:
-                    recipe_num = int(input(f"\nEnter recipe number (1-{len(CHOCOLATE_CAKE_RECIPES)}): "))
+                    recipe_num = int(input(f"\nEnter recipe number (1-{len(_get_key_order())}): "))
                     recipe_key = get_recipe_by_number(recipe_num)
                     if recipe_key:
                         display_recipe(recipe_key)
@@ -289,4 +509,6 @@ def main():
             print("Invalid input. Please enter a valid number.")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        load_catalog(sys.argv[1])
     main()
\ No newline at end of file
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Command Line Tools
+One fast-starting entry point for the recipe, temperature and excuse tools
+
+Only the modules behind the chosen subcommand are imported: `recipes show`
+never loads the search or similarity code, `temperature` never touches the
+recipe catalog, and only `excuses serve` loads Flask and uvicorn.  Options
+are parsed by hand, since argparse and the re module it pulls in take
+longer to import than most subcommands take to run.
+
+`snapshot` saves the excuse pool, and the recipe catalog named by
+--catalog, with data_snapshot.  While the files they came from are
+unchanged, `excuses` and `recipes --catalog` read the snapshot instead of
+opening SQLite or the catalog file.  The built-in recipes need no
+snapshot, as they are already precompiled in chocolate_cake_recipes' .pyc.
+
+Usage:
+    python cli.py recipes [list | show NUMBER_OR_KEY | search KEYWORD | similar KEY] [--catalog PATH]
+    python cli.py temperature [--from C --to F [--binary] [--precision N]]
+    python cli.py excuses [random [CATEGORY] | list [CATEGORY] | categories | add CATEGORY TEXT]
+    python cli.py excuses serve [--host HOST] [--port PORT] [--workers N]
+    python cli.py snapshot [--catalog PATH]
+
+Without an action, recipes and temperature start their interactive menus
+and excuses prints a random excuse.  TOOLS_SNAPSHOT names the snapshot
+file and EXCUSE_DB the excuse database, as for app.py.
+"""
+
+import os
+import sys
+
+SRC = os.path.dirname(os.path.abspath(__file__))
+
+# Precompiled recipe and excuse data written by `cli.py snapshot`
+SNAPSHOT = os.environ.get('TOOLS_SNAPSHOT', os.path.join(SRC, 'tools.snapshot'))
+
+# Larger catalogs are left to their own memory-mapped index: a snapshot has
+# to be read whole, which costs more than looking up one recipe in the file
+SNAPSHOT_MAX_RECIPES = 50000
+
+
+def _usage(status=2):
+    """Print the usage lines and return status"""
+    print(__doc__[__doc__.index("Usage:"):].strip(), file=sys.stderr if status else sys.stdout)
+    return status
+
+
+def _fail(message):
+    """Print an error and return a failing exit code"""
+    print(f"cli.py: {message}", file=sys.stderr)
+    return 1
+
+
+def _pop_option(argv, name):
+    """Remove `name VALUE` or `name=VALUE` from argv and return VALUE, or None"""
+    for index, argument in enumerate(argv):
+        if argument == name and index + 1 < len(argv):
+            value = argv[index + 1]
+            del argv[index:index + 2]
+            return value
+        if argument.startswith(name + '='):
+            del argv[index]
+            return argument[len(name) + 1:]
+    return None
+
+
+def _load_section(name):
+    """Return one up-to-date section of the snapshot file, or None"""
+    from data_snapshot import load_section
+    return load_section(SNAPSHOT, name)
+
+
+def _excuse_modules():
+    """Make the ExcuseGenerator modules importable and return excuse_defaults"""
+    excuse_dir = os.path.join(SRC, 'ExcuseGenerator')
+    if excuse_dir not in sys.path:
+        sys.path.insert(0, excuse_dir)
+    import excuse_defaults
+    return excuse_defaults
+
+
+def run_recipes(argv):
+    """Run the recipes subcommand; returns an exit code"""
+    catalog = _pop_option(argv, '--catalog')
+    import chocolate_cake_recipes as recipes
+
+    if catalog is not None:
+        section = _load_section('recipes')
+        if section is not None and section['catalog'] == os.path.abspath(catalog):
+            recipes.use_recipes(section['recipes'])
+        else:
+            recipes.load_catalog(catalog)
+
+    action, arguments = (argv[0], argv[1:]) if argv else (None, [])
+    if action is None:
+        recipes.main()
+    elif action == 'list':
+        recipes.list_all_recipes()
+    elif action == 'show' and len(arguments) == 1:
+        key = arguments[0]
+        if key.isdigit():
+            key = recipes.get_recipe_by_number(int(key))
+        if key is None or recipes.get_recipe(key) is None:
+            return _fail(f"no recipe {arguments[0]!r}")
+        recipes.display_recipe(key)
+    elif action == 'search' and arguments:
+        for key, name in recipes.search_recipes_by_keyword(' '.join(arguments)):
+            print(f"{key}\t{name}")
+    elif action == 'similar' and len(arguments) == 1:
+        for key, name, score in recipes.similar_recipes(arguments[0]):
+            print(f"{key}\t{name}\t{score:.3f}")
+    else:
+        return _usage(0 if action in ('-h', '--help') else 2)
+    return 0
+
+
+def run_temperature(argv):
+    """Run the temperature subcommand; returns an exit code"""
+    import temperature_converter
+    if argv:
+        return temperature_converter.run_stream(argv)
+    temperature_converter.main()
+    return 0
+
+
+def _excuse_sampler(defaults):
+    """Return a sampler over the stored excuses, from the snapshot when it is fresh"""
+    section = _load_section('excuses')
+    if section is not None and section['database'] == os.path.abspath(defaults.DATABASE):
+        from array import array
+        from excuse_sampler import ExcuseSampler
+        owners = array('I')
+        owners.frombytes(section['owners'])
+        if section['byteorder'] != sys.byteorder:
+            owners.byteswap()
+        return ExcuseSampler.from_columns(section['names'], owners, section['excuses'],
+                                          weights=defaults.CATEGORY_WEIGHTS)
+    store = defaults.open_store()
+    try:
+        return store.snapshot()
+    finally:
+        store.close()
+
+
+def run_excuses(argv):
+    """Run the excuses subcommand; returns an exit code"""
+    defaults = _excuse_modules()
+    action, arguments = (argv[0], argv[1:]) if argv else ('random', [])
+    if action == 'serve':
+        import serve
+        serve.main(arguments)
+        return 0
+    if action == 'add' and len(arguments) == 2:
+        import excuse_api
+        if not excuse_api.valid_excuse(*arguments):
+            return _fail(excuse_api.INVALID_EXCUSE)
+        store = defaults.open_store()
+        try:
+            added = store.add(*arguments)
+        finally:
+            store.close()
+        print("Added" if added else "Already stored")
+        return 0
+    if action not in ('random', 'list', 'categories') or len(arguments) > 1:
+        return _usage(0 if action in ('-h', '--help') else 2)
+
+    sampler = _excuse_sampler(defaults)
+    if arguments and arguments[0] not in sampler:
+        return _fail(f"no excuses in category {arguments[0]!r}")
+    if action == 'categories':
+        print('\n'.join(sampler.categories))
+    elif action == 'list':
+        for category in arguments or sampler.categories:
+            for excuse in sampler.excuses(category):
+                print(f"{category}\t{excuse}")
+    elif arguments:
+        print(sampler.choice(arguments[0]))
+    elif len(sampler):
+        print(sampler.sample()[1])
+    else:
+        return _fail("no excuses stored")
+    return 0
+
+
+def run_snapshot(argv):
+    """Write the snapshot file; returns an exit code"""
+    catalog = _pop_option(argv, '--catalog')
+    if argv:
+        return _usage(0 if argv[0] in ('-h', '--help') else 2)
+    from data_snapshot import write_snapshot
+
+    defaults = _excuse_modules()
+    sections = {}
+    summary = []
+    if defaults.DATABASE != ':memory:':
+        store = defaults.open_store()
+        try:
+            names, owners, excuses, _ = store.snapshot().to_columns()
+        finally:
+            store.close()
+        database = os.path.abspath(defaults.DATABASE)
+        # The WAL file changes with every write that has not been checkpointed yet
+        sections['excuses'] = ([database, database + '-wal'], {
+            'database': database, 'byteorder': sys.byteorder, 'names': names,
+            'owners': owners.tobytes(), 'excuses': excuses})
+        summary.append(f"{len(excuses)} excuses")
+    if catalog is not None:
+        from recipe_catalog import open_catalog
+        with open_catalog(catalog) as recipes:
+            if len(recipes) > SNAPSHOT_MAX_RECIPES:
+                return _fail(f"{catalog} has more than {SNAPSHOT_MAX_RECIPES} recipes;"
+                             " use it directly")
+            path = os.path.abspath(catalog)
+            sections['recipes'] = ([path], {'catalog': path, 'recipes': dict(recipes.items())})
+        summary.append(f"{len(sections['recipes'][1]['recipes'])} recipes")
+    if not sections:
+        return _fail("nothing to snapshot: EXCUSE_DB is :memory: and no --catalog given")
+    write_snapshot(SNAPSHOT, sections)
+    print(f"Wrote {SNAPSHOT} ({', '.join(summary)})")
+    return 0
+
+
+COMMANDS = {
+    'recipes': run_recipes,
+    'temperature': run_temperature,
+    'excuses': run_excuses,
+    'snapshot': run_snapshot,
+}
+
+
+def main(argv=None):
+    """Run the subcommand named by the first argument; returns an exit code"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        return _usage(0 if argv else 2)
+    command = COMMANDS.get(argv[0])
+    if command is None:
+        _fail(f"unknown command {argv[0]!r}")
+        return _usage()
+    return command(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
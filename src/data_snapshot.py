@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Data Snapshot
+Precompiled recipe and excuse data for fast command line startup
+
+A snapshot file holds named sections of plain dicts, lists, strings and
+bytes serialized with marshal, the format .pyc files use, so loading one
+is a single call that needs neither json nor sqlite3 nor the modules that
+normally build the data.  Sections are marshalled separately, and only
+the one asked for is decoded.
+
+Each section records the size and modification time of the files it was
+built from.  load_section() returns None for a section whose sources have
+changed since, or if the file is missing, damaged or was written by
+another Python version (marshal is not portable across them), so callers
+always fall back to building the data the normal way.
+"""
+
+import marshal
+import os
+import sys
+
+MAGIC = b'SNAP'
+
+# marshal's format may change between minor Python versions
+_PYTHON = b'%d.%d' % sys.version_info[:2]
+
+
+def file_stamp(path):
+    """Return (size, mtime in ns) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def write_snapshot(path, sections):
+    """Write {name: (source paths, data)} sections to path atomically"""
+    payload = {name: ([(source, file_stamp(source)) for source in sources], marshal.dumps(data))
+               for name, (sources, data) in sections.items()}
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as handle:
+        handle.write(MAGIC + _PYTHON + b'\n')
+        handle.write(marshal.dumps(payload))
+    os.replace(temporary, path)
+
+
+def load_section(path, name):
+    """Return one section of a snapshot file, or None if it is missing or stale"""
+    try:
+        with open(path, 'rb') as handle:
+            if handle.readline() != MAGIC + _PYTHON + b'\n':
+                return None
+            # One read: marshal.load() on a file makes a call per object
+            stamps, data = marshal.loads(handle.read())[name]
+        if all(file_stamp(source) == stamp for source, stamp in stamps):
+            return marshal.loads(data)
+    except (OSError, KeyError, EOFError, ValueError, TypeError):
+        pass
+    return None
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Ingredient Store
+Parse free-text ingredients into structured records kept in compact columns
+"""
+
+from array import array
+from collections import namedtuple
+from collections.abc import MutableMapping, Sequence
+
+# A parsed ingredient; quantity is a Fraction or None, unit/note may be None
+Ingredient = namedtuple('Ingredient', ['quantity', 'unit', 'item', 'note'])
+
+# Unit spellings mapped to their canonical singular form
+UNITS = {
+    'cup': 'cup', 'cups': 'cup', 'c.': 'cup',
+    'tablespoon': 'tablespoon', 'tablespoons': 'tablespoon', 'tbsp': 'tablespoon',
+    'teaspoon': 'teaspoon', 'teaspoons': 'teaspoon', 'tsp': 'teaspoon',
+    'oz': 'oz', 'ounce': 'oz', 'ounces': 'oz',
+    'lb': 'lb', 'lbs': 'lb', 'pound': 'lb', 'pounds': 'lb',
+    'g': 'g', 'gram': 'g', 'grams': 'g',
+    'kg': 'kg', 'ml': 'ml', 'l': 'l',
+    'pinch': 'pinch', 'pinches': 'pinch',
+    'package': 'package', 'packages': 'package',
+    'can': 'can', 'cans': 'can',
+    'stick': 'stick', 'sticks': 'stick',
+}
+
+# Plural spellings used when formatting quantities greater than one
+_PLURAL_UNITS = {
+    'cup': 'cups', 'tablespoon': 'tablespoons', 'teaspoon': 'teaspoons',
+    'pinch': 'pinches', 'package': 'packages', 'can': 'cans', 'stick': 'sticks',
+}
+
+# (quantity pattern, parenthesised note pattern, Fraction), loaded by the first
+# parse: chocolate_cake_recipes wraps its recipes in a RecipeCatalogView at
+# import, and re and fractions would otherwise dominate cli.py's startup
+_parser = None
+
+# Sentinel for "no value" in the string-code columns
+_NONE = 0
+
+
+def _load_parser():
+    """Import re and fractions and compile the ingredient patterns once"""
+    global _parser
+    if _parser is None:
+        import re
+        from fractions import Fraction
+        _parser = (re.compile(r'(\d+)\s+(\d+)/(\d+)\s+|(\d+)/(\d+)\s+|(\d+(?:\.\d+)?)\s+'),
+                   re.compile(r'\s*\(([^)]*)\)\s*'),
+                   Fraction)
+    return _parser
+
+
+def parse_quantity(text):
+    """Parse a leading quantity; return (Fraction or None, remaining text)"""
+    quantity_re, _, Fraction = _load_parser()
+    match = quantity_re.match(text)
+    if not match:
+        return None, text
+    whole, num, den, frac_num, frac_den, number = match.groups()
+    denominator = den or frac_den
+    if denominator is not None and int(denominator) == 0:
+        raise ValueError(f"zero denominator in quantity {match.group().strip()!r}")
+    if whole is not None:
+        quantity = int(whole) + Fraction(int(num), int(den))
+    elif frac_num is not None:
+        quantity = Fraction(int(frac_num), int(frac_den))
+    else:
+        quantity = Fraction(number)
+    return quantity, text[match.end():]
+
+
+def parse_ingredient(text):
+    """Parse an ingredient string such as '1 3/4 cups all-purpose flour'"""
+    quantity, rest = parse_quantity(text.strip())
+    paren_re = _load_parser()[1]
+
+    unit = None
+    word, _, remainder = rest.partition(' ')
+    if word.lower() in UNITS and remainder:
+        unit = UNITS[word.lower()]
+        rest = remainder[3:] if remainder.startswith('of ') else remainder
+
+    # Parenthesised asides and anything after the first comma are notes
+    notes = [note.strip() for note in paren_re.findall(rest)]
+    rest = paren_re.sub(' ', rest).strip()
+    item, comma, trailing = rest.partition(',')
+    if comma and trailing.strip():
+        notes.append(trailing.strip())
+
+    return Ingredient(quantity, unit, item.strip(), ', '.join(notes) or None)
+
+
+def format_quantity(quantity):
+    """Format a Fraction the way recipes write it, e.g. '1 3/4'"""
+    whole, remainder = divmod(quantity.numerator, quantity.denominator)
+    if not remainder:
+        return str(whole)
+    fraction = f"{remainder}/{quantity.denominator}"
+    return f"{whole} {fraction}" if whole else fraction
+
+
+def _inflect(item, plural):
+    """Put the last word of a counted item such as 'large eggs' in the right number"""
+    head, space, word = item.rpartition(' ')
+    if plural:
+        if word.endswith('s'):
+            return item
+        if word.endswith('y') and word[-2:-1] not in ('', 'a', 'e', 'i', 'o', 'u'):
+            word = word[:-1] + 'ies'
+        elif word.endswith(('ch', 'sh', 'x')):
+            word += 'es'
+        else:
+            word += 's'
+    elif word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif word.endswith(('ches', 'shes', 'xes')):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    return head + space + word
+
+
+def format_ingredient(ingredient):
+    """Turn an Ingredient back into a recipe line such as '2 cups sugar'"""
+    parts = []
+    plural = ingredient.quantity is not None and ingredient.quantity > 1
+    if ingredient.quantity is not None:
+        parts.append(format_quantity(ingredient.quantity))
+    if ingredient.unit is not None:
+        parts.append(_PLURAL_UNITS.get(ingredient.unit, ingredient.unit)
+                     if plural else ingredient.unit)
+        parts.append(ingredient.item)
+    elif ingredient.quantity is not None:
+        # Without a unit the item itself is what is counted: '1 egg', '2 eggs'
+        parts.append(_inflect(ingredient.item, plural))
+    else:
+        parts.append(ingredient.item)
+    text = ' '.join(parts)
+    return f"{text}, {ingredient.note}" if ingredient.note else text
+
+
+class _StringTable:
+    """Intern strings as small integer codes; code 0 stands for None"""
+
+    def __init__(self):
+        self._strings = [None]
+        self._codes = {}
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __getitem__(self, code):
+        return self._strings[code]
+
+    def code(self, value):
+        if value is None:
+            return _NONE
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+
+class IngredientStore:
+    """Columnar store of parsed ingredients grouped by recipe key
+
+    Each ingredient is one row across parallel arrays (quantity numerator
+    and denominator, plus interned codes for the original text, unit, item
+    and note).  A recipe owns a contiguous row range.  Distinct ingredient
+    strings are parsed once and every string is interned, so large catalogs
+    with repeated ingredients cost a few dozen bytes per row.
+    """
+
+    def __init__(self, recipes=None):
+        self._texts = _StringTable()
+        self._words = _StringTable()
+        self._parsed = {}              # text code -> parsed column values
+        self._text = array('I')
+        self._num = array('q')
+        self._den = array('q')         # 0 means the quantity is missing
+        self._unit = array('I')
+        self._item = array('I')
+        self._note = array('I')
+        self._ranges = {}              # recipe key -> (start row, stop row)
+        self._dead_rows = 0
+        if recipes:
+            for key, recipe in recipes.items():
+                self.add(key, recipe['ingredients'])
+
+    def __len__(self):
+        return len(self._ranges)
+
+    def __contains__(self, recipe_key):
+        return recipe_key in self._ranges
+
+    def __iter__(self):
+        return iter(self._ranges)
+
+    @property
+    def row_count(self):
+        """Number of live ingredient rows"""
+        return len(self._text) - self._dead_rows
+
+    def add(self, recipe_key, ingredients):
+        """Parse and store a recipe's ingredients, replacing any previous ones"""
+        self.remove(recipe_key)
+        start = len(self._text)
+        for text in ingredients:
+            code = self._texts.code(text)
+            columns = self._parsed.get(code)
+            if columns is None:
+                columns = self._parsed[code] = self._encode(parse_ingredient(text))
+            num, den, unit, item, note = columns
+            self._text.append(code)
+            self._num.append(num)
+            self._den.append(den)
+            self._unit.append(unit)
+            self._item.append(item)
+            self._note.append(note)
+        self._ranges[recipe_key] = (start, len(self._text))
+
+    def remove(self, recipe_key):
+        """Drop a recipe's rows; unknown keys are ignored"""
+        span = self._ranges.pop(recipe_key, None)
+        if span is None:
+            return
+        self._dead_rows += span[1] - span[0]
+        if self._dead_rows > len(self._text) // 2:
+            self._compact()
+
+    def rows(self, recipe_key):
+        """Return the row range holding a recipe's ingredients"""
+        return range(*self._ranges[recipe_key])
+
+    def record(self, row):
+        """Materialise one row as an Ingredient"""
+        den = self._den[row]
+        words = self._words
+        Fraction = _load_parser()[2]
+        return Ingredient(Fraction(self._num[row], den) if den else None,
+                          words[self._unit[row]],
+                          words[self._item[row]],
+                          words[self._note[row]])
+
+    def ingredients(self, recipe_key):
+        """Return a recipe's ingredients as a list of Ingredient records"""
+        return [self.record(row) for row in self.rows(recipe_key)]
+
+    def texts(self, recipe_key):
+        """Return a lazy view of a recipe's strings, valid until the next write"""
+        return IngredientTextView(self, self.rows(recipe_key))
+
+    def text(self, row):
+        """Return the original ingredient string stored in a row"""
+        return self._texts[self._text[row]]
+
+    def _encode(self, ingredient):
+        """Turn an Ingredient into the values stored in each column"""
+        quantity = ingredient.quantity
+        words = self._words
+        return (quantity.numerator if quantity is not None else 0,
+                quantity.denominator if quantity is not None else 0,
+                words.code(ingredient.unit),
+                words.code(ingredient.item),
+                words.code(ingredient.note))
+
+    def _compact(self):
+        """Rewrite the columns without rows from removed recipes"""
+        columns = (self._text, self._num, self._den, self._unit, self._item, self._note)
+        fresh = [array(column.typecode) for column in columns]
+        ranges = {}
+        for key, (start, stop) in self._ranges.items():
+            new_start = len(fresh[0])
+            for column, target in zip(columns, fresh):
+                target.extend(column[start:stop])
+            ranges[key] = (new_start, len(fresh[0]))
+        (self._text, self._num, self._den,
+         self._unit, self._item, self._note) = fresh
+        self._ranges = ranges
+        self._dead_rows = 0
+
+
+class IngredientTextView(Sequence):
+    """Read-only sequence of ingredient strings backed by an IngredientStore"""
+
+    __slots__ = ('_store', '_rows')
+
+    def __init__(self, store, rows):
+        self._store = store
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store.text(row) for row in self._rows[index]]
+        return self._store.text(self._rows[index])
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, IngredientTextView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _read_only(*args, **kwargs):
+    """Refuse an in-place change to a recipe built by a RecipeCatalogView"""
+    raise TypeError("recipes read from a RecipeCatalogView are read-only; "
+                    "assign catalog[key] = recipe to change one")
+
+
+class _ReadOnlyList(list):
+    """List of ingredient strings that raises instead of changing"""
+
+    __slots__ = ()
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+class _ReadOnlyDict(dict):
+    """Recipe dict that raises instead of changing"""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class RecipeCatalogView(MutableMapping):
+    """Dict-like catalog whose 'ingredients' are served from one store
+
+    Only the other recipe fields are kept per recipe; looking up a key
+    builds the familiar recipe dict on demand, with the ingredient strings
+    read back from the store.  Ingredient lists wait unparsed until the
+    store is first used, so wrapping a catalog costs no parsing.
+
+    A lookup builds a new recipe each time, so the recipe is a read-only
+    dict and list: changing one in place raises TypeError rather than
+    being silently lost.  They still pass isinstance checks and json.dumps,
+    and dict(recipe) or copy.deepcopy(recipe) gives an editable copy to
+    assign back.  The view itself is a MutableMapping, not a dict.
+    """
+
+    def __init__(self, recipes):
+        self._store = None
+        self._pending = {}             # recipe key -> ingredients not in the store yet
+        self._headers = {}
+        for key, recipe in recipes.items():
+            self[key] = recipe
+
+    @property
+    def store(self):
+        """The IngredientStore holding every recipe's parsed ingredients"""
+        if self._store is None:
+            self._store = IngredientStore()
+        if self._pending:
+            for key, ingredients in self._pending.items():
+                self._store.add(key, ingredients)
+            self._pending.clear()
+        return self._store
+
+    def __getitem__(self, recipe_key):
+        ingredients = self._pending.get(recipe_key)
+        if ingredients is None:
+            ingredients = self.store.texts(recipe_key)
+        return _ReadOnlyDict(self._headers[recipe_key], ingredients=_ReadOnlyList(ingredients))
+
+    def __setitem__(self, recipe_key, recipe):
+        self._headers[recipe_key] = {field: value for field, value in recipe.items()
+                                     if field != 'ingredients'}
+        if self._store is None:
+            self._pending[recipe_key] = recipe['ingredients']
+        else:
+            self._store.add(recipe_key, recipe['ingredients'])
+
+    def __delitem__(self, recipe_key):
+        del self._headers[recipe_key]
+        self._pending.pop(recipe_key, None)
+        if self._store is not None:
+            self._store.remove(recipe_key)
+
+    def __contains__(self, recipe_key):
+        return recipe_key in self._headers
+
+    def __iter__(self):
+        return iter(self._headers)
+
+    def __len__(self):
+        return len(self._headers)
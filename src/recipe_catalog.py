@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Recipe Catalog Files
+Read and write recipe catalogs as JSON Lines or a compact binary format
+
+Both formats are opened through a memory map with an offset index, so a
+single recipe can be fetched without parsing the rest of the file.
+
+JSON Lines: one object per line, {"key": ..., "name": ..., ...}, with the
+key first so the index can pick it out without decoding the whole line.
+
+Binary (.rcat), all integers little-endian:
+
+    header   magic b'RCAT', u32 version, u64 record count n
+    offsets  (n + 1) x u64 start of each record, plus the end of the data
+    order    n x u32 record numbers sorted by key, for binary search
+    records  u32 key length, UTF-8 key, UTF-8 JSON of the other fields
+
+Usage: python recipe_catalog.py INPUT OUTPUT  (converts between formats)
+"""
+
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import ItemsView, Mapping, ValuesView
+
+MAGIC = b'RCAT'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sIQ')
+_U64 = struct.Struct('<Q')
+_U32 = struct.Struct('<I')
+
+# Matches the leading "key" field written by write_jsonl_catalog
+_JSONL_KEY_RE = re.compile(rb'\{\s*"key"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+def _encode_recipe(recipe):
+    """Serialise a recipe compactly, keeping non-ASCII text readable"""
+    return json.dumps(recipe, ensure_ascii=False, separators=(',', ':'))
+
+
+def iter_jsonl_catalog(path):
+    """Yield (key, recipe) pairs from a JSON Lines file one line at a time"""
+    with open(path, encoding='utf-8') as stream:
+        for line in stream:
+            if line.strip():
+                recipe = json.loads(line)
+                yield recipe.pop('key'), recipe
+
+
+def write_jsonl_catalog(path, recipes):
+    """Write (key, recipe) pairs, or a mapping, as JSON Lines"""
+    items = recipes.items() if isinstance(recipes, Mapping) else recipes
+    with open(path, 'w', encoding='utf-8') as stream:
+        for key, recipe in items:
+            stream.write(_encode_recipe({'key': key, **recipe}) + '\n')
+
+
+def write_binary_catalog(path, recipes):
+    """Write (key, recipe) pairs, or a mapping, as a binary catalog
+
+    Records are streamed to a temporary file first, so only the keys and
+    offsets of the catalog are held in memory while writing.  A key given
+    twice raises ValueError before path is touched.
+    """
+    items = recipes.items() if isinstance(recipes, Mapping) else recipes
+    offsets = array('Q')
+    keys = []
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryFile(dir=directory) as data:
+        position = 0
+        for key, recipe in items:
+            key_bytes = key.encode('utf-8')
+            body = _encode_recipe(recipe).encode('utf-8')
+            offsets.append(position)
+            keys.append(key_bytes)
+            data.write(_U32.pack(len(key_bytes)))
+            data.write(key_bytes)
+            data.write(body)
+            position += _U32.size + len(key_bytes) + len(body)
+
+        count = len(keys)
+        order = array('I', sorted(range(count), key=keys.__getitem__))
+        # Lookups binary-search the sorted keys, so a repeated key would
+        # leave all but one of its records unreachable
+        for previous, current in zip(order, order[1:]):
+            if keys[previous] == keys[current]:
+                raise ValueError(f"duplicate key {keys[current].decode('utf-8')!r}")
+        data_start = _HEADER.size + _U64.size * (count + 1) + _U32.size * count
+        offsets = array('Q', (data_start + offset for offset in offsets))
+        offsets.append(data_start + position)
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+            order.byteswap()
+
+        data.seek(0)
+        with open(path, 'wb') as stream:
+            stream.write(_HEADER.pack(MAGIC, VERSION, count))
+            stream.write(offsets.tobytes())
+            stream.write(order.tobytes())
+            shutil.copyfileobj(data, stream)
+
+
+class _MappedCatalog(Mapping, ABC):
+    """Read-only recipe mapping over a memory-mapped catalog file
+
+    Subclasses index the records and implement positional access.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as stream:
+            if os.fstat(stream.fileno()).st_size:
+                self._map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # Empty files cannot be mapped
+                self._map = b''
+
+    def close(self):
+        """Release the memory map"""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self.key_at(position)
+
+    def items(self):
+        return _CatalogItems(self)
+
+    def values(self):
+        return _CatalogValues(self)
+
+    @abstractmethod
+    def recipe_at(self, position):
+        """Return (key, recipe) for the record at a zero-based position"""
+
+    @abstractmethod
+    def key_at(self, position):
+        """Return the key of the record at a zero-based position"""
+
+
+class _CatalogItems(ItemsView):
+    """Items view that walks records by position instead of by key"""
+
+    def __iter__(self):
+        catalog = self._mapping
+        for position in range(len(catalog)):
+            yield catalog.recipe_at(position)
+
+
+class _CatalogValues(ValuesView):
+    """Values view that walks records by position instead of by key"""
+
+    def __iter__(self):
+        catalog = self._mapping
+        for position in range(len(catalog)):
+            yield catalog.recipe_at(position)[1]
+
+
+class JsonLinesCatalog(_MappedCatalog):
+    """Recipe mapping over a JSON Lines file
+
+    Opening scans the file once for line starts and keys; recipes are only
+    decoded when they are looked up.  The key table stays in memory, so the
+    binary format is the better fit for the very largest catalogs.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._offsets = array('Q')
+        self._positions = {}
+        data = self._map
+        start = 0
+        size = len(data)
+        line = 1
+        while start < size:
+            end = data.find(b'\n', start)
+            if end == -1:
+                end = size
+            if data[start:end].strip():
+                key = self._read_key(start, end)
+                if key in self._positions:
+                    self.close()
+                    raise ValueError(f"{path}: duplicate key {key!r} on line {line}")
+                self._positions[key] = len(self._offsets)
+                self._offsets.append(start)
+            start = end + 1
+            line += 1
+        self._offsets.append(size)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def __getitem__(self, key):
+        return self.recipe_at(self._positions[key])[1]
+
+    def recipe_at(self, position):
+        recipe = json.loads(self._line(position))
+        return recipe.pop('key'), recipe
+
+    def key_at(self, position):
+        start = self._offsets[position]
+        return self._read_key(start, self._map.find(b'\n', start))
+
+    def _line(self, position):
+        """Return the raw bytes of a line"""
+        start = self._offsets[position]
+        end = self._map.find(b'\n', start, self._offsets[position + 1])
+        return self._map[start:end if end != -1 else self._offsets[position + 1]]
+
+    def _read_key(self, start, end):
+        """Pull the key out of a line, decoding the line only as a fallback"""
+        if end == -1:
+            end = len(self._map)
+        match = _JSONL_KEY_RE.match(self._map, start, end)
+        if match:
+            return json.loads(match.group(1))
+        return json.loads(self._map[start:end])['key']
+
+
+class BinaryCatalog(_MappedCatalog):
+    """Recipe mapping over a binary catalog written by write_binary_catalog
+
+    Opening reads only the fixed-size header.  Positional lookups read one
+    offset, and key lookups binary-search the sorted order table, touching
+    O(log n) records.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        magic = version = count = None
+        if len(self._map) >= _HEADER.size:
+            magic, version, count = _HEADER.unpack_from(self._map, 0)
+        # A truncated file must still hold both tables, or lookups fail with struct.error
+        if (magic != MAGIC or version != VERSION or len(self._map)
+                < _HEADER.size + _U64.size * (count + 1) + _U32.size * count):
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} recipe catalog")
+        self._count = count
+        self._offsets_at = _HEADER.size
+        self._order_at = self._offsets_at + _U64.size * (count + 1)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __getitem__(self, key):
+        position = self._find(key)
+        if position is None:
+            raise KeyError(key)
+        return self.recipe_at(position)[1]
+
+    def recipe_at(self, position):
+        start, key_end, end = self._bounds(position)
+        key = self._map[start + _U32.size:key_end].decode('utf-8')
+        return key, json.loads(self._map[key_end:end])
+
+    def key_at(self, position):
+        start, key_end, _ = self._bounds(position)
+        return self._map[start + _U32.size:key_end].decode('utf-8')
+
+    def _bounds(self, position):
+        """Return (record start, key end, record end) for a position"""
+        if not 0 <= position < self._count:
+            raise IndexError(position)
+        offset = self._offsets_at + _U64.size * position
+        start, = _U64.unpack_from(self._map, offset)
+        end, = _U64.unpack_from(self._map, offset + _U64.size)
+        key_length, = _U32.unpack_from(self._map, start)
+        return start, start + _U32.size + key_length, end
+
+    def _find(self, key):
+        """Binary-search the order table; return the key's position or None"""
+        if not isinstance(key, str):
+            return None
+        target = key.encode('utf-8')
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            position, = _U32.unpack_from(self._map, self._order_at + _U32.size * middle)
+            start, key_end, _ = self._bounds(position)
+            probe = self._map[start + _U32.size:key_end]
+            if probe == target:
+                return position
+            if probe < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+
+def open_catalog(path):
+    """Open a binary or JSON Lines catalog, choosing by the file's magic bytes"""
+    with open(path, 'rb') as stream:
+        magic = stream.read(len(MAGIC))
+    if magic == MAGIC:
+        return BinaryCatalog(path)
+    return JsonLinesCatalog(path)
+
+
+def main():
+    """Convert a catalog between JSON Lines and binary formats"""
+    if len(sys.argv) != 3:
+        print("Usage: python recipe_catalog.py INPUT OUTPUT")
+        print("OUTPUT ending in .jsonl is written as JSON Lines, otherwise binary.")
+        sys.exit(2)
+    source, target = sys.argv[1:]
+    with open_catalog(source) as catalog:
+        if target.endswith('.jsonl'):
+            write_jsonl_catalog(target, catalog.items())
+        else:
+            write_binary_catalog(target, catalog.items())
+    print(f"Wrote {len(catalog)} recipes to {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Recipe Search Index
+Inverted token and n-gram postings for fast keyword search over recipes,
+a positional key index for lookups by display number, and sorted range
+arrays for filtering by prep, bake and total time or servings
+"""
+
+import math
+import re
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+# Longest n-gram stored for each token; longer keywords intersect these
+NGRAM_SIZE = 3
+
+# Numeric fields a RecipeRangeIndex filters on
+RANGE_FIELDS = ('prep', 'bake', 'total', 'servings')
+
+# Column value for a field that could not be parsed
+MISSING = 0xFFFFFFFF
+
+# Larger parsed values are clamped to this, so they fit the 32-bit columns
+# and never read as MISSING
+_MAX_VALUE = MISSING - 1
+
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+
+# "30-35 minutes", "1 hour 15 minutes", "1-1.5 hrs", "45 min"
+_DURATION_RE = re.compile(
+    r'(\d+(?:\.\d+)?)(?:\s*(?:-|\u2013|to)\s*(\d+(?:\.\d+)?))?\s*'
+    r'(hours?|hrs?|h|minutes?|mins?|m)\b', re.IGNORECASE)
+_NUMBER_RANGE_RE = re.compile(r'(\d+)(?:\s*(?:-|\u2013|to)\s*(\d+))?')
+
+
+def _ngrams(text, size):
+    """Return every distinct substring of text with length 1..size"""
+    grams = set()
+    for n in range(1, size + 1):
+        for start in range(len(text) - n + 1):
+            grams.add(text[start:start + n])
+    return grams
+
+
+class RecipeIndex:
+    """Keyword index over recipe names and ingredients
+
+    Searchable lines (the recipe name and each ingredient) are lower-cased
+    once when a recipe is added.  Three layers of postings answer a query:
+
+    - line -> ids of the recipes containing that line
+    - token -> lines containing that whitespace-delimited token
+    - n-gram -> tokens containing that n-gram
+
+    Recipe ids are handed out in insertion order, so sorting the matched
+    ids reproduces the iteration order of the source dict.
+    """
+
+    def __init__(self, recipes=None):
+        self._next_id = 0
+        self._ids = {}           # recipe key -> recipe id
+        self._docs = {}          # recipe id -> (key, name, lower-cased lines)
+        self._line_docs = {}     # lower-cased line -> set of recipe ids
+        self._token_lines = {}   # token -> set of lower-cased lines
+        self._gram_tokens = {}   # n-gram -> set of tokens
+        if recipes:
+            for key, recipe in recipes.items():
+                self.add(key, recipe)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, recipe_key):
+        return recipe_key in self._ids
+
+    def add(self, recipe_key, recipe):
+        """Index a recipe, replacing any previous version with the same key"""
+        recipe_id = self._ids.get(recipe_key)
+        if recipe_id is None:
+            recipe_id = self._next_id
+            self._next_id += 1
+            self._ids[recipe_key] = recipe_id
+        else:
+            # Keep the original id so the recipe keeps its position, like a dict
+            self._unlink(recipe_id)
+
+        lines = tuple({text.lower(): None for text in
+                       [recipe['name'], *recipe['ingredients']]})
+        self._docs[recipe_id] = (recipe_key, recipe['name'], lines)
+        for line in lines:
+            docs = self._line_docs.get(line)
+            if docs is None:
+                docs = self._line_docs[line] = set()
+                self._link_line(line)
+            docs.add(recipe_id)
+
+    def remove(self, recipe_key):
+        """Drop a recipe from the index; unknown keys are ignored"""
+        recipe_id = self._ids.pop(recipe_key, None)
+        if recipe_id is not None:
+            self._unlink(recipe_id)
+            del self._docs[recipe_id]
+
+    def search(self, keyword):
+        """Return (key, name) pairs whose name or ingredients contain keyword"""
+        if not keyword or not keyword.strip():
+            return []
+
+        keyword_lower = keyword.lower()
+        pieces = keyword_lower.split()
+
+        # Every whitespace-free piece of the keyword must sit inside one token
+        lines = None
+        for piece in sorted(pieces, key=len, reverse=True):
+            candidates = set()
+            for token in self._tokens_containing(piece):
+                candidates.update(self._token_lines[token])
+            lines = candidates if lines is None else lines & candidates
+            if not lines:
+                return []
+
+        # Keywords spanning tokens still need a real substring check
+        if keyword_lower != pieces[0]:
+            lines = [line for line in lines if keyword_lower in line]
+
+        recipe_ids = set()
+        for line in lines:
+            recipe_ids.update(self._line_docs[line])
+
+        docs = self._docs
+        return [docs[recipe_id][:2] for recipe_id in sorted(recipe_ids)]
+
+    def _tokens_containing(self, piece):
+        """Return the indexed tokens that contain piece as a substring"""
+        if len(piece) <= NGRAM_SIZE:
+            return self._gram_tokens.get(piece, ())
+
+        postings = []
+        for start in range(len(piece) - NGRAM_SIZE + 1):
+            tokens = self._gram_tokens.get(piece[start:start + NGRAM_SIZE])
+            if not tokens:
+                return ()
+            postings.append(tokens)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return [token for token in candidates if piece in token]
+
+    def _link_line(self, line):
+        """Register a newly seen line under its tokens and n-grams"""
+        for token in set(line.split()):
+            token_lines = self._token_lines.get(token)
+            if token_lines is None:
+                token_lines = self._token_lines[token] = set()
+                for gram in _ngrams(token, NGRAM_SIZE):
+                    self._gram_tokens.setdefault(gram, set()).add(token)
+            token_lines.add(line)
+
+    def _unlink(self, recipe_id):
+        """Remove a recipe id from its postings, pruning emptied entries"""
+        for line in self._docs[recipe_id][2]:
+            docs = self._line_docs[line]
+            docs.discard(recipe_id)
+            if docs:
+                continue
+            del self._line_docs[line]
+            for token in set(line.split()):
+                token_lines = self._token_lines[token]
+                token_lines.discard(line)
+                if token_lines:
+                    continue
+                del self._token_lines[token]
+                for gram in _ngrams(token, NGRAM_SIZE):
+                    gram_tokens = self._gram_tokens[gram]
+                    gram_tokens.discard(token)
+                    if not gram_tokens:
+                        del self._gram_tokens[gram]
+
+
+class OrderedKeyIndex:
+    """Recipe keys in display order, for O(1) lookup by position
+
+    A key keeps the position it was given for as long as it is indexed:
+    new keys are appended, and removing a key leaves a tombstone (None) in
+    its place, so no other recipe is ever renumbered.  len() counts
+    positions handed out, removed ones included.  The sorted positions of
+    tombstones let page() skip them without scanning the whole order.
+    """
+
+    def __init__(self, keys=()):
+        self._keys = list(keys)        # position -> key, None once removed
+        self._positions = {key: position for position, key in enumerate(self._keys)}
+        self._removed = array('Q')     # sorted positions of tombstones
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, recipe_key):
+        return recipe_key in self._positions
+
+    def key_at(self, position):
+        """Return the key at a zero-based position, or None if it was removed"""
+        return self._keys[position]
+
+    def position(self, recipe_key):
+        """Return a key's zero-based position, or None if it is not indexed"""
+        return self._positions.get(recipe_key)
+
+    def append(self, recipe_key):
+        """Add a new key at the end of the order"""
+        self._positions[recipe_key] = len(self._keys)
+        self._keys.append(recipe_key)
+
+    def remove(self, recipe_key):
+        """Replace a key with a tombstone; unknown keys are ignored"""
+        position = self._positions.pop(recipe_key, None)
+        if position is not None:
+            self._keys[position] = None
+            insort(self._removed, position)
+
+    def numbered(self):
+        """Yield (number, key) for every indexed key in order, numbering from 1"""
+        return ((position + 1, key) for position, key in enumerate(self._keys)
+                if key is not None)
+
+    def page(self, offset, limit):
+        """Return up to limit keys in order, after skipping offset indexed keys"""
+        # The first position with offset live keys before it: offset plus
+        # the tombstones up to there, found by bisecting until it settles
+        position = offset
+        while True:
+            settled = offset + bisect_right(self._removed, position)
+            if settled == position:
+                break
+            position = settled
+        keys = []
+        while position < len(self._keys) and len(keys) < limit:
+            if self._keys[position] is not None:
+                keys.append(self._keys[position])
+            position += 1
+        return keys
+
+
+def parse_minutes(text):
+    """Parse a duration like "30-35 minutes" into (low, high) whole minutes
+
+    Hours count as 60 minutes and every part of "1 hour 15 minutes" is
+    added up.  Returns None when text holds no duration.
+    """
+    low = high = 0.0
+    found = False
+    for first, last, unit in _DURATION_RE.findall(str(text)):
+        scale = 60 if unit[0] in 'hH' else 1
+        low += float(first) * scale
+        high += float(last or first) * scale
+        found = True
+    if not found:
+        return None
+    return int(low), -int(-high // 1)
+
+
+def parse_servings(value):
+    """Parse servings given as 8 or "8-10" into (low, high), or None"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value, value
+    match = _NUMBER_RANGE_RE.search(str(value)) if value is not None else None
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2) or match.group(1))
+
+
+def _parse_ranges(recipe):
+    """Return {field: (low, high) or None} for one recipe"""
+    prep = parse_minutes(recipe.get('prep_time', ''))
+    bake = parse_minutes(recipe.get('bake_time', ''))
+    total = None
+    if prep is not None and bake is not None:
+        total = (prep[0] + bake[0], prep[1] + bake[1])
+    parsed = {'prep': prep, 'bake': bake, 'total': total,
+              'servings': parse_servings(recipe.get('servings'))}
+    return {field: None if bounds is None else
+            (min(bounds[0], _MAX_VALUE), min(bounds[1], _MAX_VALUE))
+            for field, bounds in parsed.items()}
+
+
+class RecipeRangeIndex:
+    """Prep, bake and total minutes and servings as sorted arrays for range filters
+
+    Times are parsed once per recipe into (low, high) minutes, with the
+    total being the sum of prep and bake.  Each field keeps a column of
+    lows and highs by recipe id, plus two sorted arrays of
+    (value << 32 | id) keys, one over lows and one over highs, so any
+    bound is two bisects away.
+
+    A recipe matches a field's (low, high) filter when its whole range
+    lies inside it: "bake_time": "30-35 minutes" passes bake=(25, 35) and
+    total=(None, 45) means ready within 45 minutes even at the slow end.
+    A query walks only the smallest slice any bound selects and checks
+    the other bounds against the columns.  Recipes whose field cannot be
+    parsed never match a filter on that field.
+    """
+
+    def __init__(self, recipes=None):
+        self._next_id = 0
+        self._ids = {}       # recipe key -> recipe id
+        self._docs = {}      # recipe id -> (key, name)
+        self._columns = {field: (array('I'), array('I')) for field in RANGE_FIELDS}
+        self._sorted = {field: (array('Q'), array('Q')) for field in RANGE_FIELDS}
+        if recipes:
+            self.extend(recipes.items())
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, recipe_key):
+        return recipe_key in self._ids
+
+    def extend(self, items):
+        """Index many (key, recipe) pairs, sorting once at the end"""
+        replaced = []
+        for recipe_key, recipe in items:
+            if recipe_key in self._ids:
+                replaced.append((recipe_key, recipe))
+            else:
+                self._append(recipe_key, recipe)
+        for lows, highs in self._sorted.values():
+            lows[:] = array('Q', sorted(lows))
+            highs[:] = array('Q', sorted(highs))
+        # Replacements need the arrays sorted to find their old keys
+        for recipe_key, recipe in replaced:
+            self.add(recipe_key, recipe)
+
+    def add(self, recipe_key, recipe):
+        """Index one recipe, replacing any previous version with the same key"""
+        recipe_id = self._ids.get(recipe_key)
+        if recipe_id is None:
+            recipe_id = self._append(recipe_key, recipe, keys=False)
+        else:
+            self._unlink(recipe_id)
+            self._docs[recipe_id] = (recipe_key, recipe['name'])
+            for field, parsed in _parse_ranges(recipe).items():
+                lows, highs = self._columns[field]
+                lows[recipe_id], highs[recipe_id] = parsed or (MISSING, MISSING)
+        for field, (lows, highs) in self._columns.items():
+            if lows[recipe_id] != MISSING:
+                sorted_lows, sorted_highs = self._sorted[field]
+                insort(sorted_lows, lows[recipe_id] << _ID_BITS | recipe_id)
+                insort(sorted_highs, highs[recipe_id] << _ID_BITS | recipe_id)
+
+    def remove(self, recipe_key):
+        """Drop a recipe from the index; unknown keys are ignored"""
+        recipe_id = self._ids.pop(recipe_key, None)
+        if recipe_id is not None:
+            self._unlink(recipe_id)
+            for lows, highs in self._columns.values():
+                lows[recipe_id] = highs[recipe_id] = MISSING
+            del self._docs[recipe_id]
+
+    def ranges(self, recipe_key):
+        """Return {field: (low, high) or None} as parsed for one recipe"""
+        recipe_id = self._ids[recipe_key]
+        parsed = {}
+        for field, (lows, highs) in self._columns.items():
+            low = lows[recipe_id]
+            parsed[field] = None if low == MISSING else (low, highs[recipe_id])
+        return parsed
+
+    def query(self, filters, keys=None):
+        """Return (key, name) pairs matching every filter, in insertion order
+
+        filters maps a field of RANGE_FIELDS to a (low, high) pair, where
+        either end may be None for an open bound.  keys restricts the
+        search to those recipe keys, e.g. the results of a keyword search.
+        """
+        bounds = []
+        for field, (low, high) in filters.items():
+            if field not in self._columns:
+                raise ValueError(f"unknown range field {field!r}; expected one of {RANGE_FIELDS}")
+            if low is not None or high is not None:
+                bounds.append((self._columns[field], low, high))
+
+        if keys is not None:
+            ids = {self._ids[key] for key in keys if key in self._ids}
+        elif not bounds:
+            ids = self._docs
+        else:
+            ids = self._narrowest(filters)
+
+        docs = self._docs
+        matches = []
+        for recipe_id in sorted(ids):
+            for (lows, highs), low, high in bounds:
+                if (lows[recipe_id] == MISSING
+                        or (low is not None and lows[recipe_id] < low)
+                        or (high is not None and highs[recipe_id] > high)):
+                    break
+            else:
+                matches.append(docs[recipe_id])
+        return matches
+
+    def _narrowest(self, filters):
+        """Return the ids in the smallest slice selected by any single bound"""
+        best = None
+        for field, (low, high) in filters.items():
+            sorted_lows, sorted_highs = self._sorted[field]
+            # Stored values are whole numbers, so fractional bounds round inwards
+            if low is not None:
+                start = bisect_left(sorted_lows, max(math.ceil(low), 0) << _ID_BITS)
+                candidate = (sorted_lows, start, len(sorted_lows))
+                if best is None or candidate[2] - candidate[1] < best[2] - best[1]:
+                    best = candidate
+            if high is not None:
+                stop = (bisect_left(sorted_highs, (math.floor(high) + 1) << _ID_BITS)
+                        if high >= 0 else 0)
+                candidate = (sorted_highs, 0, stop)
+                if best is None or candidate[2] - candidate[1] < best[2] - best[1]:
+                    best = candidate
+        keys, start, stop = best
+        return [key & _ID_MASK for key in keys[start:stop]]
+
+    def _append(self, recipe_key, recipe, keys=True):
+        """Give a new recipe the next id and fill its columns
+
+        With keys=True its sorted-array keys are appended unsorted, for
+        extend() to sort.
+        """
+        recipe_id = self._next_id
+        self._next_id += 1
+        self._ids[recipe_key] = recipe_id
+        self._docs[recipe_id] = (recipe_key, recipe['name'])
+        for field, parsed in _parse_ranges(recipe).items():
+            low, high = parsed or (MISSING, MISSING)
+            lows, highs = self._columns[field]
+            lows.append(low)
+            highs.append(high)
+            if keys and parsed is not None:
+                sorted_lows, sorted_highs = self._sorted[field]
+                sorted_lows.append(low << _ID_BITS | recipe_id)
+                sorted_highs.append(high << _ID_BITS | recipe_id)
+        return recipe_id
+
+    def _unlink(self, recipe_id):
+        """Remove a recipe id's keys from the sorted arrays"""
+        for field, (lows, highs) in self._columns.items():
+            if lows[recipe_id] == MISSING:
+                continue
+            for values, column in zip(self._sorted[field], (lows, highs)):
+                key = column[recipe_id] << _ID_BITS | recipe_id
+                del values[bisect_left(values, key)]
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Recipe Rendering
+Build recipe cards and listings as whole strings and write them in bulk
+"""
+
+from collections import OrderedDict
+
+# Flush bulk output once this many characters are buffered
+CHUNK_SIZE = 64 * 1024
+
+
+def render_recipe(recipe):
+    """Return the full display card for a recipe as one string"""
+    lines = [
+        "",
+        "=" * 60,
+        f"🍰 {recipe['name']} 🍰",
+        "=" * 60,
+        f"Servings: {recipe['servings']}",
+        f"Prep Time: {recipe['prep_time']}",
+        f"Bake Time: {recipe['bake_time']}",
+        "",
+        "📋 INGREDIENTS:",
+        "-" * 30,
+    ]
+    lines.extend(f"• {ingredient}" for ingredient in recipe['ingredients'])
+    lines.extend(["", "👩‍🍳 INSTRUCTIONS:", "-" * 30])
+    lines.extend(f"{i}. {instruction}"
+                 for i, instruction in enumerate(recipe['instructions'], 1))
+    lines.append("=" * 60)
+    return "\n".join(lines) + "\n"
+
+
+def render_listing_entry(number, recipe):
+    """Return one numbered entry of the recipe listing"""
+    return (f"{number}. {recipe['name']}\n"
+            f"   Servings: {recipe['servings']} | Prep: {recipe['prep_time']}"
+            f" | Bake: {recipe['bake_time']}\n")
+
+
+LISTING_HEADER = "\n🍫 Available Chocolate Cake Recipes:\n" + "=" * 50 + "\n"
+LISTING_FOOTER = "=" * 50 + "\n"
+
+
+class RecipeRenderer:
+    """Renders recipe cards, keeping recently shown cards in an LRU cache"""
+
+    def __init__(self, recipes, maxsize=256):
+        self.recipes = recipes
+        self.maxsize = maxsize
+        self._cards = OrderedDict()
+
+    def card(self, recipe_key):
+        """Return the rendered card for a recipe, using the cache if possible"""
+        card = self._cards.get(recipe_key)
+        if card is not None:
+            self._cards.move_to_end(recipe_key)
+            return card
+        card = render_recipe(self.recipes[recipe_key])
+        self._cards[recipe_key] = card
+        if len(self._cards) > self.maxsize:
+            self._cards.popitem(last=False)
+        return card
+
+    def invalidate(self, recipe_key=None):
+        """Drop one cached card, or every card when no key is given"""
+        if recipe_key is None:
+            self._cards.clear()
+        else:
+            self._cards.pop(recipe_key, None)
+
+    def write_card(self, recipe_key, stream):
+        """Write a recipe card to a stream in a single write"""
+        stream.write(self.card(recipe_key))
+
+    def write_listing(self, stream, numbered=None):
+        """Write the numbered recipe listing in large chunks
+
+        numbered yields the (number, recipe key) pairs to list; by default
+        every recipe is listed, numbered from 1.
+        """
+        if numbered is None:
+            entries = (render_listing_entry(number, recipe)
+                       for number, recipe in enumerate(self.recipes.values(), 1))
+        else:
+            recipes = self.recipes
+            entries = (render_listing_entry(number, recipes[key]) for number, key in numbered)
+        _write_chunked(stream, LISTING_HEADER, entries, LISTING_FOOTER)
+
+    def render_all(self, stream):
+        """Stream every recipe card with memory bounded by CHUNK_SIZE
+
+        Bulk output bypasses the cache so a full dump does not evict the
+        cards that interactive lookups are keeping warm.
+        """
+        cards = (render_recipe(recipe) for recipe in self.recipes.values())
+        _write_chunked(stream, "", cards, "")
+
+
+def _write_chunked(stream, header, parts, footer):
+    """Write header, parts and footer, batching parts into CHUNK_SIZE writes"""
+    buffer = [header]
+    buffered = len(header)
+    for part in parts:
+        buffer.append(part)
+        buffered += len(part)
+        if buffered >= CHUNK_SIZE:
+            stream.write("".join(buffer))
+            buffer.clear()
+            buffered = 0
+    buffer.append(footer)
+    stream.write("".join(buffer))
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Ranked Recipe Search
+Typo-tolerant, TF-IDF ranked search with top-k retrieval
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+# Relative weight of a term occurrence in each recipe field
+FIELD_WEIGHTS = {'name': 3.0, 'ingredients': 2.0, 'instructions': 1.0}
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def tokenize(text):
+    """Split text into lower-cased word tokens"""
+    return _WORD_RE.findall(text.lower())
+
+
+def _trigrams(term):
+    """Return the padded trigrams of a term, e.g. '$$c', '$ch', ..., 'e$'"""
+    padded = f"$${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Edit distance between a and b counting an adjacent swap as one edit
+
+    Returns limit + 1 as soon as the distance is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(previous[j] + 1,
+                       current[j - 1] + 1,
+                       previous[j - 1] + (char_a != char_b))
+            if (before is not None and j > 1 and char_a == b[j - 2]
+                    and a[i - 2] == char_b):
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def max_typos(term):
+    """Number of edits tolerated for a query term of this length"""
+    if len(term) <= 3:
+        return 0
+    return 1 if len(term) <= 6 else 2
+
+
+class _Postings:
+    """One term's postings: doc ids ascending with parallel weights
+
+    The impact order (positions sorted by descending weight) is built the
+    first time the term is queried and dropped whenever postings change.
+    """
+
+    __slots__ = ('docs', 'weights', 'impact')
+
+    def __init__(self):
+        self.docs = array('I')
+        self.weights = array('f')
+        self.impact = None
+
+    def weight_of(self, doc_id):
+        """Return this term's weight in a document, or 0.0"""
+        position = bisect_left(self.docs, doc_id)
+        if position < len(self.docs) and self.docs[position] == doc_id:
+            return self.weights[position]
+        return 0.0
+
+    def impact_order(self):
+        """Return positions ordered by descending weight, then ascending doc id"""
+        if self.impact is None:
+            weights = self.weights
+            self.impact = array('I', sorted(range(len(weights)),
+                                            key=lambda position: -weights[position]))
+        return self.impact
+
+
+class RankedRecipeIndex:
+    """TF-IDF index over recipe names, ingredients and instructions
+
+    A term's weight in a recipe sums, over fields, the field weight times
+    (1 + ln tf).  A query term scores weight * idf, and misspelt query
+    terms are matched to vocabulary terms within a small edit distance,
+    found through a trigram index over the vocabulary.
+
+    search() uses the threshold algorithm: impact-ordered postings are read
+    in lockstep and each newly seen recipe is scored in full by binary
+    search, stopping as soon as the k-th best score beats anything unseen.
+    Only a heap of k results is kept, so large result sets are never sorted.
+    """
+
+    def __init__(self, recipes=None):
+        self._next_id = 0
+        self._ids = {}         # recipe key -> doc id
+        self._docs = {}        # doc id -> (recipe key, name)
+        self._postings = {}    # term -> _Postings
+        self._grams = {}       # trigram -> set of vocabulary terms
+        self._dead = 0         # removed doc ids still present in postings
+        if recipes:
+            for key, recipe in recipes.items():
+                self.add(key, recipe)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, recipe_key, recipe):
+        """Index a recipe, replacing any previous version with the same key"""
+        self.remove(recipe_key)
+        doc_id = self._next_id
+        self._next_id += 1
+        self._ids[recipe_key] = doc_id
+        self._docs[doc_id] = (recipe_key, recipe['name'])
+
+        weights = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            value = recipe.get(field, ())
+            texts = [value] if isinstance(value, str) else value
+            counts = Counter(token for text in texts for token in tokenize(text))
+            for term, count in counts.items():
+                weights[term] = weights.get(term, 0.0) + field_weight * (1 + math.log(count))
+
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+                for gram in _trigrams(term):
+                    self._grams.setdefault(gram, set()).add(term)
+            postings.docs.append(doc_id)
+            postings.weights.append(weight)
+            postings.impact = None
+
+    def remove(self, recipe_key):
+        """Drop a recipe; its postings are purged by the next compaction"""
+        doc_id = self._ids.pop(recipe_key, None)
+        if doc_id is None:
+            return
+        del self._docs[doc_id]
+        self._dead += 1
+        if self._dead > len(self._docs):
+            self._compact()
+
+    def expand(self, term):
+        """Return [(vocabulary term, similarity)] for a query term"""
+        if term in self._postings:
+            return [(term, 1.0)]
+        limit = max_typos(term)
+        if not limit:
+            return []
+        # An insertion, deletion or substitution changes at most three
+        # trigrams, but swapping two adjacent letters changes up to four
+        grams = _trigrams(term)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+        needed = len(grams) - 4 * limit
+        matches = []
+        for candidate, count in shared.items():
+            if count >= needed:
+                distance = edit_distance(term, candidate, limit)
+                if distance <= limit:
+                    matches.append((candidate, 1.0 / (1 + distance)))
+        return matches
+
+    def search(self, query, k=20):
+        """Return up to k (key, name, score) results, best first"""
+        if k <= 0:
+            return []
+        live = len(self._docs)
+        query_terms = []
+        for term, count in Counter(tokenize(query)).items():
+            for match, similarity in self.expand(term):
+                postings = self._postings[match]
+                idf = math.log(1 + live / len(postings.docs))
+                query_terms.append((postings, count * similarity * idf))
+        if not query_terms:
+            return []
+
+        docs = self._docs
+        orders = [postings.impact_order() for postings, _ in query_terms]
+        heap = []
+        seen = set()
+        depth = 0
+        while True:
+            bound = 0.0
+            exhausted = True
+            for (postings, query_weight), order in zip(query_terms, orders):
+                if depth >= len(order):
+                    continue
+                exhausted = False
+                position = order[depth]
+                bound += postings.weights[position] * query_weight
+                doc_id = postings.docs[position]
+                if doc_id in seen or doc_id not in docs:
+                    continue
+                seen.add(doc_id)
+                score = sum(other.weight_of(doc_id) * weight
+                            for other, weight in query_terms)
+                entry = (score, -doc_id)
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+            if exhausted or (len(heap) == k and heap[0][0] >= bound):
+                break
+            depth += 1
+
+        results = []
+        for score, negative_id in sorted(heap, reverse=True):
+            key, name = docs[-negative_id]
+            results.append((key, name, score))
+        return results
+
+    def _compact(self):
+        """Rewrite postings without removed recipes and prune dead terms"""
+        docs = self._docs
+        for term in list(self._postings):
+            postings = self._postings[term]
+            keep = [position for position, doc_id in enumerate(postings.docs)
+                    if doc_id in docs]
+            if not keep:
+                del self._postings[term]
+                for gram in _trigrams(term):
+                    terms = self._grams[gram]
+                    terms.discard(term)
+                    if not terms:
+                        del self._grams[gram]
+                continue
+            if len(keep) < len(postings.docs):
+                postings.docs = array('I', (postings.docs[p] for p in keep))
+                postings.weights = array('f', (postings.weights[p] for p in keep))
+                postings.impact = None
+        self._dead = 0
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Recipe Similarity
+Precomputed "you might also like" neighbors over recipe ingredient sets
+
+Each recipe becomes a sparse binary vector over canonical ingredient items
+("2 cups granulated sugar" and "1/2 cup granulated sugar" are the same
+feature), stored as a sorted array of feature ids and scored against
+others by Jaccard or cosine similarity.  Instead
+of comparing every pair, MinHash signatures are split into LSH bands and
+only recipes sharing a band bucket are compared, so building the index is
+roughly linear in the catalog size.
+"""
+
+import heapq
+import math
+import random
+import zlib
+from array import array
+from bisect import bisect_left, insort
+
+from ingredient_store import parse_ingredient
+
+# Neighbors kept per recipe
+NEIGHBORS = 5
+
+# MinHash values per recipe, split into BANDS bands of equal width;
+# 16 bands of 4 find pairs above roughly (1/16) ** (1/4) = 0.5 similarity
+NUM_HASHES = 64
+BANDS = 16
+
+# Members of one bucket compared against a recipe, nearest ids first,
+# so very common ingredient combinations cannot make the build quadratic
+BUCKET_WINDOW = 64
+
+# Catalogs up to this size compare every pair, as LSH would miss weak matches
+EXACT_LIMIT = 1000
+
+METRICS = ('jaccard', 'cosine')
+
+_PRIME = (1 << 61) - 1
+
+
+def _shared_count(first, second):
+    """Count the feature ids two sorted arrays have in common, by merging them"""
+    shared = i = j = 0
+    while i < len(first) and j < len(second):
+        if first[i] < second[j]:
+            i += 1
+        elif first[i] > second[j]:
+            j += 1
+        else:
+            shared += 1
+            i += 1
+            j += 1
+    return shared
+
+
+class RecipeSimilarityIndex:
+    """Cached top-k similar recipes, refreshed incrementally
+
+    neighbors() returns a precomputed list, so a lookup costs O(k).  add()
+    and remove() only update the LSH buckets and queue work; the queued
+    recipes are refreshed together before the next lookup (or by
+    refresh()), computing their own lists and offering themselves to the
+    lists of the recipes they were compared with.  Recipes whose lists
+    referenced a removed or changed recipe are recomputed the same way.
+    """
+
+    def __init__(self, recipes=None, k=NEIGHBORS, metric='jaccard', num_hashes=NUM_HASHES,
+                 bands=BANDS, bucket_window=BUCKET_WINDOW, seed=0):
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+        if num_hashes % bands:
+            raise ValueError("num_hashes must be a multiple of bands")
+        self.k = k
+        self.metric = metric
+        self.bucket_window = bucket_window
+        self._rows = num_hashes // bands
+        rng = random.Random(seed)
+        self._coefficients = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME))
+                              for _ in range(num_hashes)]
+        self._feature_ids = {}      # ingredient item -> feature id
+        self._feature_hashes = []   # feature id -> MinHash values of that item
+        self._text_features = {}    # ingredient text -> feature id
+        self._next_id = 0
+        self._ids = {}              # recipe key -> recipe id
+        self._docs = {}             # recipe id -> (key, name)
+        self._features = {}         # recipe id -> sorted array of feature ids
+        self._bands = {}            # recipe id -> tuple of band keys
+        self._buckets = [{} for _ in range(bands)]  # band key -> array of recipe ids
+        self._neighbors = {}        # recipe id -> ((score, id), ...) best first
+        self._referrers = {}        # recipe id -> ids whose lists include it
+        self._pending = set()       # recipe ids whose lists must be recomputed
+        if recipes:
+            self.extend(recipes.items())
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, recipe_key):
+        return recipe_key in self._ids
+
+    def add(self, recipe_key, recipe):
+        """Index a recipe, replacing any previous version with the same key"""
+        recipe_id = self._ids.get(recipe_key)
+        if recipe_id is None:
+            recipe_id = self._next_id
+            self._next_id += 1
+            self._ids[recipe_key] = recipe_id
+        else:
+            self._unlink(recipe_id)
+        self._docs[recipe_id] = (recipe_key, recipe['name'])
+        features = self._feature_set(recipe['ingredients'])
+        self._features[recipe_id] = array('I', sorted(features))
+        self._neighbors[recipe_id] = ()
+        self._referrers[recipe_id] = set()
+        self._bands[recipe_id] = band_keys = self._band_keys(features)
+        for buckets, band_key in zip(self._buckets, band_keys):
+            members = buckets.get(band_key)
+            if members is None:
+                buckets[band_key] = array('I', [recipe_id])
+            elif members[-1] < recipe_id:
+                members.append(recipe_id)
+            else:
+                insort(members, recipe_id)
+        self._pending.add(recipe_id)
+
+    def extend(self, items):
+        """Index many (key, recipe) pairs, then compute their neighbors in one batch"""
+        for recipe_key, recipe in items:
+            self.add(recipe_key, recipe)
+        self.refresh()
+
+    def remove(self, recipe_key):
+        """Drop a recipe and queue the lists that mentioned it; unknown keys are ignored"""
+        recipe_id = self._ids.pop(recipe_key, None)
+        if recipe_id is None:
+            return
+        self._unlink(recipe_id)
+        for mapping in (self._docs, self._features, self._bands, self._neighbors, self._referrers):
+            del mapping[recipe_id]
+        self._pending.discard(recipe_id)
+
+    def neighbors(self, recipe_key, k=None):
+        """Return up to k (key, name, score) recipes most similar to one recipe"""
+        if self._pending:
+            self.refresh()
+        docs = self._docs
+        entries = self._neighbors[self._ids[recipe_key]]
+        return [(*docs[neighbor_id], score) for score, neighbor_id in entries[:k]]
+
+    def refresh(self):
+        """Recompute every queued recipe's neighbor list"""
+        pending, self._pending = self._pending, set()
+        for recipe_id in sorted(pending):
+            self._refresh_one(recipe_id, pending)
+
+    def similarity(self, first, second):
+        """Exact similarity between two indexed recipes, by key"""
+        return self._score(self._features[self._ids[first]], self._features[self._ids[second]])
+
+    def _score(self, features, other):
+        """Jaccard or cosine similarity of two sorted feature id arrays"""
+        shared = _shared_count(features, other)
+        if not shared:
+            return 0.0
+        if self.metric == 'jaccard':
+            return shared / (len(features) + len(other) - shared)
+        return shared / math.sqrt(len(features) * len(other))
+
+    def _feature_set(self, ingredients):
+        """Return the set of feature ids of an ingredient list, parsing each text once"""
+        features = set()
+        for text in ingredients:
+            feature_id = self._text_features.get(text)
+            if feature_id is None:
+                item = parse_ingredient(text).item.lower()
+                feature_id = self._text_features[text] = self._feature_id(item) if item else -1
+            if feature_id >= 0:
+                features.add(feature_id)
+        return features
+
+    def _feature_id(self, item):
+        """Return an item's feature id, hashing it the first time it is seen"""
+        feature_id = self._feature_ids.get(item)
+        if feature_id is None:
+            feature_id = self._feature_ids[item] = len(self._feature_hashes)
+            # crc32 rather than hash() so signatures are the same in every process
+            value = zlib.crc32(item.encode('utf-8'))
+            self._feature_hashes.append(tuple((a * value + b) % _PRIME
+                                              for a, b in self._coefficients))
+        return feature_id
+
+    def _band_keys(self, features):
+        """Split a feature set's MinHash signature into one key per band"""
+        if not features:
+            return ()
+        hashes = [self._feature_hashes[feature_id] for feature_id in features]
+        signature = hashes[0] if len(hashes) == 1 else tuple(map(min, *hashes))
+        rows = self._rows
+        return tuple(signature[start:start + rows] for start in range(0, len(signature), rows))
+
+    def _candidates(self, recipe_id):
+        """Return the ids sharing a band bucket with a recipe, within the window"""
+        if len(self._docs) <= EXACT_LIMIT:
+            candidates = set(self._docs)
+            candidates.discard(recipe_id)
+            return candidates
+        candidates = set()
+        half = self.bucket_window // 2
+        for buckets, band_key in zip(self._buckets, self._bands[recipe_id]):
+            members = buckets[band_key]
+            if len(members) > self.bucket_window:
+                position = bisect_left(members, recipe_id)
+                members = members[max(0, position - half):position + half]
+            candidates.update(members)
+        candidates.discard(recipe_id)
+        return candidates
+
+    def _refresh_one(self, recipe_id, batch):
+        """Recompute one list and offer the recipe to candidates outside the batch"""
+        features = self._features
+        size = len(features[recipe_id])
+        probe = set(features[recipe_id]).intersection
+        jaccard = self.metric == 'jaccard'
+        scored = []
+        # _score() inlined: this loop is most of the build time, and probing a
+        # set of this recipe's ids stays in C where a merge would loop in Python
+        for candidate in self._candidates(recipe_id):
+            other = features[candidate]
+            shared = len(probe(other))
+            if not shared:
+                continue
+            if jaccard:
+                score = shared / (size + len(other) - shared)
+            else:
+                score = shared / math.sqrt(size * len(other))
+            scored.append((score, -candidate))
+            if candidate not in batch:
+                self._offer(candidate, score, recipe_id)
+        best = heapq.nlargest(self.k, scored)
+        self._set_neighbors(recipe_id, tuple((score, -negative) for score, negative in best))
+
+    def _offer(self, recipe_id, score, candidate):
+        """Insert candidate into a recipe's list if it ranks in the top k"""
+        entries = self._neighbors[recipe_id]
+        if any(neighbor == candidate for _, neighbor in entries):
+            entries = tuple(entry for entry in entries if entry[1] != candidate)
+        elif len(entries) >= self.k and (score, -candidate) <= (entries[-1][0], -entries[-1][1]):
+            return
+        merged = sorted(entries + ((score, candidate),),
+                        key=lambda entry: (-entry[0], entry[1]))[:self.k]
+        self._set_neighbors(recipe_id, tuple(merged))
+
+    def _set_neighbors(self, recipe_id, entries):
+        """Replace a recipe's list, keeping the referrer sets in step"""
+        referrers = self._referrers
+        for _, neighbor_id in self._neighbors[recipe_id]:
+            referrers[neighbor_id].discard(recipe_id)
+        for _, neighbor_id in entries:
+            referrers[neighbor_id].add(recipe_id)
+        self._neighbors[recipe_id] = entries
+
+    def _unlink(self, recipe_id):
+        """Take a recipe out of its buckets and queue the lists that referenced it"""
+        for buckets, band_key in zip(self._buckets, self._bands[recipe_id]):
+            members = buckets[band_key]
+            del members[bisect_left(members, recipe_id)]
+            if not members:
+                del buckets[band_key]
+        self._set_neighbors(recipe_id, ())
+        referrers = self._referrers[recipe_id]
+        for referrer in referrers:
+            self._neighbors[referrer] = tuple(
+                entry for entry in self._neighbors[referrer] if entry[1] != recipe_id)
+            self._pending.add(referrer)
+        referrers.clear()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Shopping List Engine
+Scale recipes to a number of servings and merge them into one shopping list
+"""
+
+from fractions import Fraction
+
+from ingredient_store import Ingredient
+
+# Each unit mapped to (base unit of its family, amount of base unit per unit)
+UNIT_CONVERSIONS = {
+    'teaspoon': ('teaspoon', Fraction(1)),
+    'tablespoon': ('teaspoon', Fraction(3)),
+    'cup': ('teaspoon', Fraction(48)),
+    'oz': ('oz', Fraction(1)),
+    'lb': ('oz', Fraction(16)),
+    'g': ('g', Fraction(1)),
+    'kg': ('g', Fraction(1000)),
+    'ml': ('ml', Fraction(1)),
+    'l': ('ml', Fraction(1000)),
+}
+
+# Units used to display a base-unit total, largest first, with the smallest
+# total (in base units) worth showing in that unit
+DISPLAY_UNITS = {
+    'teaspoon': [('cup', Fraction(12)), ('tablespoon', Fraction(3)), ('teaspoon', 0)],
+    'oz': [('lb', Fraction(16)), ('oz', 0)],
+    'g': [('kg', Fraction(1000)), ('g', 0)],
+    'ml': [('l', Fraction(1000)), ('ml', 0)],
+}
+
+
+def to_base_unit(quantity, unit):
+    """Convert a quantity to its unit family's base unit"""
+    base_unit, factor = UNIT_CONVERSIONS.get(unit, (unit, 1))
+    return quantity * factor, base_unit
+
+
+def from_base_unit(quantity, base_unit):
+    """Express a base-unit quantity in the largest sensible display unit"""
+    for unit, threshold in DISPLAY_UNITS.get(base_unit, ()):
+        if quantity >= threshold:
+            return quantity / UNIT_CONVERSIONS[unit][1], unit
+    return quantity, base_unit
+
+
+class ShoppingListEngine:
+    """Batch recipe scaler backed by an IngredientStore
+
+    Each recipe is compiled once into parallel lists of aggregation group
+    ids and base-unit quantities.  A batch of (recipe key, servings)
+    requests is first folded into one scale factor per recipe, then every
+    compiled row is accumulated into its group in a single pass.
+    """
+
+    def __init__(self, recipes, store):
+        self._recipes = recipes
+        self._store = store
+        self._groups = {}      # (item, base unit) -> group id
+        self._group_keys = []  # group id -> (item, base unit)
+        self._compiled = {}    # recipe key -> (servings, group ids, quantities)
+
+    def forget(self, recipe_key):
+        """Discard a compiled recipe after it changes or is removed"""
+        self._compiled.pop(recipe_key, None)
+
+    def scale_recipe(self, recipe_key, servings):
+        """Return a recipe's ingredients scaled to the given servings"""
+        factor = Fraction(servings) / self._recipes[recipe_key]['servings']
+        scaled = []
+        for ingredient in self._store.ingredients(recipe_key):
+            if ingredient.quantity is not None:
+                ingredient = ingredient._replace(quantity=ingredient.quantity * factor)
+            scaled.append(ingredient)
+        return scaled
+
+    def shopping_list(self, requests):
+        """Merge many (recipe key, servings) requests into one shopping list
+
+        Returns Ingredient records sorted by item, with identical items
+        summed across recipes in normalized units.  Ingredients without a
+        quantity (such as 'salt to taste') are listed once with None.
+        """
+        factors = {}
+        for recipe_key, servings in requests:
+            recipe_servings, _, _ = self._compile(recipe_key)
+            factor = Fraction(servings) / recipe_servings
+            factors[recipe_key] = factors.get(recipe_key, 0) + factor
+
+        totals = {}
+        for recipe_key, factor in factors.items():
+            _, group_ids, quantities = self._compiled[recipe_key]
+            for group_id, quantity in zip(group_ids, quantities):
+                if quantity is None:
+                    totals.setdefault(group_id, None)
+                else:
+                    totals[group_id] = (totals.get(group_id) or 0) + quantity * factor
+
+        shopping = []
+        for group_id, total in totals.items():
+            item, base_unit = self._group_keys[group_id]
+            unit = base_unit
+            if total is not None:
+                total, unit = from_base_unit(total, base_unit)
+            shopping.append(Ingredient(total, unit, item, None))
+        shopping.sort(key=lambda ingredient: (ingredient.item, ingredient.unit or ''))
+        return shopping
+
+    def _compile(self, recipe_key):
+        """Return the cached compiled form of a recipe, building it if needed"""
+        compiled = self._compiled.get(recipe_key)
+        if compiled is None:
+            group_ids = []
+            quantities = []
+            for ingredient in self._store.ingredients(recipe_key):
+                quantity = ingredient.quantity
+                if quantity is None:
+                    base_unit = ingredient.unit
+                else:
+                    quantity, base_unit = to_base_unit(quantity, ingredient.unit)
+                group = (ingredient.item.lower(), base_unit)
+                group_id = self._groups.get(group)
+                if group_id is None:
+                    group_id = self._groups[group] = len(self._group_keys)
+                    self._group_keys.append(group)
+                group_ids.append(group_id)
+                quantities.append(quantity)
+            compiled = (self._recipes[recipe_key]['servings'], group_ids, quantities)
+            self._compiled[recipe_key] = compiled
+        return compiled
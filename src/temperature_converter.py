@@ -1,16 +1,246 @@
 #!/usr/bin/env python3
 """
 Temperature Converter Application
-Convert between Celsius and Fahrenheit temperatures
+Convert between Celsius, Fahrenheit, Kelvin and Rankine temperatures
+
+Run without arguments for the interactive menu, or stream readings:
+    python temperature_converter.py --from C --to F < readings.txt
+    python temperature_converter.py --from F --to C --binary < dump.f64 > out.f64
 """
 
+import sys
+import time
+from array import array
+from fractions import Fraction
+
+# Elements converted per step, bounding temporaries for very large buffers
+BATCH_SIZE = 65536
+
+# Bytes read from stdin per chunk in streaming mode
+CHUNK_BYTES = 1 << 20
+
+# Each scale as an exact affine map to Kelvin: kelvin = value * factor + offset
+SCALES = {
+    'C': ('Celsius', Fraction(1), Fraction(27315, 100)),
+    'F': ('Fahrenheit', Fraction(5, 9), Fraction(45967, 100) * Fraction(5, 9)),
+    'K': ('Kelvin', Fraction(1), Fraction(0)),
+    'R': ('Rankine', Fraction(5, 9), Fraction(0)),
+}
+
+def _compose(source, target):
+    """Return the float (factor, offset) taking source readings to target"""
+    _, source_factor, source_offset = SCALES[source]
+    _, target_factor, target_offset = SCALES[target]
+    # Composed in exact arithmetic so e.g. C->F is exactly 1.8 and 32
+    factor = source_factor / target_factor
+    offset = (source_offset - target_offset) / target_factor
+    return float(factor), float(offset)
+
+# (from scale, to scale) -> (factor, offset) as floats, one multiply-add each.
+# Every conversion goes through here, Celsius <-> Fahrenheit included, so a
+# result may be an ulp off the textbook formula (37 C -> 98.60000000000001 F)
+TRANSFORMS = {(source, target): _compose(source, target)
+              for source in SCALES for target in SCALES}
+
+def _exact(number):
+    """Return a Fraction, reading floats by their decimal form (273.15, not 273.149...)"""
+    return Fraction(repr(number)) if isinstance(number, float) else Fraction(number)
+
+def register_scale(symbol, name, factor, offset):
+    """Add a scale given as kelvin = value * factor + offset
+
+    Transforms to and from every known scale are composed immediately.
+    """
+    symbol = symbol.upper()
+    SCALES[symbol] = (name, _exact(factor), _exact(offset))
+    for other in SCALES:
+        TRANSFORMS[(symbol, other)] = _compose(symbol, other)
+        TRANSFORMS[(other, symbol)] = _compose(other, symbol)
+
+def _pair(source, target):
+    """Return the TRANSFORMS key for two scales, naming the scale if it is unknown"""
+    if (source, target) in TRANSFORMS:
+        return source, target
+    pair = (source.upper(), target.upper())
+    if pair not in TRANSFORMS:
+        unknown = source if pair[0] not in SCALES else target
+        raise ValueError(f"Unknown temperature scale: {unknown}")
+    return pair
+
+def _transform(source, target):
+    """Look up a precomposed transform, naming the scale if it is unknown"""
+    return TRANSFORMS[_pair(source, target)]
+
+def convert(value, source, target):
+    """Convert one reading between any two registered scales"""
+    factor, offset = _transform(source, target)
+    return value * factor + offset
+
 def celsius_to_fahrenheit(celsius):
     """Convert Celsius temperature to Fahrenheit"""
-    return (celsius * 9/5) + 32
+    return convert(celsius, 'C', 'F')
 
 def fahrenheit_to_celsius(fahrenheit):
     """Convert Fahrenheit temperature to Celsius"""
-    return (fahrenheit - 32) * 5/9
+    return convert(fahrenheit, 'F', 'C')
+
+def convert_batch(values, source, target, out=None):
+    """Convert a buffer of readings between any two registered scales
+
+    Accepts array.array, memoryview or NumPy arrays of floats.  Results go
+    to out when given (pass values itself to convert in place, without a
+    copy), otherwise to a new buffer of the same kind.  Every kind of buffer
+    gets results identical to convert().
+    """
+    factor, offset = _transform(source, target)
+    # NumPy is optional and slow to import; a caller holding an ndarray has
+    # already imported it, so look it up instead of importing it here
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        out = numpy.multiply(values, factor, out=out)
+        return numpy.add(out, offset, out=out)
+
+    def convert_slice(chunk):
+        return [value * factor + offset for value in chunk]
+
+    if out is None:
+        out = array(getattr(values, 'typecode', None) or getattr(values, 'format', 'd'))
+        for start in range(0, len(values), BATCH_SIZE):
+            out.extend(convert_slice(values[start:start + BATCH_SIZE]))
+        return out
+
+    if len(out) != len(values):
+        raise ValueError("out must have the same length as values")
+    typecode = getattr(out, 'typecode', None) or out.format
+    for start in range(0, len(values), BATCH_SIZE):
+        stop = start + BATCH_SIZE
+        out[start:stop] = array(typecode, convert_slice(values[start:stop]))
+    return out
+
+def batch_converter(source, target):
+    """Return convert(values, out=None) for one pair of scales"""
+    _transform(source, target)
+
+    def convert_buffer(values, out=None):
+        return convert_batch(values, source, target, out)
+    return convert_buffer
+
+def celsius_to_fahrenheit_batch(values, out=None):
+    """Convert a buffer of Celsius readings to Fahrenheit"""
+    return convert_batch(values, 'C', 'F', out)
+
+def fahrenheit_to_celsius_batch(values, out=None):
+    """Convert a buffer of Fahrenheit readings to Celsius"""
+    return convert_batch(values, 'F', 'C', out)
+
+def stream_text(source, sink, convert, precision=2):
+    """Convert one reading per line from a text stream, chunk by chunk
+
+    Blank lines are skipped.  Returns the number of readings converted.
+    A line that is not a number raises ValueError naming its line number;
+    the chunks before it have already been written.
+    """
+    count = 0
+    line_number = 1
+    pending = ''
+    while True:
+        chunk = source.read(CHUNK_BYTES)
+        if not chunk:
+            break
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        count += convert_lines(lines, sink, convert, precision, line_number)
+        line_number += len(lines)
+    if pending:
+        count += convert_lines([pending], sink, convert, precision, line_number)
+    return count
+
+def _not_a_number(lines, first_line):
+    """Return a ValueError for the first line in lines that float() rejects"""
+    for number, line in enumerate(lines, first_line or 1):
+        if not line.strip():
+            continue
+        try:
+            float(line)
+        except ValueError:
+            where = f"line {number}: " if first_line else ""
+            return ValueError(f"{where}not a temperature reading: {line.strip()!r}")
+    return ValueError("not a temperature reading")
+
+def convert_lines(lines, sink, convert, precision, first_line=None):
+    """Convert one reading per line and write them to sink; returns the count
+
+    Nothing is written if a line is not a number; the ValueError names the
+    line, counting from first_line when it is given.
+    """
+    try:
+        readings = array('d', [float(line) for line in lines if line.strip()])
+    except ValueError:
+        raise _not_a_number(lines, first_line) from None
+    convert(readings, out=readings)
+    if readings:
+        sink.write('\n'.join([f"{value:.{precision}f}" for value in readings]) + '\n')
+    return len(readings)
+
+def stream_binary(source, sink, convert):
+    """Convert native-endian float64 readings from a binary stream in place
+
+    Returns the number of readings converted.
+    """
+    itemsize = array('d').itemsize
+    view = memoryview(bytearray(CHUNK_BYTES))
+    count = 0
+    carry = 0  # bytes of a partial reading kept at the front of the buffer
+    while True:
+        read = source.readinto(view[carry:])
+        if not read:
+            break
+        filled = carry + read
+        usable = filled - filled % itemsize
+        readings = view[:usable].cast('d')
+        convert(readings, out=readings)
+        sink.write(readings)
+        readings.release()
+        count += usable // itemsize
+        carry = filled - usable
+        view[:carry] = view[usable:filled]
+    if carry:
+        raise ValueError("input ends with a partial float64 reading")
+    return count
+
+def run_stream(argv):
+    """Run the non-interactive streaming mode; returns an exit code"""
+    import argparse  # only streaming mode parses options; keeps interactive startup fast
+    parser = argparse.ArgumentParser(
+        description="Convert temperature readings from stdin to stdout")
+    parser.add_argument('--from', dest='source_scale', required=True, type=str.upper,
+                        choices=sorted(SCALES), help="scale of the input readings")
+    parser.add_argument('--to', dest='target_scale', required=True, type=str.upper,
+                        choices=sorted(SCALES), help="scale to convert to")
+    parser.add_argument('--binary', action='store_true',
+                        help="read and write raw native-endian float64 values")
+    parser.add_argument('--precision', type=int, default=2,
+                        help="decimal places in text output (default: 2)")
+    args = parser.parse_args(argv)
+
+    convert = batch_converter(args.source_scale, args.target_scale)
+
+    start = time.perf_counter()
+    try:
+        if args.binary:
+            count = stream_binary(sys.stdin.buffer, sys.stdout.buffer, convert)
+        else:
+            count = stream_text(sys.stdin, sys.stdout, convert, args.precision)
+    except ValueError as error:
+        sys.stdout.flush()
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Converted {count} readings in {elapsed:.3f}s ({rate:,.0f} readings/s)",
+          file=sys.stderr)
+    return 0
 
 def main():
     """Main function to run the temperature converter application"""
@@ -57,4 +287,6 @@ def main():
             print("Invalid input. Please enter a valid number.")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_stream(sys.argv[1:]))
     main()
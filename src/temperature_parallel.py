@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Parallel Temperature Conversion
+Convert many large reading files across a pool of worker processes
+
+Each file is split into byte ranges that end on record boundaries (a
+newline for text, 8 bytes for float64 binary), and every range is a job
+for the pool.  Workers read their range through a memory map:
+
+- binary ranges are converted straight into the same offsets of a
+  preallocated output file, so no data passes back to the parent
+- text ranges are written to numbered part files that the parent joins
+  in range order once every range of the file is done
+
+Usage: python temperature_parallel.py --from C --to F [--binary]
+           [--workers N] --output-dir DIR FILE [FILE ...]
+"""
+
+import argparse
+import mmap
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from temperature_converter import (
+    CHUNK_BYTES,
+    SCALES,
+    batch_converter,
+    convert_lines,
+)
+
+# Ranges are never split smaller than this, so tiny files stay one job
+MIN_RANGE_BYTES = 16 << 20
+
+# Jobs planned per worker, so uneven ranges still balance across the pool
+JOBS_PER_WORKER = 4
+
+_FLOAT64_BYTES = 8
+
+
+def _open_map(path):
+    """Map a whole file read-only, or return b'' for an empty file"""
+    with open(path, 'rb') as stream:
+        if not os.fstat(stream.fileno()).st_size:
+            return b''
+        return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def split_ranges(path, range_bytes, binary=False):
+    """Return [(start, end)] byte ranges of a file ending on record boundaries"""
+    size = os.path.getsize(path)
+    if binary:
+        if size % _FLOAT64_BYTES:
+            raise ValueError(f"{path} ends with a partial float64 reading")
+        step = max(_FLOAT64_BYTES, range_bytes - range_bytes % _FLOAT64_BYTES)
+        return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+    ranges = []
+    data = _open_map(path)
+    try:
+        start = 0
+        while start < size:
+            end = data.find(b'\n', start + range_bytes - 1)
+            end = size if end == -1 else end + 1
+            ranges.append((start, end))
+            start = end
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+    return ranges
+
+
+def _convert_text_range(path, start, end, part_path, source, target, precision):
+    """Worker: convert the text lines in [start, end) into a part file"""
+    convert = batch_converter(source, target)
+    count = 0
+    data = _open_map(path)
+    try:
+        with open(part_path, 'w', encoding='ascii') as sink:
+            position = start
+            while position < end:
+                stop = data.find(b'\n', min(position + CHUNK_BYTES, end) - 1, end)
+                stop = end if stop == -1 else stop + 1
+                lines = data[position:stop].decode('ascii').split('\n')
+                count += convert_lines(lines, sink, convert, precision)
+                position = stop
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+    return count
+
+
+def _convert_binary_range(path, start, end, output_path, source, target):
+    """Worker: convert float64 readings in [start, end) into the output file"""
+    convert = batch_converter(source, target)
+    with open(path, 'rb') as stream, open(output_path, 'r+b') as output:
+        source_map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        output_map = mmap.mmap(output.fileno(), 0)
+        try:
+            source_view = memoryview(source_map)
+            output_view = memoryview(output_map)
+            for position in range(start, end, CHUNK_BYTES):
+                stop = min(position + CHUNK_BYTES, end)
+                readings = source_view[position:stop].cast('d')
+                converted = output_view[position:stop].cast('d')
+                convert(readings, out=converted)
+                readings.release()
+                converted.release()
+            source_view.release()
+            output_view.release()
+        finally:
+            output_map.close()
+            source_map.close()
+    return (end - start) // _FLOAT64_BYTES
+
+
+def convert_files(paths, output_dir, source, target, binary=False,
+                  workers=None, precision=2):
+    """Convert files into output_dir with a process pool
+
+    Returns the number of readings converted in each file, in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    sizes = [os.path.getsize(path) for path in paths]
+    range_bytes = max(MIN_RANGE_BYTES, sum(sizes) // (workers * JOBS_PER_WORKER) + 1)
+    batch_converter(source, target)  # fail on unknown scales before starting
+
+    outputs = [os.path.join(output_dir, os.path.basename(path)) for path in paths]
+    if len(set(outputs)) < len(outputs):
+        raise ValueError("input files must have distinct names")
+    plans = []
+    for path, output, size in zip(paths, outputs, sizes):
+        if os.path.abspath(path) == os.path.abspath(output):
+            raise ValueError(f"{path} would be overwritten by its own output")
+        ranges = split_ranges(path, range_bytes, binary)
+        if binary or not ranges:
+            # Binary output mirrors the input layout; text with no ranges is empty
+            with open(output, 'wb') as stream:
+                stream.truncate(size)
+        plans.append(ranges)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for path, output, ranges in zip(paths, outputs, plans):
+            file_futures = []
+            for index, (start, end) in enumerate(ranges):
+                if binary:
+                    future = pool.submit(_convert_binary_range, path, start, end,
+                                         output, source, target)
+                else:
+                    future = pool.submit(_convert_text_range, path, start, end,
+                                         f"{output}.part{index}", source, target,
+                                         precision)
+                file_futures.append(future)
+            futures.append(file_futures)
+
+        counts = []
+        for output, file_futures in zip(outputs, futures):
+            counts.append(sum(future.result() for future in file_futures))
+            if not binary and file_futures:
+                _join_parts(output, len(file_futures))
+    return counts
+
+
+def _join_parts(output, parts):
+    """Concatenate numbered part files into output, in order, and delete them"""
+    with open(output, 'wb') as sink:
+        for index in range(parts):
+            part_path = f"{output}.part{index}"
+            with open(part_path, 'rb') as part:
+                shutil.copyfileobj(part, sink, CHUNK_BYTES)
+            os.remove(part_path)
+
+
+def main(argv=None):
+    """Convert files in parallel; returns an exit code"""
+    parser = argparse.ArgumentParser(
+        description="Convert temperature reading files across worker processes")
+    parser.add_argument('--from', dest='source_scale', required=True, type=str.upper,
+                        choices=sorted(SCALES), help="scale of the input readings")
+    parser.add_argument('--to', dest='target_scale', required=True, type=str.upper,
+                        choices=sorted(SCALES), help="scale to convert to")
+    parser.add_argument('--binary', action='store_true',
+                        help="files hold raw native-endian float64 values")
+    parser.add_argument('--precision', type=int, default=2,
+                        help="decimal places in text output (default: 2)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('--output-dir', required=True,
+                        help="directory for converted files, named like the inputs")
+    parser.add_argument('files', nargs='+', help="files of readings to convert")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    start = time.perf_counter()
+    counts = convert_files(args.files, args.output_dir, args.source_scale,
+                           args.target_scale, args.binary, args.workers,
+                           args.precision)
+    elapsed = time.perf_counter() - start
+    total = sum(counts)
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"Converted {total} readings in {len(counts)} files in {elapsed:.3f}s"
+          f" ({rate:,.0f} readings/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Shared pytest fixtures
+Serve the ExcuseGenerator apps from a fresh in-memory store in each test
+"""
+
+import sys
+import os
+import asyncio
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+@pytest.fixture
+def excuse_app():
+    """The Flask app module, serving a new in-memory store seeded with the default excuses"""
+    import app
+    previous = app.set_store(app.open_store(":memory:"))
+    yield app
+    app.set_store(previous).close()
+
+@pytest.fixture
+def asgi(excuse_app):
+    """The ASGI app module, which serves the same store as the Flask app"""
+    import asgi as asgi_module
+    return asgi_module
+
+@pytest.fixture
+def call(asgi):
+    """Return a function running one request through the ASGI app"""
+    def call(method, path, body=b'', content_type=b'application/json', headers=(), client=None):
+        """Run one request; return (status, headers, body)"""
+        path, _, query = path.partition('?')
+        scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+                 'headers': [(b'content-type', content_type), *headers]}
+        if client is not None:
+            scope['client'] = (client, 50000)
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(asgi.app(scope, receive, send))
+        return sent[0]['status'], dict(sent[0]['headers']), sent[1]['body']
+    return call
@@ -1,10 +1,9 @@
-# Build a function to convert a number to a binary number
-def convert_to_binary(num):
-    binary = ""
-    while num > 0:
-        binary = str(num % 2) + binary
-        num = num // 2
-    return binary
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# The converter now lives in src/binary_converter.py
+from binary_converter import convert_to_binary
 
 # Test function for pytest
 def test_convert_to_binary():
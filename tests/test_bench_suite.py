@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test module for benchmarks/bench_suite.py
+Tests the baseline file and the regression gate
+"""
+
+import sys
+import os
+import json
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import bench_suite
+
+FAST = ["--only", "temperature.scalar", "binary", "--size", "10", "--repeat", "1",
+        "--min-time", "0.01"]
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    """Test compare() uses relative times and skips benchmarks without a baseline"""
+    baseline = {"a": {"seconds": 1.0, "relative": 1.0}, "b": {"seconds": 1.0, "relative": 1.0}}
+    results = {"a": {"seconds": 9.0, "relative": 1.2}, "b": {"seconds": 1.0, "relative": 1.3},
+               "c": {"seconds": 5.0, "relative": 5.0}}
+    assert bench_suite.compare(results, baseline, 0.25) == {"b": 1.3}
+
+def test_gate_fails_on_regression(tmp_path, capsys):
+    """Test --save records a baseline and a slower run than it exits with 1"""
+    path = tmp_path / "baseline.json"
+    assert bench_suite.main(FAST + ["--baseline", str(path), "--save"]) == 0
+    recorded = json.loads(path.read_text())
+    assert recorded["size"] == 10
+    assert set(recorded["results"]) == {"temperature.scalar", "binary.to_binary"}
+
+    # Pretend the baseline was ten times faster: a regression that survives re-timing.
+    # binary.to_binary gets ample headroom so timing noise alone cannot fail it
+    recorded["results"]["temperature.scalar"]["relative"] /= 10
+    recorded["results"]["binary.to_binary"]["relative"] *= 10
+    path.write_text(json.dumps(recorded))
+    capsys.readouterr()
+    assert bench_suite.main(FAST + ["--baseline", str(path)]) == 1
+    output = capsys.readouterr().out
+    assert "REGRESSED" in output and output.count("Re-timing") == bench_suite.RETRIES
+    assert output.splitlines()[-1].endswith("temperature.scalar")
+
+    recorded["results"]["temperature.scalar"]["relative"] *= 100
+    path.write_text(json.dumps(recorded))
+    assert bench_suite.main(FAST + ["--baseline", str(path)]) == 0
+
+def test_baseline_size_must_match(tmp_path):
+    """Test comparing against a baseline recorded at another size is an error"""
+    path = tmp_path / "baseline.json"
+    bench_suite.save_baseline(path, 100, {"binary.to_binary": {"seconds": 1e-6, "relative": 1e-3}})
+    with pytest.raises(SystemExit):
+        bench_suite.main(FAST + ["--baseline", str(path)])
+    bench_suite.save_baseline(path, 10, {"temperature.scalar": {"seconds": 1e-6, "relative": 1e-3}})
+    assert list(bench_suite.load_baseline(path, 10)) == ["temperature.scalar"]
+
+def test_excuse_benchmarks_restore_the_app_store(tmp_path, monkeypatch, excuse_app):
+    """Test the excuse benchmarks serve a scratch database and put the app's store back"""
+    monkeypatch.delenv("EXCUSE_DB", raising=False)
+    store = excuse_app.get_store()
+    argv = FAST[:1] + ["excuses.random"] + FAST[3:] + ["--baseline", str(tmp_path / "b.json"), "--save"]
+    assert bench_suite.main(argv) == 0
+    assert "EXCUSE_DB" not in os.environ
+    assert excuse_app.get_store() is store
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test module for binary_converter.py
+Tests scalar padding and negative modes, and batch records in a shared buffer
+"""
+
+import sys
+import os
+from array import array
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+import binary_converter
+from binary_converter import batch_width, convert_to_binary, to_binary, to_binary_batch
+
+def legacy_convert_to_binary(num):
+    """The original prepend-a-digit loop, as the reference"""
+    binary = ""
+    while num > 0:
+        binary = str(num % 2) + binary
+        num = num // 2
+    return binary
+
+def test_matches_original_conversion():
+    """Test the compatibility wrapper against the original loop"""
+    for number in list(range(-3, 300)) + [2**64 - 1, 3**200]:
+        assert convert_to_binary(number) == legacy_convert_to_binary(number)
+    assert to_binary(0) == "0"
+    assert to_binary(0, empty_zero=True) == ""
+
+def test_padding_and_negative_modes():
+    """Test zero padding, signs and two's complement"""
+    assert to_binary(5, width=8) == "00000101"
+    assert to_binary(300, width=4) == "100101100"
+    assert to_binary(0, width=3, empty_zero=True) == "000"
+    assert to_binary(-5) == "-101"
+    assert to_binary(-5, width=4) == "-0101"
+    assert to_binary(-5, width=8, negative='twos') == "11111011"
+    assert to_binary(-128, width=8, negative='twos') == "10000000"
+    with pytest.raises(ValueError):
+        to_binary(-129, width=8, negative='twos')
+    with pytest.raises(ValueError):
+        to_binary(-1, negative='twos')
+    with pytest.raises(ValueError):
+        to_binary(128, width=8, negative='twos')
+    assert to_binary(127, width=8, negative='twos') == "01111111"
+    with pytest.raises(ValueError):
+        to_binary(-1, negative='error')
+    with pytest.raises(ValueError):
+        to_binary(1, negative='unsigned')
+
+def test_big_integers():
+    """Test a 4096-bit value round trips"""
+    number = 3**2584
+    digits = to_binary(number)
+    assert len(digits) == number.bit_length() and int(digits, 2) == number
+
+def test_batch_into_preallocated_buffer():
+    """Test fixed-width records written in place, across chunk boundaries"""
+    numbers = array('q', range(1000))
+    out = bytearray(1000 * 10)
+    original = binary_converter.BATCH_SIZE
+    binary_converter.BATCH_SIZE = 64
+    try:
+        assert to_binary_batch(numbers, 10, out) is out
+    finally:
+        binary_converter.BATCH_SIZE = original
+    for index in (0, 1, 63, 64, 999):
+        assert out[index * 10:(index + 1) * 10].decode() == to_binary(index, 10)
+
+def test_batch_widths_and_errors():
+    """Test default widths, two's complement and range checks"""
+    assert batch_width([5, 2]) == 3
+    assert batch_width([0]) == 1
+    assert batch_width([-4, 3], 'twos') == 3
+    assert batch_width([4], 'twos') == 4
+    assert to_binary_batch([5, 2]) == bytearray(b'101010')
+    assert to_binary_batch([-4, 3], negative='twos') == bytearray(b'100011')
+    assert to_binary_batch([2**70, 1]) == bytearray(to_binary(2**70) + to_binary(1, 71), 'ascii')
+    with pytest.raises(ValueError):
+        to_binary_batch([-1, 2])
+    with pytest.raises(ValueError):
+        to_binary_batch([8], width=3)
+    with pytest.raises(ValueError):
+        to_binary_batch([1, 2], width=4, out=bytearray(7))
+    with pytest.raises(ValueError):
+        to_binary_batch([1], negative='sign')
+    with pytest.raises(ValueError):
+        to_binary_batch([-1, 200], width=8, negative='twos')
+
+def test_numpy_batch_matches_format():
+    """Test that the unpackbits path writes the same records"""
+    numpy = pytest.importorskip("numpy")
+    values = numpy.array([0, 1, -1, 5, -128, 127], dtype=numpy.int64)
+    assert (to_binary_batch(values, 8, negative='twos')
+            == to_binary_batch(values.tolist(), 8, negative='twos'))
+    unsigned = numpy.array([2**64 - 1, 3], dtype=numpy.uint64)
+    assert to_binary_batch(unsigned, 64) == to_binary_batch([2**64 - 1, 3], 64)
+    with pytest.raises(ValueError):
+        to_binary_batch(numpy.array([200], dtype=numpy.int64), 8, negative='twos')
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
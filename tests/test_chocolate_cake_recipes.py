@@ -6,12 +6,19 @@ Tests the functionality of the chocolate cake recipes application
 
 import sys
 import os
+import io
+import contextlib
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from chocolate_cake_recipes import (
     CHOCOLATE_CAKE_RECIPES,
     search_recipes_by_keyword,
-    get_recipe_by_number
+    get_recipe_by_number,
+    list_recipes,
+    list_all_recipes,
+    load_catalog,
+    add_recipe,
+    remove_recipe
 )
 
 def test_recipe_data_structure():
@@ -76,6 +83,48 @@ def test_get_recipe_by_number():
     assert get_recipe_by_number(total_recipes + 1) is None, "Should return None for number too high"
     assert get_recipe_by_number(-1) is None, "Should return None for negative number"
 
+def test_get_recipe_by_number_is_stable():
+    """Test that numbers survive recipes being removed and added"""
+    keys = list(CHOCOLATE_CAKE_RECIPES)
+    assert get_recipe_by_number(2) == "fudgy_chocolate"
+    original = remove_recipe("fudgy_chocolate")
+    try:
+        assert get_recipe_by_number(2) is None
+        assert get_recipe_by_number(3) == "german_chocolate"
+        assert get_recipe_by_number(len(keys)) == keys[-1]
+        add_recipe("fudgy_chocolate", original)
+        assert get_recipe_by_number(len(keys) + 1) == "fudgy_chocolate"
+        assert get_recipe_by_number(3) == "german_chocolate"
+        assert [key for key, _ in list_recipes(offset=1, limit=2)] == keys[2:4]
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            list_all_recipes()
+        listing = output.getvalue()
+        assert "\n3. German Chocolate Cake\n" in listing
+        assert f"\n{len(keys) + 1}. Fudgy Chocolate Cake\n" in listing
+    finally:
+        add_recipe("fudgy_chocolate", original)
+        # Restore the original order, and renumber it, for the other tests
+        for key in keys[2:]:
+            add_recipe(key, remove_recipe(key))
+        load_catalog(None)
+    assert list(CHOCOLATE_CAKE_RECIPES) == keys
+    assert get_recipe_by_number(2) == "fudgy_chocolate"
+
+def test_list_recipes_pagination():
+    """Test paging through recipes in display order"""
+    keys = list(CHOCOLATE_CAKE_RECIPES)
+    page = list_recipes(offset=1, limit=2)
+    assert [key for key, _ in page] == keys[1:3]
+    assert page[0][1] == CHOCOLATE_CAKE_RECIPES[keys[1]]
+    assert [key for key, _ in list_recipes(offset=4, limit=10)] == keys[4:]
+    assert list_recipes(offset=len(keys)) == []
+    assert list_recipes(limit=0) == []
+    try:
+        list_recipes(offset=-1)
+        assert False, "Negative offset should raise ValueError"
+    except ValueError:
+        pass
+
 def test_recipe_content_quality():
     """Test that recipes have reasonable content"""
     for recipe_key, recipe in CHOCOLATE_CAKE_RECIPES.items():
@@ -119,6 +168,8 @@ if __name__ == "__main__":
         test_recipe_data_structure,
         test_search_recipes_by_keyword,
         test_get_recipe_by_number,
+        test_get_recipe_by_number_is_stable,
+        test_list_recipes_pagination,
         test_recipe_content_quality,
         test_specific_recipes_exist,
         test_recipe_names_are_descriptive
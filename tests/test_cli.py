@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test module for cli.py and data_snapshot.py
+Tests subcommand dispatch, lazy imports and snapshot freshness
+"""
+
+import sys
+import os
+import subprocess
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import chocolate_cake_recipes
+import cli
+import data_snapshot
+from chocolate_cake_recipes import CHOCOLATE_CAKE_RECIPES, load_catalog
+from recipe_catalog import write_jsonl_catalog
+from recipe_render import render_recipe
+
+CLI = os.path.join(os.path.dirname(__file__), '..', 'src', 'cli.py')
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    """Point the CLI at a temporary snapshot file and excuse database"""
+    monkeypatch.setattr(cli, "SNAPSHOT", str(tmp_path / "tools.snapshot"))
+    excuse_defaults = cli._excuse_modules()
+    monkeypatch.setattr(excuse_defaults, "DATABASE", str(tmp_path / "excuses.db"))
+    return tmp_path
+
+def imported_modules(*argv):
+    """Run cli.py in a fresh interpreter and return the modules it imported"""
+    code = (f"import sys, io, contextlib; sys.path.insert(0, {os.path.dirname(CLI)!r})\n"
+            "import cli\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            f"    cli.main({list(argv)!r})\n"
+            "print(' '.join(sys.modules))\n")
+    env = dict(os.environ, EXCUSE_DB=":memory:")
+    output = subprocess.run([sys.executable, "-c", code], input="100\n", capture_output=True,
+                            text=True, env=env, check=True).stdout
+    return set(output.split())
+
+def test_dispatch_and_usage(capsys):
+    """Test unknown commands and actions print usage and fail"""
+    assert cli.main([]) == 2
+    assert cli.main(["bake"]) == 2
+    assert cli.main(["recipes", "bake"]) == 2
+    assert "Usage:" in capsys.readouterr().err
+    assert cli.main(["--help"]) == 0
+    assert "python cli.py recipes" in capsys.readouterr().out
+
+def test_recipe_actions(capsys):
+    """Test show by number or key, search and similar print the expected lines"""
+    assert cli.main(["recipes", "show", "2"]) == 0
+    assert capsys.readouterr().out == render_recipe(CHOCOLATE_CAKE_RECIPES["fudgy_chocolate"])
+    assert cli.main(["recipes", "show", "no_such_cake"]) == 1
+    assert cli.main(["recipes", "search", "vegan"]) == 0
+    assert "vegan_chocolate\tVegan Chocolate Cake" in capsys.readouterr().out
+    assert cli.main(["recipes", "similar", "classic_chocolate"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines and all(line.count("\t") == 2 for line in lines)
+
+def test_subcommands_import_only_their_modules():
+    """Test showing a recipe or converting readings loads no unrelated subsystem"""
+    shown = imported_modules("recipes", "show", "classic_chocolate")
+    assert "recipe_render" in shown
+    assert not shown & {"recipe_search", "recipe_similarity", "fractions",
+                        "recipe_catalog", "temperature_converter", "sqlite3", "flask", "re"}
+    converted = imported_modules("temperature", "--from", "C", "--to", "F")
+    assert "temperature_converter" in converted
+    assert not converted & {"chocolate_cake_recipes", "sqlite3", "flask"}
+
+def test_excuses_read_snapshot_until_database_changes(tools, capsys):
+    """Test a fresh snapshot replaces the database and a write makes it stale"""
+    assert cli.main(["excuses", "add", "general", "The dog ate my calendar."]) == 0
+    assert cli.main(["snapshot"]) == 0
+    section = data_snapshot.load_section(cli.SNAPSHOT, "excuses")
+    assert "The dog ate my calendar." in section["excuses"]
+    capsys.readouterr()
+    assert cli.main(["excuses", "random", "general"]) == 0
+    assert cli.main(["excuses", "list", "general"]) == 0
+    assert "general\tThe dog ate my calendar.\n" in capsys.readouterr().out
+    assert cli.main(["excuses", "add", "general", "My pen ran out of ink."]) == 0
+    assert data_snapshot.load_section(cli.SNAPSHOT, "excuses") is None
+    capsys.readouterr()
+    assert cli.main(["excuses", "list", "general"]) == 0
+    assert "My pen ran out of ink." in capsys.readouterr().out
+    assert cli.main(["excuses", "random", "no_such_category"]) == 1
+
+def test_excuses_add_checks_like_the_api(tools, capsys):
+    """Test that the CLI rejects the empty and overlong excuses the API rejects"""
+    import excuse_api  # importable once the tools fixture has loaded the excuse modules
+    assert cli.main(["excuses", "add", "general", ""]) == 1
+    assert cli.main(["excuses", "add", "", "No category."]) == 1
+    assert cli.main(["excuses", "add", "general", "x" * (excuse_api.MAX_EXCUSE_LENGTH + 1)]) == 1
+    assert capsys.readouterr().err.count(excuse_api.INVALID_EXCUSE) == 3
+    assert cli.main(["excuses", "list", "general"]) == 0
+    assert "\t\n" not in capsys.readouterr().out
+
+def test_catalog_snapshot(tools, capsys):
+    """Test a snapshotted catalog serves the same recipes without the file index"""
+    path = tools / "recipes.jsonl"
+    write_jsonl_catalog(path, CHOCOLATE_CAKE_RECIPES)
+    try:
+        assert cli.main(["snapshot", "--catalog", str(path)]) == 0
+        capsys.readouterr()
+        assert cli.main(["recipes", "--catalog", str(path), "show", "vegan_chocolate"]) == 0
+        assert type(chocolate_cake_recipes._recipes) is dict
+        assert capsys.readouterr().out == render_recipe(CHOCOLATE_CAKE_RECIPES["vegan_chocolate"])
+        write_jsonl_catalog(path, {"only_cake": CHOCOLATE_CAKE_RECIPES["vegan_chocolate"]})
+        assert cli.main(["recipes", f"--catalog={path}", "show", "1"]) == 0
+        assert type(chocolate_cake_recipes._recipes) is not dict
+    finally:
+        load_catalog(None)
+
+def test_snapshot_rejects_other_versions_and_damage(tmp_path):
+    """Test missing sections and unreadable or foreign snapshot files load as None"""
+    source = tmp_path / "source.txt"
+    source.write_text("data")
+    path = tmp_path / "data.snapshot"
+    data_snapshot.write_snapshot(path, {"data": ([str(source)], {"key": [1, 2.5, "x"]})})
+    assert data_snapshot.load_section(path, "data") == {"key": [1, 2.5, "x"]}
+    assert data_snapshot.load_section(path, "other") is None
+    contents = path.read_bytes()
+    source.write_text("changed")
+    assert data_snapshot.load_section(path, "data") is None
+    path.write_bytes(contents)
+    path.write_bytes(contents.replace(b"SNAP3.", b"SNAP2.", 1))
+    assert data_snapshot.load_section(path, "data") is None
+    path.write_bytes(contents[:-3])
+    assert data_snapshot.load_section(path, "data") is None
+    assert data_snapshot.load_section(tmp_path / "missing.snapshot", "data") is None
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test module for ExcuseGenerator/excuse_api.py
+Tests pre-encoded responses, ETag revalidation and the stats counters
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+import excuse_api
+from excuse_sampler import ExcuseSampler
+from excuse_store import ExcuseStore
+
+SEED = {"late_home": ["Traffic."], "general": ["Phone died."]}
+
+def test_sampler_version_counts_additions():
+    """Test that every add bumps the version, and copies keep it"""
+    sampler = ExcuseSampler(SEED)
+    assert sampler.version == 2
+    clone = sampler.copy()
+    clone.add("general", "Alarm failed.")
+    assert (sampler.version, clone.version) == (2, 3)
+
+def test_categories_encoded_once_per_version():
+    """Test that repeat requests reuse the bytes until an excuse is added"""
+    store = ExcuseStore(":memory:", seed=SEED)
+    first = excuse_api.list_categories(store)
+    encoded = excuse_api.STATS['serializations']
+    second = excuse_api.list_categories(store)
+    assert second.body is first.body
+    assert excuse_api.STATS['serializations'] == encoded
+    assert dict(first.headers) == {'Cache-Control': 'no-cache', 'ETag': '"categories-2"'}
+
+    store.add("new", "Cat on keyboard.")
+    third = excuse_api.list_categories(store)
+    assert third.body == b'["late_home","general","new"]'
+    assert dict(third.headers)['ETag'] == '"categories-3"'
+    store.close()
+
+def test_category_cache_is_per_store():
+    """Test that two stores at the same version serve their own category lists"""
+    first = ExcuseStore(":memory:", seed=SEED)
+    second = ExcuseStore(":memory:", seed={"other": ["Traffic.", "Rain."]})
+    assert first.snapshot().version == second.snapshot().version
+    assert excuse_api.list_categories(first).body == b'["late_home","general"]'
+    assert excuse_api.list_categories(second).body == b'["other"]'
+    first.close()
+    second.close()
+
+def test_if_none_match_returns_304_without_encoding():
+    """Test revalidation, including lists of tags and weak tags"""
+    store = ExcuseStore(":memory:", seed=SEED)
+    etag = dict(excuse_api.list_categories(store).headers)['ETag']
+    encoded = excuse_api.STATS['serializations']
+    for header in (etag, f'"other", W/{etag}', '*'):
+        response = excuse_api.list_categories(store, header)
+        assert response.status == 304 and response.body == b''
+    assert excuse_api.STATS['serializations'] == encoded
+    assert excuse_api.list_categories(store, '"stale"').status == 200
+    store.close()
+
+def test_picks_and_errors_reuse_bytes():
+    """Test that picks are encoded once per excuse and errors never"""
+    store = ExcuseStore(":memory:", seed={"only": ["One excuse."]})
+    excuse_api.excuse_from(store, "only")
+    encoded = excuse_api.STATS['serializations']
+    for _ in range(5):
+        response = excuse_api.random_excuse(store)
+        assert response.body == b'{"category":"only","excuse":"One excuse."}'
+        assert dict(response.headers)['Cache-Control'] == 'no-store'
+        assert excuse_api.excuse_from(store, "missing").status == 404
+    assert excuse_api.add_excuse(store, ["category", "excuse"]).status == 400
+    assert excuse_api.STATS['serializations'] == encoded
+    store.close()
+
+def test_sample_excuses_validation_and_body():
+    """Test the bulk sample endpoint's parameters and joined body"""
+    store = ExcuseStore(":memory:", seed=SEED)
+    response = excuse_api.sample_excuses(store, '3', 'general')
+    assert response.body == b'{"excuses":[' + b','.join(
+        [b'{"category":"general","excuse":"Phone died."}'] * 3) + b']}'
+    assert excuse_api.sample_excuses(store, '5', replace='false').body.count(b'"excuse"') == 2
+    for n in ('0', 'x', str(excuse_api.MAX_SAMPLE + 1)):
+        assert excuse_api.sample_excuses(store, n).status == 400
+    assert excuse_api.sample_excuses(store, '2', replace='maybe').status == 400
+    assert excuse_api.sample_excuses(store, '2', 'missing').status == 404
+    store.close()
+
+def test_add_excuses_validates_before_storing():
+    """Test that one bad item rejects the whole batch, and duplicates are stored once"""
+    store = ExcuseStore(":memory:", seed=SEED)
+    response = excuse_api.add_excuses(store, [{'category': 'a', 'excuse': 'b'}, {'category': 'a'}])
+    assert response.status == 400 and b'Item 1' in response.body
+    assert 'a' not in store.snapshot()
+    assert excuse_api.add_excuses(store, []).status == 400
+    assert excuse_api.add_excuses(store, {'category': 'a', 'excuse': 'b'}).status == 400
+    response = excuse_api.add_excuses(store, [{'category': 'a', 'excuse': 'b'},
+                                              {'category': 'a', 'excuse': 7}])
+    assert response.status == 400 and b'Item 1' in response.body
+    response = excuse_api.add_excuses(store, [{'category': 'a', 'excuse': 'b'}] * 3)
+    assert response.status == 200 and store.snapshot().excuses('a') == ['b']
+    assert b'"added":1,"duplicates":2' in response.body
+    store.close()
+
+def test_add_excuse_rejects_bad_values_and_duplicates():
+    """Test string and length checks, and that a repeat add stores nothing"""
+    store = ExcuseStore(":memory:", seed=SEED)
+    for data in ({'category': 'a', 'excuse': ''}, {'category': 5, 'excuse': 'b'},
+                 {'category': 'a', 'excuse': 'x' * (excuse_api.MAX_EXCUSE_LENGTH + 1)},
+                 {'category': 'c' * (excuse_api.MAX_CATEGORY_LENGTH + 1), 'excuse': 'b'}):
+        assert excuse_api.add_excuse(store, data).status == 400
+    assert b'"duplicate"' not in excuse_api.add_excuse(store, {'category': 'a', 'excuse': 'b'}).body
+    response = excuse_api.add_excuse(store, {'category': 'a', 'excuse': 'b'})
+    assert response.status == 200 and b'"duplicate":true' in response.body
+    assert store.snapshot().excuses('a') == ['b'] and store.duplicates == 1
+    store.close()
+
+def test_body_cache_is_bounded():
+    """Test that the encoded-pick cache is emptied when it fills up"""
+    original = excuse_api.MAX_CACHED_BODIES
+    excuse_api.MAX_CACHED_BODIES = 3
+    try:
+        for number in range(10):
+            excuse_api._pick_body('bounded', f'Excuse {number}.')
+            assert excuse_api.cached_bodies() <= 3
+    finally:
+        excuse_api.MAX_CACHED_BODIES = original
+
+def test_flask_etag_and_stats_routes(excuse_app):
+    """Test the headers and the counter endpoint through Flask"""
+    client = excuse_app.app.test_client()
+    response = client.get('/api/excuses')
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert client.get('/api/excuses', headers={'If-None-Match': etag}).status_code == 304
+
+    before = client.get('/api/stats').get_json()
+    client.get('/api/random-excuse')
+    after = client.get('/api/stats').get_json()
+    assert after['responses'] == before['responses'] + 1
+    assert after['bytes_served'] > before['bytes_served']
+    assert after['not_modified'] >= 1
+    assert 'serialization_us_avg' in after and 'bytes_per_response' in after
+
+def test_flask_bulk_routes(excuse_app):
+    """Test the bulk routes through Flask"""
+    client = excuse_app.app.test_client()
+    items = [{'category': 'bulk', 'excuse': f'Excuse {number}.'} for number in range(5)]
+    assert client.post('/api/add-excuses', json=items).get_json()['added'] == 5
+    data = client.get('/api/excuses/sample?n=10&category=bulk&replace=false').get_json()
+    assert sorted(pick['excuse'] for pick in data['excuses']) == [item['excuse'] for item in items]
+    assert client.get('/api/excuses/sample?n=abc').status_code == 400
+    assert client.post('/api/add-excuses', data='x', content_type='text/plain').status_code == 415
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test module for ExcuseGenerator/asgi.py
+Tests that the ASGI routes match the Flask routes
+"""
+
+import sys
+import os
+import json
+import subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+import excuse_api
+
+APP_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator')
+
+def test_importing_the_apps_opens_no_store(tmp_path):
+    """Test that the store is opened on first use, not when app or asgi is imported"""
+    database = tmp_path / "excuses.db"
+    code = ("import os, asgi, app\n"
+            "assert app._store is None and not os.path.exists(os.environ['EXCUSE_DB'])\n"
+            "print(app.get_store().path)\n")
+    output = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, capture_output=True,
+                            text=True, env=dict(os.environ, EXCUSE_DB=str(database)), check=True)
+    assert output.stdout.strip() == str(database) and database.exists()
+
+def test_read_routes_match_flask(excuse_app, call):
+    """Test that the read-only routes return the same JSON as Flask"""
+    client = excuse_app.app.test_client()
+    status, headers, body = call('GET', '/api/excuses')
+    assert status == 200 and headers[b'content-type'] == b'application/json'
+    assert json.loads(body) == client.get('/api/excuses').get_json()
+    assert int(headers[b'content-length']) == len(body)
+
+    status, _, body = call('GET', '/api/random-excuse')
+    data = json.loads(body)
+    assert status == 200 and data['excuse'] in excuse_app.EXCUSES[data['category']]
+
+    status, _, body = call('GET', '/api/excuse/general')
+    assert status == 200 and json.loads(body)['excuse'] in excuse_app.EXCUSES['general']
+
+    status, _, body = call('GET', '/api/excuse/missing')
+    assert status == 404
+    assert json.loads(body) == client.get('/api/excuse/missing').get_json()
+
+def test_etag_revalidation_and_stats(call):
+    """Test 304 responses and the counter endpoint"""
+    status, headers, _ = call('GET', '/api/excuses')
+    assert headers[b'cache-control'] == b'no-cache'
+    status, _, body = call('GET', '/api/excuses', headers=[(b'if-none-match', headers[b'etag'])])
+    assert status == 304 and body == b''
+    stats = json.loads(call('GET', '/api/stats')[2])
+    assert stats['not_modified'] >= 1
+
+def test_add_excuse_route(excuse_app, call):
+    """Test adding an excuse and the error responses for bad bodies"""
+    status, _, body = call('POST', '/api/add-excuse',
+                           json.dumps({'category': 'asgi_only', 'excuse': 'x'}).encode())
+    assert status == 200 and json.loads(body)['success']
+    assert json.loads(call('GET', '/api/excuse/asgi_only')[2])['excuse'] == 'x'
+
+    items = [{'category': 'asgi_only', 'excuse': 'y'}, {'category': 'asgi_bulk', 'excuse': 'z'}]
+    status, _, body = call('POST', '/api/add-excuses', json.dumps(items).encode())
+    assert status == 200 and json.loads(body)['added'] == 2
+    status, _, body = call('GET', '/api/excuses/sample?n=5&category=asgi_only&replace=false')
+    assert sorted(pick['excuse'] for pick in json.loads(body)['excuses']) == ['x', 'y']
+
+    assert call('POST', '/api/add-excuse', b'{"category": "a"}')[0] == 400
+    assert call('POST', '/api/add-excuse', b'not json')[0] == 400
+    assert call('POST', '/api/add-excuse', b'{}', b'text/plain')[0] == 415
+    assert call('GET', '/api/add-excuse')[0] == 405
+
+    # application/*+json is JSON to Flask's request.is_json, so it is here too
+    body = json.dumps({'category': 'asgi_only', 'excuse': 'w'}).encode()
+    assert call('POST', '/api/add-excuse', body, b'application/merge-patch+json')[0] == 200
+    assert excuse_app.app.test_client().post(
+        '/api/add-excuse', data=body, content_type='application/merge-patch+json'
+    ).status_code == 200
+
+def test_oversized_bodies_are_refused(excuse_app, call):
+    """Test that bodies over the route limit get 413 and are not stored"""
+    body = json.dumps({'category': 'big', 'excuse': 'x' * excuse_api.MAX_EXCUSE_BODY})
+    status, _, reply = call('POST', '/api/add-excuse', body.encode())
+    assert status == 413 and json.loads(reply) == {'error': 'Request body too large'}
+    declared = [(b'content-length', str(excuse_api.MAX_BATCH_BODY + 1).encode())]
+    assert call('POST', '/api/add-excuses', b'[]', headers=declared)[0] == 413
+    assert 'big' not in excuse_app.get_store().snapshot().categories
+
+def test_head_sends_headers_only(call):
+    """Test that HEAD answers with the GET headers and an empty body"""
+    _, get_headers, get_body = call('GET', '/')
+    status, headers, body = call('HEAD', '/')
+    assert status == 200 and body == b''
+    assert headers[b'content-length'] == get_headers[b'content-length'] == str(len(get_body)).encode()
+
+def test_index_and_static_files(call):
+    """Test that the page and static files are served from memory"""
+    status, headers, body = call('GET', '/')
+    assert status == 200 and b'/static/js/script.js' in body
+    status, headers, body = call('GET', '/static/css/styles.css')
+    assert status == 200 and headers[b'content-type'].startswith(b'text/css')
+    assert call('GET', '/static/missing.js')[0] == 404
+    assert call('POST', '/api/excuses')[0] == 405
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test module for ExcuseGenerator/excuse_metrics.py
+Tests the latency histograms, the /metrics routes and the profiler toggle
+"""
+
+import sys
+import os
+import json
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+import excuse_metrics
+from excuse_metrics import RequestMetrics, SamplingProfiler
+
+def test_histogram_buckets_are_cumulative():
+    """Test bucket boundaries, sums and per-status counts"""
+    metrics = RequestMetrics(buckets=(0.001, 0.01))
+    for elapsed_ns, status in ((500_000, 200), (1_000_000, 200), (5_000_000, 404), (2 * 10**9, 500)):
+        metrics.record('/a', status, elapsed_ns)
+    cumulative, sum_ns, statuses = metrics.routes()['/a']
+    assert cumulative == [2, 3, 4]
+    assert sum_ns == 2_006_500_000
+    assert statuses == {200: 2, 404: 1, 500: 1}
+
+    metrics.enabled = False
+    metrics.record('/a', 200, 1)
+    assert metrics.routes()['/a'][0][-1] == 4
+
+def test_render_prometheus_text():
+    """Test the exposition format of counters, histograms and phases"""
+    metrics = RequestMetrics(buckets=(0.001,))
+    metrics.record('/say "hi"', 503, 2_000_000)
+    metrics.add_phase('render', 1500)
+    text = excuse_metrics.render(metrics, SamplingProfiler()).decode()
+    assert '# TYPE excuse_request_duration_seconds histogram' in text
+    assert 'excuse_requests_total{route="/say \\"hi\\"",status="503"} 1' in text
+    assert 'excuse_request_errors_total{route="/say \\"hi\\""} 1' in text
+    assert 'excuse_request_duration_seconds_bucket{route="/say \\"hi\\"",le="0.001"} 0' in text
+    assert 'excuse_request_duration_seconds_bucket{route="/say \\"hi\\"",le="+Inf"} 1' in text
+    assert 'excuse_request_duration_seconds_sum{route="/say \\"hi\\""} 0.002000000' in text
+    assert 'excuse_phase_calls_total{phase="render"} 1' in text
+    assert 'excuse_phase_calls_total{phase="pick"}' in text
+    assert text.endswith('excuse_profiler_samples_total 0\n')
+
+def test_flask_routes_are_recorded_by_template(excuse_app):
+    """Test that Flask requests land under their route template"""
+    client = excuse_app.app.test_client()
+    client.get('/api/excuse/general')
+    client.get('/api/excuse/missing')
+    client.get('/no/such/page')
+    client.get('/')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type == excuse_metrics.CONTENT_TYPE
+    text = response.get_data(as_text=True)
+    assert 'excuse_requests_total{route="/api/excuse/<category>",status="404"}' in text
+    assert 'excuse_requests_total{route="unmatched",status="404"}' in text
+    assert 'excuse_phase_calls_total{phase="render"}' in text
+
+    remote = client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'})
+    assert remote.status_code == 403
+
+def test_asgi_routes_are_recorded_by_template(call):
+    """Test that the ASGI app uses the same labels and guards as Flask"""
+    call('GET', '/api/excuse/general')
+    call('GET', '/static/css/styles.css')
+    status, headers, body = call('GET', '/metrics', client='127.0.0.1')
+    assert status == 200 and headers[b'content-type'].startswith(b'text/plain; version=0.0.4')
+    text = body.decode()
+    assert 'excuse_requests_total{route="/api/excuse/<category>",status="200"}' in text
+    assert 'excuse_requests_total{route="/static/<path:filename>",status="200"}' in text
+    assert call('GET', '/metrics', client='198.51.100.7')[0] == 403
+    assert call('POST', '/debug/profile', b'{"enabled": true}', client='198.51.100.7')[0] == 403
+
+def test_behind_proxy_refuses_loopback(excuse_app, call, monkeypatch):
+    """Test that with EXCUSE_BEHIND_PROXY set even loopback clients are refused"""
+    monkeypatch.setattr(excuse_app, "TRUST_LOOPBACK", False)
+    client = excuse_app.app.test_client()
+    assert client.get('/metrics').status_code == 403
+    assert client.post('/debug/profile', json={'enabled': True}).status_code == 403
+    assert call('GET', '/metrics', client='127.0.0.1')[0] == 403
+    assert call('GET', '/debug/memory')[0] == 403
+    assert not excuse_metrics.PROFILER.running
+
+def test_profiler_samples_a_busy_thread():
+    """Test that the profiler records stacks only while running"""
+    profiler = SamplingProfiler(interval=0.001)
+    done = threading.Event()
+
+    def spin_for_profiler():
+        while not done.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=spin_for_profiler)
+    worker.start()
+    profiler.start()
+    deadline = time.monotonic() + 5
+    while profiler.samples < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    profiler.stop()
+    done.set()
+    worker.join()
+    assert not profiler.running
+    samples = profiler.samples
+    assert samples >= 5
+    assert 'spin_for_profiler' in profiler.collapsed()
+    time.sleep(0.01)
+    assert profiler.samples == samples
+    profiler.reset()
+    assert profiler.collapsed() == ''
+
+def test_profiler_toggle_routes(excuse_app, call):
+    """Test starting, reading and stopping the profiler over HTTP"""
+    client = excuse_app.app.test_client()
+    try:
+        started = client.post('/debug/profile', json={'enabled': True, 'interval': 0.001})
+        assert started.status_code == 200 and started.get_json()['enabled'] is True
+        assert client.post('/debug/profile', json={'enabled': 'yes'}).status_code == 400
+        assert client.post('/debug/profile', json={'enabled': True, 'interval': 0}).status_code == 400
+        assert 'excuse_profiler_running 1' in client.get('/metrics').get_data(as_text=True)
+        assert client.get('/debug/profile').status_code == 200
+    finally:
+        status, _, body = call('POST', '/debug/profile', b'{"enabled": false}')
+    assert status == 200 and json.loads(body)['enabled'] is False
+    assert not excuse_metrics.PROFILER.running
+
+def test_memory_report_routes(excuse_app, call):
+    """Test the memory report through both apps, and that it stays local"""
+    client = excuse_app.app.test_client()
+    client.get('/api/random-excuse')
+    report = client.get('/debug/memory').get_json()
+    assert report['max_bytes'] == excuse_app.MAX_EXCUSE_BYTES
+    assert report['eviction'] == excuse_app.EVICTION_POLICY
+    assert 0 < report['bytes'] <= report['max_bytes'] and report['picks'] >= 1
+    categories = {entry['category']: entry for entry in report['by_category']}
+    assert set(excuse_app.EXCUSES) <= set(categories)
+    assert abs(sum(entry['expected_share'] for entry in categories.values()) - 1) < 1e-3
+    if report['rss_bytes'] is not None:
+        assert report['rss_bytes'] > report['bytes']
+
+    status, headers, body = call('GET', '/debug/memory')
+    assert status == 200 and json.loads(body)['excuses'] == report['excuses']
+    assert call('GET', '/debug/memory', client='203.0.113.9')[0] == 403
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Test module for ExcuseGenerator/excuse_sampler.py
+Tests flat-pool sampling, alias-table weighting and the Flask routes
+"""
+
+import sys
+import os
+import random
+import tracemalloc
+from collections import Counter
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+from excuse_sampler import ExcuseSampler
+
+EXCUSES = {
+    "small": ["s1"],
+    "large": ["l1", "l2", "l3", "l4", "l5", "l6", "l7", "l8", "l9"],
+}
+
+def test_sampler_tracks_categories_and_excuses():
+    """Test that the pool keeps category order and per-category excuses"""
+    sampler = ExcuseSampler(EXCUSES)
+    sampler.add("small", "s2")
+    sampler.add("new", "n1")
+    assert sampler.categories == ["small", "large", "new"]
+    assert sampler.excuses("small") == ["s1", "s2"]
+    assert len(sampler) == 12
+    assert "new" in sampler and "missing" not in sampler
+
+def test_sample_by_category_size():
+    """Test that unweighted picks favour categories holding more excuses"""
+    sampler = ExcuseSampler(EXCUSES, rng=random.Random(1))
+    counts = Counter(sampler.sample()[0] for _ in range(10000))
+    assert 800 < counts["small"] < 1200
+    for _ in range(100):
+        category, excuse = sampler.sample()
+        assert excuse in EXCUSES[category]
+
+def test_sample_by_configured_weights():
+    """Test alias-table sampling with configured and default weights"""
+    sampler = ExcuseSampler(EXCUSES, weights={"small": 3.0}, rng=random.Random(2))
+    counts = Counter(sampler.sample()[0] for _ in range(20000))
+    assert 14000 < counts["small"] < 16000
+
+    sampler = ExcuseSampler(dict(EXCUSES, zero=["z1"]), weights={"zero": 0.0},
+                            rng=random.Random(2))
+    counts = Counter(sampler.sample()[0] for _ in range(5000))
+    assert counts["zero"] == 0
+
+def test_add_category_rebuilds_alias_table():
+    """Test that a new category joins the weighted draw immediately"""
+    sampler = ExcuseSampler({"a": ["a1"]}, weights={}, rng=random.Random(3))
+    sampler.add("b", "b1")
+    counts = Counter(sampler.sample()[0] for _ in range(10000))
+    assert 4500 < counts["a"] < 5500 and counts["a"] + counts["b"] == 10000
+
+def test_sample_many_with_and_without_replacement():
+    """Test bulk picks from the pool and from one category"""
+    sampler = ExcuseSampler(EXCUSES, rng=random.Random(4))
+    picks = sampler.sample_many(50)
+    assert len(picks) == 50
+    assert all(excuse in EXCUSES[category] for category, excuse in picks)
+
+    unique = sampler.sample_many(50, replace=False)
+    assert len(unique) == 10 and len(set(unique)) == 10
+    assert sampler.sample_many(3, "large", replace=False)[0][0] == "large"
+    assert len(set(sampler.sample_many(3, "large", replace=False))) == 3
+    assert sampler.sample_many(4, "small") == [("small", "s1")] * 4
+
+def test_weighted_sample_many_without_replacement():
+    """Test that distinct weighted picks favour heavier categories first"""
+    sampler = ExcuseSampler(dict(EXCUSES, zero=["z1"]), weights={"small": 50.0, "zero": 0},
+                            rng=random.Random(5))
+    firsts = Counter(sampler.sample_many(1, replace=False)[0][0] for _ in range(2000))
+    assert firsts["small"] > 1800 and firsts["zero"] == 0
+    picks = sampler.sample_many(20, replace=False)
+    assert len(picks) == 10 and len(set(picks)) == 10
+
+def test_copy_is_independent():
+    """Test that adding to a copy leaves the original untouched"""
+    sampler = ExcuseSampler(EXCUSES)
+    clone = sampler.copy()
+    clone.add("small", "s2")
+    clone.add("new", "n1")
+    assert sampler.excuses("small") == ["s1"] and "new" not in sampler
+    assert clone.excuses("small") == ["s1", "s2"] and len(clone) == 12
+    assert sampler.sample_many(5, "small", replace=False) == [("small", "s1")]
+
+    # The original now detaches from the pool the copy has extended
+    sampler.add("small", "s3")
+    sampler.add("other", "o1")
+    assert sampler.excuses("small") == ["s1", "s3"] and "new" not in sampler
+    assert clone.excuses("small") == ["s1", "s2"] and "other" not in clone
+    assert sampler.categories == ["small", "large", "other"]
+    assert clone.categories == ["small", "large", "new"]
+    assert len(sampler) == len(clone) == 12
+
+def test_picks_on_old_snapshot_leave_copy_alone():
+    """Test that serving from a sampler does not touch the counters of its copies"""
+    sampler = ExcuseSampler(EXCUSES)
+    clone = sampler.copy()
+    served = clone._served.tobytes()
+    for _ in range(20):
+        sampler.choice("small")
+        sampler.sample()
+    assert clone._served.tobytes() == served
+    assert sum(picks for *_, picks in clone.distribution()) == 0
+    assert sum(picks for *_, picks in sampler.distribution()) == 40
+    # The old snapshot still sees its own ticks, kept aside
+    assert sampler._served[0] > clone._served[0]
+
+def test_copy_cost_does_not_grow_with_pool():
+    """Test that a copy, and picks on both sides of it, allocate the same for any pool size"""
+    def copy_cost(size):
+        sampler = ExcuseSampler.from_columns(["only"], [0] * size, [f"e{n}" for n in range(size)])
+        sampler.add("only", "new")
+        tracemalloc.start()
+        clone = sampler.copy()
+        sampler.sample()
+        clone.sample()
+        cost = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return cost
+
+    assert copy_cost(200000) < copy_cost(1000) + 4096
+
+def test_from_columns_round_trip():
+    """Test rebuilding a sampler from its storage columns"""
+    sampler = ExcuseSampler(EXCUSES)
+    sampler.add("small", "s2")
+    rebuilt = ExcuseSampler.from_columns(*sampler.to_columns(), weights={})
+    assert rebuilt.categories == sampler.categories
+    assert rebuilt.excuses("small") == ["s1", "s2"]
+    assert rebuilt.version == sampler.version == 11
+    assert rebuilt.sample()[0] in ("small", "large")
+
+def test_choice_and_empty_pool():
+    """Test single-category picks and sampling an empty pool"""
+    sampler = ExcuseSampler()
+    try:
+        sampler.sample()
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("expected IndexError")
+    sampler.add("only", "o1")
+    assert sampler.choice("only") == "o1"
+
+def test_without_drops_positions_and_empty_categories():
+    """Test that a compact rebuild keeps order, row ids and ticks, and renumbers categories"""
+    sampler = ExcuseSampler(EXCUSES, weights={"large": 2.0})
+    sampler.add("new", "n1", row_id=40)
+    sampler.choice("large")
+    removed = sampler.positions_of([1, 3, 40, 99])
+    assert removed == [0, 2, 10] and sampler.row_ids(removed) == [1, 3, 40]
+    smaller = sampler.without(removed)
+    assert smaller.categories == ["large"] and "small" not in smaller
+    assert smaller.excuses("large") == EXCUSES["large"][:1] + EXCUSES["large"][2:]
+    assert smaller.to_columns()[3].tolist() == [2] + list(range(4, 11))
+    assert smaller.version == sampler.version + 3 and len(sampler) == 11
+    assert smaller.distribution()[0][4] == 1
+    assert smaller.memory_usage() < sampler.memory_usage()
+    assert smaller.sample()[0] == "large"
+
+def test_victims_follow_policy_and_budgets():
+    """Test which positions each policy drops to fit the pool and category budgets"""
+    sampler = ExcuseSampler(EXCUSES)
+    for position in (5, 1, 7):
+        sampler._served[position] = 100 + position
+    size = sampler.memory_usage() - sampler.memory_usage("small")
+    assert sampler.victims(size, policy="oldest") == [0]
+    dropped = sampler.victims(sampler.memory_usage() - 1, policy="lru")
+    assert dropped == [0]
+    order = sorted(range(len(sampler)), key=sampler._served.__getitem__)
+    dropped = sampler.victims(sampler.memory_usage("large") // 2, policy="lru")
+    assert dropped == sorted(order[:len(dropped)]) and 7 not in dropped
+    assert sampler.without(dropped).memory_usage() <= sampler.memory_usage("large") // 2
+    large_budget = sampler.memory_usage("large") - 1
+    assert sampler.victims(category_max_bytes=large_budget, policy="oldest") == [1]
+    assert not sampler.over_budget(sampler.memory_usage(), sampler.memory_usage("large"))
+    assert sampler.over_budget(category_max_bytes=large_budget)
+    try:
+        sampler.victims(1, policy="random")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+def test_distribution_counts_picks_and_interns_text():
+    """Test expected and served shares, and that equal texts share one string"""
+    sampler = ExcuseSampler(EXCUSES, rng=random.Random(6))
+    for _ in range(1000):
+        sampler.sample()
+    sampler.sample_many(5, "small")
+    stats = {name: (count, share, picks) for name, count, _, share, picks in sampler.distribution()}
+    assert stats["small"][:2] == (1, 0.1) and stats["large"][:2] == (9, 0.9)
+    assert stats["small"][2] + stats["large"][2] == 1005 and stats["large"][2] > 800
+
+    text = "".join(["Shared ", "text."])
+    sampler.add("small", text)
+    sampler.add("large", "Shared text.")
+    assert sampler.excuses("small")[-1] is sampler.excuses("large")[-1]
+
+def test_routes_use_store(excuse_app):
+    """Test the Flask routes against the shared excuse store"""
+    client = excuse_app.app.test_client()
+    categories = client.get('/api/excuses').get_json()
+    assert categories == list(excuse_app.EXCUSES)
+
+    data = client.get('/api/random-excuse').get_json()
+    assert data['excuse'] in excuse_app.EXCUSES[data['category']]
+    assert client.get('/api/excuse/missing').status_code == 404
+
+    response = client.post('/api/add-excuse', json={'category': 'test_only', 'excuse': 'x'})
+    assert response.get_json()['success']
+    assert client.get('/api/excuse/test_only').get_json()['excuse'] == 'x'
+    assert 'test_only' in client.get('/api/excuses').get_json()
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__]))
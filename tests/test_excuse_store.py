@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Test module for ExcuseGenerator/excuse_store.py
+Tests seeding, copy-on-write snapshots and cross-process visibility
+"""
+
+import sys
+import os
+import sqlite3
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'ExcuseGenerator'))
+
+from excuse_store import EVICT_TO, ExcuseStore
+
+SEED = {"late_home": ["Traffic.", "Flat tire."], "general": ["Phone died."]}
+
+def test_seed_once_per_database(tmp_path):
+    """Test that several stores on one file seed it only once"""
+    path = str(tmp_path / "excuses.db")
+    first = ExcuseStore(path, seed=SEED)
+    second = ExcuseStore(path, seed=SEED)
+    try:
+        assert len(first.snapshot()) == 3 and len(second.snapshot()) == 3
+        assert second.snapshot().categories == ["late_home", "general"]
+    finally:
+        first.close()
+        second.close()
+
+def test_add_publishes_new_snapshot():
+    """Test that writes never change a snapshot a reader already holds"""
+    store = ExcuseStore(":memory:", seed=SEED)
+    before = store.snapshot()
+    store.add("general", "Alarm failed.")
+    store.add("new", "Cat on keyboard.")
+    after = store.snapshot()
+    assert before is not after
+    assert before.excuses("general") == ["Phone died."] and "new" not in before
+    assert after.excuses("general") == ["Phone died.", "Alarm failed."]
+    assert after.choice("new") == "Cat on keyboard."
+    store.close()
+
+def test_add_many_is_atomic():
+    """Test that a failing batch stores nothing"""
+    store = ExcuseStore(":memory:", seed=SEED)
+    store.add_many([("bulk", "one"), ("bulk", "two")])
+    assert store.snapshot().excuses("bulk") == ["one", "two"]
+    try:
+        store.add_many([("bulk", "three"), ("bulk", None)])
+    except Exception:
+        pass
+    else:
+        raise AssertionError("expected the NOT NULL constraint to fail")
+    store.refresh_interval = 0
+    assert store.snapshot().excuses("bulk") == ["one", "two"]
+    store.add("bulk", "three")
+    assert store.snapshot().excuses("bulk") == ["one", "two", "three"]
+    store.close()
+
+def test_group_commit_isolates_failing_batches(tmp_path):
+    """Test that queued writers share one commit and only a bad batch fails"""
+    store = ExcuseStore(str(tmp_path / "excuses.db"), seed=SEED)
+    errors = {}
+
+    def write(name, rows):
+        try:
+            store.add_many(rows)
+        except Exception as error:
+            errors[name] = error
+
+    threads = [threading.Thread(target=write, args=("good", [("a", "one")])),
+               threading.Thread(target=write, args=("bad", [("b", "two"), ("b", None)])),
+               threading.Thread(target=write, args=("also_good", [("c", "three")]))]
+    commits = store.commits
+    with store._lock:
+        for thread in threads:
+            thread.start()
+        while len(store._queue) < len(threads):
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+
+    assert store.commits == commits + 1
+    assert list(errors) == ["bad"]
+    snapshot = store.snapshot()
+    assert snapshot.excuses("a") == ["one"] and snapshot.excuses("c") == ["three"]
+    assert "b" not in snapshot
+    store.close()
+
+def test_startup_loads_compacted_snapshot(tmp_path):
+    """Test that a restart loads the snapshot row and replays only newer rows"""
+    path = str(tmp_path / "excuses.db")
+    store = ExcuseStore(path, seed=SEED, compact_every=5)
+    store.add_many([("bulk", f"excuse {index}") for index in range(6)])
+    store.add("late", "after the snapshot")
+    store.close()
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT last_id FROM snapshot").fetchone() == (9,)
+    connection.close()
+
+    reopened = ExcuseStore(path, seed=SEED, weights={"late": 2.0})
+    snapshot = reopened.snapshot()
+    assert snapshot.categories == ["late_home", "general", "bulk", "late"]
+    assert snapshot.excuses("bulk") == [f"excuse {index}" for index in range(6)]
+    assert snapshot.excuses("late") == ["after the snapshot"]
+    assert snapshot.version == len(snapshot) == 10
+    reopened.add("late", "after the restart")
+    assert reopened.snapshot().excuses("late")[-1] == "after the restart"
+    reopened.close()
+
+def test_other_process_writes_become_visible(tmp_path):
+    """Test that a second store, like another worker, sees added excuses"""
+    path = str(tmp_path / "excuses.db")
+    reader = ExcuseStore(path, seed=SEED, refresh_interval=3600)
+    writer = ExcuseStore(path, seed=SEED)
+    try:
+        writer.add("general", "Alarm failed.")
+        assert len(reader.snapshot()) == 3  # not due for a refresh yet
+        reader.refresh_interval = 0
+        assert reader.snapshot().excuses("general") == ["Phone died.", "Alarm failed."]
+    finally:
+        reader.close()
+        writer.close()
+
+def test_concurrent_reads_and_writes(tmp_path):
+    """Test that readers always see consistent snapshots while threads write"""
+    store = ExcuseStore(str(tmp_path / "excuses.db"), seed=SEED, refresh_interval=0)
+    errors = []
+
+    def write(number):
+        for index in range(50):
+            store.add(f"writer_{number}", f"excuse {index}")
+
+    def read():
+        for _ in range(2000):
+            sampler = store.snapshot()
+            category, excuse = sampler.sample()
+            if excuse not in sampler.excuses(category):
+                errors.append((category, excuse))
+
+    threads = [threading.Thread(target=write, args=(number,)) for number in range(4)]
+    threads += [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(store.snapshot()) == 3 + 4 * 50
+    assert store.snapshot().excuses("writer_2") == [f"excuse {index}" for index in range(50)]
+    store.close()
+
+def row_count(store, table="excuses"):
+    """Rows currently in one of the store's tables"""
+    return store._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+def test_duplicates_are_stored_once(tmp_path):
+    """Test that the same excuse added through two stores is one row"""
+    path = str(tmp_path / "excuses.db")
+    first = ExcuseStore(path, seed=SEED)
+    second = ExcuseStore(path, seed=SEED, refresh_interval=0)
+    try:
+        assert first.add("general", "Alarm failed.") is True
+        assert second.add("general", "Alarm failed.") is False
+        assert second.add("late_home", "Alarm failed.") is True
+        assert first.add_many([("general", "Phone died."), ("general", "New one.")]) == 1
+        assert row_count(first) == 6 and first.duplicates == 1 and second.duplicates == 1
+        assert second.snapshot().excuses("general") == ["Phone died.", "Alarm failed.", "New one."]
+    finally:
+        first.close()
+        second.close()
+
+def test_budget_evicts_least_recently_served_or_oldest():
+    """Test that a full pool drops stale excuses first under lru, the first added under oldest"""
+    for policy, keeps_served in (("lru", True), ("oldest", False)):
+        store = ExcuseStore(":memory:", seed={"keep": ["Keep me."]}, eviction=policy)
+        store.add_many([("spam", f"Spam {number:03}.") for number in range(50)])
+        assert store.snapshot().choice("keep") == "Keep me."
+        store.max_bytes = store.snapshot().memory_usage()
+        store.add_many([("spam", f"Spam {number:03}.") for number in range(50, 60)])
+        snapshot = store.snapshot()
+        assert snapshot.memory_usage() <= EVICT_TO * store.max_bytes
+        assert ("keep" in snapshot) is keeps_served
+        spam = snapshot.excuses("spam")
+        assert "Spam 000." not in spam and spam[-1] == "Spam 059."
+        assert store.evicted == 61 - len(snapshot) == row_count(store, "evictions")
+        assert row_count(store) == len(snapshot)
+        store.close()
+
+def test_category_budget_trims_only_that_category():
+    """Test that one flooded category is trimmed while the others stay whole"""
+    store = ExcuseStore(":memory:", seed=SEED)
+    store.add_many([("flood", f"Flood {number}.") for number in range(20)])
+    store.category_max_bytes = store.snapshot().memory_usage("flood")
+    store.add_many([("flood", f"Flood {number}.") for number in range(20, 40)])
+    snapshot = store.snapshot()
+    assert snapshot.memory_usage("flood") <= EVICT_TO * store.category_max_bytes
+    assert snapshot.excuses("flood")[-1] == "Flood 39." and len(snapshot.excuses("flood")) < 20
+    assert snapshot.excuses("late_home") == SEED["late_home"]
+    store.close()
+
+def test_evictions_reach_other_processes(tmp_path):
+    """Test that evictions, and their pruning by compaction, reach another store"""
+    path = str(tmp_path / "excuses.db")
+    writer = ExcuseStore(path, seed=SEED, eviction="oldest", compact_every=0)
+    follower = ExcuseStore(path, refresh_interval=0)
+    behind = ExcuseStore(path, refresh_interval=3600)
+    try:
+        writer.add_many([("bulk", f"Excuse {number}.") for number in range(30)])
+        writer.max_bytes = writer.snapshot().memory_usage()
+        writer.add_many([("bulk", f"Excuse {number}.") for number in range(30, 40)])
+        expected = writer.snapshot()
+        assert writer.evicted and follower.snapshot().excuses("bulk") == expected.excuses("bulk")
+        assert follower.snapshot().version == expected.version
+
+        writer.compact()
+        assert row_count(writer, "evictions") == 0
+        writer.add("bulk", "After the compaction.")
+        behind.refresh_interval = 0
+        for store in (follower, behind):
+            snapshot = store.snapshot()
+            assert snapshot.categories == writer.snapshot().categories
+            assert snapshot.excuses("bulk") == writer.snapshot().excuses("bulk")
+            assert snapshot.version == writer.snapshot().version
+    finally:
+        for store in (writer, follower, behind):
+            store.close()
+
+def test_startup_migrates_old_database(tmp_path):
+    """Test that a database without digests is deduplicated and gets the new schema"""
+    path = str(tmp_path / "excuses.db")
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE excuses (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                              category TEXT NOT NULL, excuse TEXT NOT NULL);
+        CREATE TABLE snapshot (slot INTEGER PRIMARY KEY, last_id INTEGER NOT NULL,
+                               byteorder TEXT NOT NULL, names TEXT NOT NULL,
+                               owners BLOB NOT NULL, excuses TEXT NOT NULL);
+        INSERT INTO excuses (category, excuse) VALUES
+            ('general', 'Phone died.'), ('general', 'Phone died.'), ('late_home', 'Traffic.');
+        INSERT INTO snapshot VALUES (0, 3, 'little', '[]', x'', '[]');
+    """)
+    connection.close()
+    store = ExcuseStore(path, seed=SEED, max_bytes=1 << 20)
+    try:
+        snapshot = store.snapshot()
+        assert snapshot.excuses("general") == ["Phone died."] and len(snapshot) == 2
+        assert store.add("general", "Phone died.") is False
+        store.compact()
+    finally:
+        store.close()
+    reopened = ExcuseStore(path)
+    assert reopened.snapshot().excuses("late_home") == ["Traffic."]
+    reopened.close()
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__]))
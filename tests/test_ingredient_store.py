@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test module for ingredient_store.py
+Tests ingredient parsing and the columnar ingredient store
+"""
+
+import sys
+import os
+import copy
+import json
+import pytest
+from fractions import Fraction
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import chocolate_cake_recipes
+from chocolate_cake_recipes import CHOCOLATE_CAKE_RECIPES, get_parsed_ingredients
+from ingredient_store import (
+    Ingredient,
+    IngredientStore,
+    RecipeCatalogView,
+    parse_ingredient,
+    parse_quantity
+)
+
+def test_parse_ingredient():
+    """Test parsing quantities, units, items and notes"""
+    assert parse_ingredient("1 3/4 cups all-purpose flour") == Ingredient(Fraction(7, 4), "cup", "all-purpose flour", None)
+    assert parse_ingredient("3/4 cup unsweetened cocoa powder") == Ingredient(Fraction(3, 4), "cup", "unsweetened cocoa powder", None)
+    assert parse_ingredient("2 teaspoons baking soda") == Ingredient(2, "teaspoon", "baking soda", None)
+    assert parse_ingredient("2 large eggs") == Ingredient(2, None, "large eggs", None)
+    assert parse_ingredient("1 cup strong black coffee (cooled)") == Ingredient(1, "cup", "strong black coffee", "cooled")
+    assert parse_ingredient("1 cup butter, softened") == Ingredient(1, "cup", "butter", "softened")
+    assert parse_ingredient("1 package (4 oz) sweet baking chocolate") == Ingredient(1, "package", "sweet baking chocolate", "4 oz")
+    assert parse_ingredient("1.5 oz dark chocolate") == Ingredient(Fraction(3, 2), "oz", "dark chocolate", None)
+    assert parse_ingredient("Pinch of salt") == Ingredient(None, "pinch", "salt", None)
+    assert parse_ingredient("vanilla to taste") == Ingredient(None, None, "vanilla to taste", None)
+
+def test_zero_denominator_is_rejected():
+    """Test that quantities dividing by zero raise ValueError"""
+    with pytest.raises(ValueError):
+        parse_quantity("1/0 cup flour")
+    with pytest.raises(ValueError):
+        parse_ingredient("1 3/00 cups sugar")
+
+def test_store_matches_parser():
+    """Test that stored records round-trip for every catalog recipe"""
+    store = IngredientStore(CHOCOLATE_CAKE_RECIPES)
+    assert len(store) == len(CHOCOLATE_CAKE_RECIPES)
+    for key, recipe in CHOCOLATE_CAKE_RECIPES.items():
+        assert store.ingredients(key) == [parse_ingredient(text) for text in recipe['ingredients']]
+        assert list(store.texts(key)) == recipe['ingredients']
+        assert get_parsed_ingredients(key) == store.ingredients(key)
+    assert get_parsed_ingredients("missing") is None
+
+def test_store_replace_remove_and_compact():
+    """Test that replacing and removing recipes keeps other rows intact"""
+    store = IngredientStore(CHOCOLATE_CAKE_RECIPES)
+    store.add("classic_chocolate", ["1 cup cream"])
+    assert store.ingredients("classic_chocolate") == [Ingredient(1, "cup", "cream", None)]
+
+    for key in ["fudgy_chocolate", "german_chocolate", "death_by_chocolate"]:
+        store.remove(key)
+    store.remove("missing")
+    assert store.row_count == 1 + len(CHOCOLATE_CAKE_RECIPES["vegan_chocolate"]["ingredients"])
+    assert list(store.texts("vegan_chocolate")) == CHOCOLATE_CAKE_RECIPES["vegan_chocolate"]["ingredients"]
+    assert list(store) == ["vegan_chocolate", "classic_chocolate"]
+
+def test_catalog_view_behaves_like_dict():
+    """Test that the lazy catalog view exposes the familiar recipe dicts"""
+    view = RecipeCatalogView(CHOCOLATE_CAKE_RECIPES)
+    assert list(view) == list(CHOCOLATE_CAKE_RECIPES)
+    for key, recipe in CHOCOLATE_CAKE_RECIPES.items():
+        assert view[key] == recipe
+        assert view[key]['ingredients'][0] == recipe['ingredients'][0]
+        assert view[key]['ingredients'][-2:] == recipe['ingredients'][-2:]
+    del view["vegan_chocolate"]
+    assert "vegan_chocolate" not in view
+    assert len(view) == len(CHOCOLATE_CAKE_RECIPES) - 1
+
+def test_catalog_view_recipes_refuse_changes():
+    """Test that recipes built by the view raise on change instead of losing it"""
+    view = RecipeCatalogView({"cake": {"name": "Cake", "ingredients": ["2 cups flour"]}})
+    recipe = view["cake"]
+    with pytest.raises(TypeError):
+        recipe["name"] = "Pie"
+    with pytest.raises(TypeError):
+        recipe["ingredients"].append("1 cup sugar")
+    assert view["cake"] == {"name": "Cake", "ingredients": ["2 cups flour"]}
+    assert isinstance(recipe, dict) and isinstance(recipe["ingredients"], list)
+    assert json.loads(json.dumps(recipe)) == recipe
+    edited = copy.deepcopy(recipe)
+    edited["ingredients"].append("1 cup sugar")
+    view["cake"] = edited
+    assert view["cake"]["ingredients"] == ["2 cups flour", "1 cup sugar"]
+
+def test_catalog_view_parses_on_first_store_use():
+    """Test that a view keeps one store, filled only when it is first needed"""
+    view = RecipeCatalogView({"cake": {"name": "Cake", "ingredients": ["2 cups flour"]}})
+    assert view._store is None
+    assert view["cake"]["ingredients"] == ["2 cups flour"]
+    store = view.store
+    assert store.ingredients("cake") == [Ingredient(2, "cup", "flour", None)]
+    view["pie"] = {"name": "Pie", "ingredients": ["1 cup cream"]}
+    assert view.store is store and store.texts("pie") == ["1 cup cream"]
+    assert view.pop("cake")["name"] == "Cake" and "cake" not in store
+
+def test_builtin_catalog_shares_its_store():
+    """Test that the built-in recipes and the parsed records come from one store"""
+    assert isinstance(CHOCOLATE_CAKE_RECIPES, RecipeCatalogView)
+    assert get_parsed_ingredients("classic_chocolate")
+    assert chocolate_cake_recipes._get_ingredient_store() is CHOCOLATE_CAKE_RECIPES.store
+    assert chocolate_cake_recipes._ingredient_store is None
+
+if __name__ == "__main__":
+    # Run tests manually if pytest is not available
+    test_functions = [
+        test_parse_ingredient,
+        test_zero_denominator_is_rejected,
+        test_store_matches_parser,
+        test_store_replace_remove_and_compact,
+        test_catalog_view_behaves_like_dict,
+        test_catalog_view_parses_on_first_store_use,
+        test_builtin_catalog_shares_its_store
+    ]
+    
+    print("Running ingredient store tests...")
+    for test_func in test_functions:
+        try:
+            test_func()
+            print(f"✓ {test_func.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test_func.__name__}: {e}")
+        except Exception as e:
+            print(f"✗ {test_func.__name__}: Unexpected error - {e}")
+    
+    print("Tests completed!")
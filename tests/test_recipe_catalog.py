@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test module for recipe_catalog.py
+Tests JSON Lines and binary catalog files and loading them into the app
+"""
+
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import chocolate_cake_recipes
+from chocolate_cake_recipes import (
+    CHOCOLATE_CAKE_RECIPES,
+    display_recipe,
+    get_recipe_by_number,
+    load_catalog,
+    search_recipes_by_keyword
+)
+from recipe_catalog import (
+    BinaryCatalog,
+    JsonLinesCatalog,
+    _MappedCatalog,
+    iter_jsonl_catalog,
+    open_catalog,
+    write_binary_catalog,
+    write_jsonl_catalog
+)
+from recipe_render import render_recipe
+
+@pytest.fixture(params=["jsonl", "rcat"])
+def catalog_path(request, tmp_path):
+    """Write the built-in recipes in each catalog format"""
+    path = tmp_path / f"recipes.{request.param}"
+    if request.param == "jsonl":
+        write_jsonl_catalog(path, CHOCOLATE_CAKE_RECIPES)
+    else:
+        write_binary_catalog(path, CHOCOLATE_CAKE_RECIPES)
+    return path
+
+def test_catalog_round_trip(catalog_path):
+    """Test that a catalog file reads back exactly like the source dict"""
+    with open_catalog(catalog_path) as catalog:
+        assert len(catalog) == len(CHOCOLATE_CAKE_RECIPES)
+        assert list(catalog) == list(CHOCOLATE_CAKE_RECIPES)
+        assert dict(catalog.items()) == CHOCOLATE_CAKE_RECIPES
+        assert list(catalog.values()) == list(CHOCOLATE_CAKE_RECIPES.values())
+        for position, key in enumerate(CHOCOLATE_CAKE_RECIPES):
+            assert catalog.key_at(position) == key
+            assert catalog[key] == CHOCOLATE_CAKE_RECIPES[key]
+        assert "missing" not in catalog
+        assert catalog.get("missing") is None
+        with pytest.raises(KeyError):
+            catalog["missing"]
+
+def test_open_catalog_detects_format(tmp_path):
+    """Test format detection and rejection of unknown binary versions"""
+    write_jsonl_catalog(tmp_path / "a.jsonl", CHOCOLATE_CAKE_RECIPES)
+    write_binary_catalog(tmp_path / "a.rcat", CHOCOLATE_CAKE_RECIPES)
+    with open_catalog(tmp_path / "a.jsonl") as catalog:
+        assert isinstance(catalog, JsonLinesCatalog)
+    with open_catalog(tmp_path / "a.rcat") as catalog:
+        assert isinstance(catalog, BinaryCatalog)
+
+    data = bytearray((tmp_path / "a.rcat").read_bytes())
+    data[4] = 99
+    (tmp_path / "bad.rcat").write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        BinaryCatalog(tmp_path / "bad.rcat")
+
+def test_binary_catalog_rejects_empty_and_truncated_files(tmp_path):
+    """Test that short binary files raise ValueError rather than struct.error"""
+    write_binary_catalog(tmp_path / "a.rcat", CHOCOLATE_CAKE_RECIPES)
+    data = (tmp_path / "a.rcat").read_bytes()
+    for size in (0, 3, 16, 24):
+        (tmp_path / "short.rcat").write_bytes(data[:size])
+        with pytest.raises(ValueError, match="not a version"):
+            BinaryCatalog(tmp_path / "short.rcat")
+
+def test_catalog_base_is_abstract(tmp_path):
+    """Test that the shared catalog base cannot be used on its own"""
+    (tmp_path / "empty.jsonl").write_bytes(b"")
+    with pytest.raises(TypeError):
+        _MappedCatalog(tmp_path / "empty.jsonl")
+
+def test_binary_catalog_key_lookup_with_unicode(tmp_path):
+    """Test binary search over keys that are not inserted in sorted order"""
+    recipes = {f"recipe_{number:03d}_é": {"name": f"Cake {number}", "servings": number}
+               for number in range(200, 0, -1)}
+    write_binary_catalog(tmp_path / "many.rcat", recipes.items())
+    with BinaryCatalog(tmp_path / "many.rcat") as catalog:
+        for key, recipe in recipes.items():
+            assert catalog[key] == recipe
+        assert catalog.key_at(0) == "recipe_200_é"
+        assert "recipe_000_é" not in catalog
+        assert 5 not in catalog
+
+def test_jsonl_streaming_and_empty_file(tmp_path):
+    """Test streaming JSON Lines and opening an empty catalog"""
+    path = tmp_path / "recipes.jsonl"
+    write_jsonl_catalog(path, CHOCOLATE_CAKE_RECIPES)
+    assert dict(iter_jsonl_catalog(path)) == CHOCOLATE_CAKE_RECIPES
+
+    # Key does not have to come first; it is then found by decoding the line
+    path.write_text('{"name": "Odd Cake", "key": "odd"}\n\n', encoding="utf-8")
+    with JsonLinesCatalog(path) as catalog:
+        assert list(catalog) == ["odd"]
+        assert catalog["odd"] == {"name": "Odd Cake"}
+
+    (tmp_path / "empty.jsonl").write_bytes(b"")
+    with JsonLinesCatalog(tmp_path / "empty.jsonl") as catalog:
+        assert len(catalog) == 0
+
+def test_jsonl_catalog_rejects_duplicate_keys(tmp_path):
+    """Test that a key appearing twice is reported with its line number"""
+    path = tmp_path / "dupes.jsonl"
+    path.write_text('{"key": "a", "name": "A"}\n\n{"key": "b"}\n{"key": "a"}\n',
+                    encoding="utf-8")
+    with pytest.raises(ValueError, match="duplicate key 'a' on line 4"):
+        JsonLinesCatalog(path)
+
+def test_binary_catalog_rejects_duplicate_keys(tmp_path):
+    """Test that writing a key twice fails without creating the catalog"""
+    path = tmp_path / "dupes.rcat"
+    with pytest.raises(ValueError, match="duplicate key 'a'"):
+        write_binary_catalog(path, [("a", {"name": "A"}), ("b", {}), ("a", {"name": "A2"})])
+    assert not path.exists()
+
+def test_load_catalog_serves_app_functions(catalog_path, capsys):
+    """Test that the app reads recipes from a loaded catalog file"""
+    try:
+        load_catalog(catalog_path)
+        assert chocolate_cake_recipes._recipes is not CHOCOLATE_CAKE_RECIPES
+        assert get_recipe_by_number(3) == "german_chocolate"
+        assert get_recipe_by_number(6) is None
+        assert search_recipes_by_keyword("buttermilk") == [
+            ("classic_chocolate", "Classic Chocolate Cake"),
+            ("german_chocolate", "German Chocolate Cake")
+        ]
+        display_recipe("vegan_chocolate")
+        assert capsys.readouterr().out == render_recipe(CHOCOLATE_CAKE_RECIPES["vegan_chocolate"])
+    finally:
+        load_catalog(None)
+    assert chocolate_cake_recipes._recipes is CHOCOLATE_CAKE_RECIPES
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Test module for recipe_index.py
+Tests that the search index matches a linear scan and stays current
+"""
+
+import sys
+import os
+import random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import chocolate_cake_recipes
+from chocolate_cake_recipes import (
+    CHOCOLATE_CAKE_RECIPES,
+    add_recipe,
+    find_recipes,
+    remove_recipe,
+    search_recipes_by_keyword
+)
+from recipe_index import (
+    OrderedKeyIndex,
+    RecipeIndex,
+    MISSING,
+    RecipeRangeIndex,
+    parse_minutes,
+    parse_servings
+)
+
+def linear_search(recipes, keyword):
+    """Reference implementation: scan every name and ingredient"""
+    if not keyword or not keyword.strip():
+        return []
+    keyword_lower = keyword.lower()
+    return [(key, recipe['name']) for key, recipe in recipes.items()
+            if keyword_lower in recipe['name'].lower()
+            or any(keyword_lower in ingredient.lower() for ingredient in recipe['ingredients'])]
+
+KEYWORDS = [
+    "Classic", "buttermilk", "CHOCOLATE", "c", "co", "coc", "cocoa", "late ca",
+    " flour", "all-purpose flour", "1/2 cup", "egg", "  ", "", "xyz", "cups all", "(4 oz)"
+]
+
+def test_index_matches_linear_scan():
+    """Test that the index returns the same results and order as a scan"""
+    index = RecipeIndex(CHOCOLATE_CAKE_RECIPES)
+    for keyword in KEYWORDS:
+        assert index.search(keyword) == linear_search(CHOCOLATE_CAKE_RECIPES, keyword), keyword
+
+def test_index_incremental_updates():
+    """Test that add, replace and remove keep the index consistent"""
+    recipes = dict(CHOCOLATE_CAKE_RECIPES)
+    index = RecipeIndex(recipes)
+
+    recipes["mocha"] = {"name": "Mocha Chocolate Cake", "ingredients": ["2 tablespoons espresso powder"]}
+    index.add("mocha", recipes["mocha"])
+    assert index.search("espresso") == [("mocha", "Mocha Chocolate Cake")]
+
+    # Replacing a recipe keeps its position and forgets old ingredients
+    recipes["classic_chocolate"] = {"name": "Classic Chocolate Cake", "ingredients": ["1 cup saffron"]}
+    index.add("classic_chocolate", recipes["classic_chocolate"])
+    for keyword in KEYWORDS + ["saffron", "coffee"]:
+        assert index.search(keyword) == linear_search(recipes, keyword), keyword
+
+    del recipes["mocha"]
+    index.remove("mocha")
+    index.remove("missing")
+    assert index.search("espresso") == []
+    assert len(index) == len(recipes)
+
+    # Removing everything leaves no postings behind
+    for key in list(recipes):
+        index.remove(key)
+    assert len(index) == 0
+    assert index._line_docs == {} and index._token_lines == {} and index._gram_tokens == {}
+
+def test_add_and_remove_recipe_update_search():
+    """Test that the module helpers keep search_recipes_by_keyword current"""
+    search_recipes_by_keyword("warm up the index")
+    assert chocolate_cake_recipes._search_index is not None
+    try:
+        add_recipe("matcha_chocolate", {
+            "name": "Matcha Chocolate Cake",
+            "servings": 8,
+            "prep_time": "20 minutes",
+            "bake_time": "30 minutes",
+            "ingredients": ["2 teaspoons matcha powder"],
+            "instructions": ["Whisk the matcha into the batter."]
+        })
+        assert search_recipes_by_keyword("matcha") == [("matcha_chocolate", "Matcha Chocolate Cake")]
+    finally:
+        remove_recipe("matcha_chocolate")
+    assert search_recipes_by_keyword("matcha") == []
+    assert "matcha_chocolate" not in CHOCOLATE_CAKE_RECIPES
+
+def test_ordered_key_index():
+    """Test positional lookups stay put across appends and removals"""
+    order = OrderedKeyIndex(CHOCOLATE_CAKE_RECIPES)
+    size = len(CHOCOLATE_CAKE_RECIPES)
+    assert len(order) == size
+    assert order.key_at(0) == "classic_chocolate"
+    order.append("mocha")
+    assert order.key_at(size) == "mocha"
+    order.remove("fudgy_chocolate")
+    order.remove("missing")
+    assert order.key_at(0) == "classic_chocolate"
+    assert order.key_at(1) is None
+    assert order.key_at(2) == "german_chocolate"
+    assert order.position("mocha") == size and "fudgy_chocolate" not in order
+    assert len(order) == size + 1
+    assert [number for number, _ in order.numbered()] == [1, *range(3, size + 2)]
+
+def test_ordered_key_index_pages_skip_tombstones():
+    """Test page() against filtering the live keys, with many removals"""
+    rng = random.Random(8)
+    keys = [f"cake_{n}" for n in range(300)]
+    order = OrderedKeyIndex(keys)
+    for key in rng.sample(keys, 120):
+        order.remove(key)
+    for number in range(300, 340):
+        order.append(f"cake_{number}")
+    live = [key for key in [*keys, *(f"cake_{n}" for n in range(300, 340))] if key in order]
+    for offset in range(0, len(live) + 2, 7):
+        for limit in (0, 1, 5, 40):
+            assert order.page(offset, limit) == live[offset:offset + limit], (offset, limit)
+    assert [key for _, key in order.numbered()] == live
+
+def timed_catalog(size, seed):
+    """Build recipes with varied time formats, including unparseable ones"""
+    rng = random.Random(seed)
+    formats = ["{a} minutes", "{a}-{b} minutes", "{a} min", "1 hour {a} minutes", "overnight"]
+    return {f"cake_{n}": {
+        "name": f"Cake {n}",
+        "servings": rng.choice([rng.randint(4, 16), f"{rng.randint(4, 8)}-{rng.randint(9, 16)}"]),
+        "prep_time": rng.choice(formats).format(a=rng.randint(5, 30), b=rng.randint(31, 40)),
+        "bake_time": rng.choice(formats[:4]).format(a=rng.randint(15, 40), b=rng.randint(41, 60)),
+        "ingredients": []
+    } for n in range(size)}
+
+def linear_filter(recipes, filters):
+    """Reference implementation: parse every recipe on every query"""
+    matches = []
+    for key, recipe in recipes.items():
+        prep, bake = parse_minutes(recipe['prep_time']), parse_minutes(recipe['bake_time'])
+        ranges = {'prep': prep, 'bake': bake, 'servings': parse_servings(recipe['servings']),
+                  'total': prep and bake and (prep[0] + bake[0], prep[1] + bake[1])}
+        if all(ranges[field] is not None
+               and (low is None or ranges[field][0] >= low)
+               and (high is None or ranges[field][1] <= high)
+               for field, (low, high) in filters.items()
+               if low is not None or high is not None):
+            matches.append((key, recipe['name']))
+    return matches
+
+RANGE_QUERIES = [
+    {}, {'total': (None, 45)}, {'bake': (25, 35)}, {'servings': (10, None)},
+    {'prep': (10, 20), 'servings': (None, 8)}, {'total': (60, None), 'bake': (None, 40)},
+    {'total': (None, -1)}, {'prep': (None, None)}, {'servings': (100, None)},
+    {'total': (None, 60.5)}, {'servings': (9.5, None)}, {'bake': (24.5, 35.9), 'prep': (-0.5, None)}
+]
+
+def test_parse_minutes_and_servings():
+    """Test the duration and servings formats"""
+    assert parse_minutes("30-35 minutes") == (30, 35)
+    assert parse_minutes("20 minutes") == (20, 20)
+    assert parse_minutes("1 hour 15 minutes") == (75, 75)
+    assert parse_minutes("1-1.5 hrs") == (60, 90)
+    assert parse_minutes("45 min") == (45, 45)
+    assert parse_minutes("overnight") is None
+    assert parse_servings(8) == (8, 8)
+    assert parse_servings("8-10 slices") == (8, 10)
+    assert parse_servings(None) is None
+
+def test_range_index_matches_linear_filter():
+    """Test every filter shape against parsing each recipe per query"""
+    recipes = timed_catalog(400, seed=3)
+    index = RecipeRangeIndex(recipes)
+    for filters in RANGE_QUERIES:
+        assert index.query(filters) == linear_filter(recipes, filters), filters
+    keys = ["cake_5", "cake_7", "missing"]
+    assert index.query({'total': (None, 60)}, keys) == [
+        match for match in linear_filter(recipes, {'total': (None, 60)}) if match[0] in keys]
+
+def test_range_index_incremental_updates():
+    """Test that add, replace, remove and extend keep the arrays consistent"""
+    recipes = timed_catalog(200, seed=4)
+    index = RecipeRangeIndex(recipes)
+    extra = timed_catalog(260, seed=5)
+    for number in range(0, 260, 3):
+        key = f"cake_{number}"
+        recipes[key] = extra[key]
+        index.add(key, extra[key])
+    for number in range(1, 120, 4):
+        del recipes[f"cake_{number}"]
+        index.remove(f"cake_{number}")
+    index.remove("missing")
+    batch = {key: extra[key] for key in list(extra)[150:]}
+    recipes.update(batch)
+    index.extend(batch.items())
+    assert len(index) == len(recipes)
+    for filters in RANGE_QUERIES:
+        assert index.query(filters) == linear_filter(recipes, filters), filters
+
+def test_range_index_clamps_huge_values():
+    """Test that values beyond the 32-bit columns are clamped, not lost"""
+    recipes = {"feast": {"name": "Feast", "servings": 10 ** 12, "prep_time": "5000000000 minutes",
+                         "bake_time": "30 minutes", "ingredients": []}}
+    index = RecipeRangeIndex(recipes)
+    ranges = index.ranges("feast")
+    assert ranges['servings'][0] == ranges['prep'][1] == MISSING - 1
+    assert index.query({'servings': (1000, None)}) == [("feast", "Feast")]
+    assert index.query({'total': (None, 10 ** 6)}) == []
+    index.remove("feast")
+    assert len(index) == 0
+
+def test_find_recipes_combines_keyword_and_ranges():
+    """Test the one-call query API over the built-in recipes"""
+    assert find_recipes(total=(None, 45)) == [("fudgy_chocolate", "Fudgy Chocolate Cake")]
+    assert [key for key, _ in find_recipes(servings=(10, None))] == [
+        "fudgy_chocolate", "german_chocolate", "death_by_chocolate"]
+    assert [key for key, _ in find_recipes("buttermilk", bake=(25, 35))] == [
+        "classic_chocolate", "german_chocolate"]
+    assert find_recipes("xyz", total=(None, 500)) == []
+    assert find_recipes(total=(None, 60.5)) == find_recipes(total=(None, 60))
+    assert find_recipes(servings=(9.5, None)) == find_recipes(servings=(10, None))
+    assert len(find_recipes()) == len(CHOCOLATE_CAKE_RECIPES)
+    try:
+        add_recipe("quick_mug", {"name": "Quick Mug Cake", "servings": 1, "prep_time": "5 minutes",
+                                 "bake_time": "1-2 minutes", "ingredients": [], "instructions": []})
+        assert find_recipes(total=(None, 10)) == [("quick_mug", "Quick Mug Cake")]
+    finally:
+        remove_recipe("quick_mug")
+    assert find_recipes(total=(None, 10)) == []
+
+if __name__ == "__main__":
+    # Run tests manually if pytest is not available
+    test_functions = [
+        test_index_matches_linear_scan,
+        test_index_incremental_updates,
+        test_add_and_remove_recipe_update_search,
+        test_ordered_key_index,
+        test_ordered_key_index_pages_skip_tombstones,
+        test_parse_minutes_and_servings,
+        test_range_index_matches_linear_filter,
+        test_range_index_incremental_updates,
+        test_range_index_clamps_huge_values,
+        test_find_recipes_combines_keyword_and_ranges
+    ]
+    
+    print("Running recipe index tests...")
+    for test_func in test_functions:
+        try:
+            test_func()
+            print(f"✓ {test_func.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test_func.__name__}: {e}")
+        except Exception as e:
+            print(f"✗ {test_func.__name__}: Unexpected error - {e}")
+    
+    print("Tests completed!")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test module for recipe_render.py
+Tests recipe card rendering, the card cache and bulk output
+"""
+
+import sys
+import os
+import io
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import recipe_render
+from chocolate_cake_recipes import (
+    CHOCOLATE_CAKE_RECIPES,
+    add_recipe,
+    display_recipe,
+    list_all_recipes,
+    render_all
+)
+from recipe_render import RecipeRenderer, render_recipe
+
+class CountingStream(io.StringIO):
+    """StringIO that counts write calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+def test_render_recipe_layout():
+    """Test that a card contains every section in order"""
+    recipe = CHOCOLATE_CAKE_RECIPES["classic_chocolate"]
+    lines = render_recipe(recipe).split("\n")
+    assert lines[0] == ""
+    assert lines[1] == "=" * 60
+    assert lines[2] == "🍰 Classic Chocolate Cake 🍰"
+    assert lines[4] == "Servings: 8"
+    assert lines[10] == "• 2 cups all-purpose flour"
+    assert "1. Preheat oven to 350°F (175°C). Grease and flour two 9-inch round pans." in lines
+    assert lines[-2:] == ["=" * 60, ""]
+
+def test_display_recipe_single_write(capsys):
+    """Test that display_recipe and list_all_recipes print the expected text"""
+    display_recipe("german_chocolate")
+    assert capsys.readouterr().out == render_recipe(CHOCOLATE_CAKE_RECIPES["german_chocolate"])
+    display_recipe("missing")
+    assert capsys.readouterr().out == "Recipe not found!\n"
+    list_all_recipes()
+    out = capsys.readouterr().out
+    assert out.startswith("\n🍫 Available Chocolate Cake Recipes:\n")
+    assert "1. Classic Chocolate Cake\n   Servings: 8 | Prep: 20 minutes | Bake: 30-35 minutes\n" in out
+
+def test_card_cache_lru_and_invalidation():
+    """Test LRU eviction and invalidation of cached cards"""
+    recipes = dict(CHOCOLATE_CAKE_RECIPES)
+    renderer = RecipeRenderer(recipes, maxsize=2)
+    stream = CountingStream()
+    renderer.write_card("classic_chocolate", stream)
+    renderer.write_card("fudgy_chocolate", stream)
+    renderer.card("classic_chocolate")
+    renderer.card("vegan_chocolate")
+    assert list(renderer._cards) == ["classic_chocolate", "vegan_chocolate"]
+    assert stream.writes == 2
+
+    recipes["classic_chocolate"] = dict(recipes["classic_chocolate"], name="New Chocolate Cake")
+    assert "Classic" in renderer.card("classic_chocolate")
+    renderer.invalidate("classic_chocolate")
+    assert "New Chocolate Cake" in renderer.card("classic_chocolate")
+
+def test_add_recipe_invalidates_card(capsys):
+    """Test that add_recipe refreshes the cached card"""
+    original = CHOCOLATE_CAKE_RECIPES["fudgy_chocolate"]
+    display_recipe("fudgy_chocolate")
+    try:
+        add_recipe("fudgy_chocolate", dict(original, servings=3))
+        capsys.readouterr()
+        display_recipe("fudgy_chocolate")
+        assert "Servings: 3\n" in capsys.readouterr().out
+    finally:
+        add_recipe("fudgy_chocolate", original)
+
+def test_render_all_chunks_output(monkeypatch):
+    """Test that render_all writes every card in bounded chunks"""
+    stream = CountingStream()
+    render_all(stream)
+    expected = "".join(render_recipe(recipe) for recipe in CHOCOLATE_CAKE_RECIPES.values())
+    assert stream.getvalue() == expected
+    assert stream.writes == 1
+
+    monkeypatch.setattr(recipe_render, "CHUNK_SIZE", 1000)
+    stream = CountingStream()
+    render_all(stream)
+    assert stream.getvalue() == expected
+    assert stream.writes > 1
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test module for recipe_search.py
+Tests typo tolerance, TF-IDF ranking and top-k retrieval
+"""
+
+import sys
+import os
+import random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from chocolate_cake_recipes import CHOCOLATE_CAKE_RECIPES, search_recipes_ranked
+from recipe_search import RankedRecipeIndex, edit_distance, tokenize
+
+def brute_force(index, query, k):
+    """Score every recipe for query and fully sort, for comparison"""
+    scored = []
+    for doc_id, (key, name) in index._docs.items():
+        score = 0.0
+        for term in tokenize(query):
+            for match, similarity in index.expand(term):
+                postings = index._postings[match]
+                idf = __import__('math').log(1 + len(index) / len(postings.docs))
+                score += postings.weight_of(doc_id) * similarity * idf
+        if score > 0:
+            scored.append((-score, doc_id, key))
+    return [key for _, _, key in sorted(scored)[:k]]
+
+def random_catalog(size, seed):
+    """Build a catalog with heavily repeated words and varied weights"""
+    rng = random.Random(seed)
+    words = ["mocha", "fudge", "berry", "spice", "pecan", "cocoa", "cream", "zest", "honey", "malt"]
+    return {f"cake_{n}": {
+        "name": " ".join(rng.sample(words, 2)) + " cake",
+        "ingredients": [" ".join(rng.choices(words, k=3)) for _ in range(rng.randint(1, 4))],
+        "instructions": [" ".join(rng.choices(words, k=5))]
+    } for n in range(size)}
+
+def test_tokenize_and_edit_distance():
+    """Test tokenizing and bounded edit distance"""
+    assert tokenize("1 cup butter, softened (4 oz)") == ["1", "cup", "butter", "softened", "4", "oz"]
+    assert edit_distance("chocolat", "chocolate", 2) == 1
+    assert edit_distance("buttermlk", "buttermilk", 2) == 1
+    assert edit_distance("kitten", "sitting", 3) == 3
+    assert edit_distance("cake", "chocolate", 2) == 3
+    assert edit_distance("vegna", "vegan", 2) == 1
+
+def test_typo_tolerant_search():
+    """Test that misspelt queries still find recipes"""
+    keys = [key for key, _, _ in search_recipes_ranked("chocolat")]
+    assert set(keys) == set(CHOCOLATE_CAKE_RECIPES)
+    keys = [key for key, _, _ in search_recipes_ranked("buttermlk")]
+    assert set(keys) == {"classic_chocolate", "german_chocolate"}
+    assert search_recipes_ranked("vegna")[0][0] == "vegan_chocolate"
+    # Adjacent letters swapped mid-word change four trigrams, not three
+    for typo, word in (("sguar", "sugar"), ("folur", "flour"), ("chcolate", "chocolate")):
+        assert edit_distance(typo, word, 1) == 1
+        assert ([key for key, _, _ in search_recipes_ranked(typo)]
+                == [key for key, _, _ in search_recipes_ranked(word)])
+    assert search_recipes_ranked("xyzzy") == []
+    assert search_recipes_ranked("   ") == []
+
+def test_ranking_prefers_name_and_frequency():
+    """Test that name matches outrank instruction-only matches"""
+    results = search_recipes_ranked("german pecan")
+    assert results[0][0] == "german_chocolate"
+    scores = [score for _, _, score in search_recipes_ranked("chocolate chips")]
+    assert scores == sorted(scores, reverse=True)
+
+def test_top_k_matches_brute_force():
+    """Test that the threshold algorithm returns the exact top k"""
+    index = RankedRecipeIndex(random_catalog(300, seed=1))
+    for query in ["mocha", "fudge berry", "pecan pecan honey", "mocah", "cake", "zest malt cocoa"]:
+        for k in (1, 5, 20):
+            got = [key for key, _, _ in index.search(query, k)]
+            assert got == brute_force(index, query, k), (query, k)
+    assert index.search("mocha", 0) == []
+
+def test_add_remove_and_compaction():
+    """Test replacing and removing recipes, including compaction"""
+    recipes = random_catalog(50, seed=2)
+    index = RankedRecipeIndex(recipes)
+    index.add("cake_0", {"name": "Saffron Cake", "ingredients": [], "instructions": []})
+    assert index.search("saffron")[0][0] == "cake_0"
+    assert index.search("safron")[0][0] == "cake_0"
+    for n in range(40):
+        index.remove(f"cake_{n}")
+    index.remove("missing")
+    assert len(index) == 10
+    assert index.search("saffron") == []
+    assert "saffron" not in index._postings
+    results = index.search("mocha fudge berry spice pecan cocoa cream zest honey malt", 50)
+    assert {key for key, _, _ in results} <= {f"cake_{n}" for n in range(40, 50)}
+    assert [key for key, _, _ in results] == brute_force(index, "mocha fudge berry spice pecan cocoa cream zest honey malt", 50)
+
+if __name__ == "__main__":
+    # Run tests manually if pytest is not available
+    test_functions = [
+        test_tokenize_and_edit_distance,
+        test_typo_tolerant_search,
+        test_ranking_prefers_name_and_frequency,
+        test_top_k_matches_brute_force,
+        test_add_remove_and_compaction
+    ]
+    
+    print("Running ranked search tests...")
+    for test_func in test_functions:
+        try:
+            test_func()
+            print(f"✓ {test_func.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test_func.__name__}: {e}")
+        except Exception as e:
+            print(f"✗ {test_func.__name__}: Unexpected error - {e}")
+    
+    print("Tests completed!")
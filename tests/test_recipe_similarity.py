@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test module for recipe_similarity.py
+Tests cached neighbor lists against brute force and incremental refresh
+"""
+
+import sys
+import os
+import random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+import recipe_similarity
+from chocolate_cake_recipes import (
+    CHOCOLATE_CAKE_RECIPES,
+    add_recipe,
+    remove_recipe,
+    similar_recipes
+)
+from recipe_similarity import RecipeSimilarityIndex
+
+ITEMS = ["flour", "sugar", "cocoa powder", "butter", "eggs", "buttermilk", "vanilla extract",
+         "baking soda", "salt", "espresso", "pecans", "coconut", "cream cheese", "oil", "honey"]
+
+def random_catalog(size, seed):
+    """Build a catalog of recipes drawing ingredients from a small shared pool"""
+    rng = random.Random(seed)
+    return {f"cake_{n}": {
+        "name": f"Cake {n}",
+        "ingredients": [f"{rng.randint(1, 3)} cups {item}"
+                        for item in rng.sample(ITEMS, rng.randint(3, 8))]
+    } for n in range(size)}
+
+def brute_force(index, recipe_key, k):
+    """Score one recipe against every other and return the top k (key, score)"""
+    scored = sorted((-index.similarity(recipe_key, other), index._ids[other], other)
+                    for other in index._ids if other != recipe_key)
+    return [(key, -negative) for negative, _, key in scored[:k]
+            if negative < 0]
+
+def neighbor_pairs(index, recipe_key):
+    """Return a recipe's cached neighbors as (key, score) pairs"""
+    return [(key, score) for key, _, score in index.neighbors(recipe_key)]
+
+def test_similar_recipes_on_builtin_catalog():
+    """Test neighbors of the built-in recipes share ingredients and are ranked"""
+    for key in CHOCOLATE_CAKE_RECIPES:
+        results = similar_recipes(key)
+        assert results and key not in [other for other, _, _ in results]
+        scores = [score for _, _, score in results]
+        assert scores == sorted(scores, reverse=True) and 0 < scores[0] <= 1
+        assert len(similar_recipes(key, 2)) <= 2
+    assert similar_recipes("no_such_cake") == []
+
+def test_small_catalog_is_exact():
+    """Test catalogs under EXACT_LIMIT match brute force for both metrics"""
+    recipes = random_catalog(200, seed=1)
+    for metric in ("jaccard", "cosine"):
+        index = RecipeSimilarityIndex(recipes, k=4, metric=metric)
+        for key in list(recipes)[:40]:
+            assert neighbor_pairs(index, key) == brute_force(index, key, 4)
+
+def test_sparse_features_score_like_sets():
+    """Test sorted feature id arrays give set-based Jaccard and cosine scores"""
+    recipes = random_catalog(60, seed=6)
+    items = {key: {text.split(" cups ")[1] for text in recipe["ingredients"]}
+             for key, recipe in recipes.items()}
+    jaccard = RecipeSimilarityIndex(recipes)
+    cosine = RecipeSimilarityIndex(recipes, metric="cosine")
+    for features in jaccard._features.values():
+        assert list(features) == sorted(set(features))
+    keys = list(recipes)
+    for first, second in zip(keys, keys[1:] + keys[:1]):
+        shared = len(items[first] & items[second])
+        assert jaccard.similarity(first, second) == pytest.approx(
+            shared / len(items[first] | items[second]))
+        assert cosine.similarity(first, second) == pytest.approx(
+            shared / (len(items[first]) * len(items[second])) ** 0.5)
+
+def test_lsh_candidates_find_close_matches():
+    """Test the banded path finds near-duplicates and never overstates scores"""
+    recipes = random_catalog(300, seed=2)
+    for n in range(0, 300, 3):
+        recipes[f"copy_{n}"] = dict(recipes[f"cake_{n}"], name=f"Copy {n}")
+    original = recipe_similarity.EXACT_LIMIT
+    recipe_similarity.EXACT_LIMIT = 0
+    try:
+        index = RecipeSimilarityIndex(recipes, k=3)
+        for n in range(0, 300, 3):
+            # Other cakes may draw the same ingredients, so only the score is fixed
+            assert neighbor_pairs(index, f"copy_{n}")[0][1] == 1.0
+        for key in recipes:
+            for other, score in neighbor_pairs(index, key):
+                assert score == index.similarity(key, other)
+    finally:
+        recipe_similarity.EXACT_LIMIT = original
+
+def test_incremental_updates_match_fresh_build():
+    """Test add, replace and remove leave the same lists as a rebuild"""
+    recipes = random_catalog(120, seed=3)
+    index = RecipeSimilarityIndex(dict(list(recipes.items())[:80]), k=3)
+    for key, recipe in list(recipes.items())[80:]:
+        index.add(key, recipe)
+    for n in range(0, 120, 7):
+        recipes[f"cake_{n}"] = random_catalog(1, seed=100 + n)["cake_0"]
+        index.add(f"cake_{n}", recipes[f"cake_{n}"])
+    for n in range(1, 120, 11):
+        del recipes[f"cake_{n}"]
+        index.remove(f"cake_{n}")
+    index.remove("no_such_cake")
+    fresh = RecipeSimilarityIndex(recipes, k=3)
+    assert len(index) == len(fresh) == len(recipes)
+    for key in recipes:
+        # Ids differ between the two indexes, so compare scores only
+        assert ([score for _, score in neighbor_pairs(index, key)]
+                == [score for _, score in neighbor_pairs(fresh, key)])
+        assert neighbor_pairs(index, key) == brute_force(index, key, 3)
+
+def test_add_and_remove_recipe_update_neighbors():
+    """Test the module-level index follows add_recipe and remove_recipe"""
+    source = next(iter(CHOCOLATE_CAKE_RECIPES))
+    similar_recipes(source)
+    add_recipe("twin_cake", dict(CHOCOLATE_CAKE_RECIPES[source], name="Twin Cake"))
+    try:
+        assert similar_recipes(source, 1) == [("twin_cake", "Twin Cake", 1.0)]
+    finally:
+        remove_recipe("twin_cake")
+    assert "twin_cake" not in [key for key, _, _ in similar_recipes(source)]
+
+def test_rejects_bad_arguments():
+    """Test unknown metrics and uneven bands raise ValueError"""
+    with pytest.raises(ValueError):
+        RecipeSimilarityIndex(metric="euclidean")
+    with pytest.raises(ValueError):
+        RecipeSimilarityIndex(num_hashes=64, bands=10)
+
+if __name__ == "__main__":
+    # Run tests manually if pytest is not available
+    test_functions = [
+        test_similar_recipes_on_builtin_catalog,
+        test_small_catalog_is_exact,
+        test_sparse_features_score_like_sets,
+        test_lsh_candidates_find_close_matches,
+        test_incremental_updates_match_fresh_build,
+        test_add_and_remove_recipe_update_neighbors,
+        test_rejects_bad_arguments
+    ]
+
+    print("Running recipe similarity tests...")
+    for test_func in test_functions:
+        try:
+            test_func()
+            print(f"✓ {test_func.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test_func.__name__}: {e}")
+        except Exception as e:
+            print(f"✗ {test_func.__name__}: Unexpected error - {e}")
+
+    print("Tests completed!")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test module for shopping_list.py
+Tests recipe scaling, unit normalization and shopping list aggregation
+"""
+
+import sys
+import os
+from fractions import Fraction
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from chocolate_cake_recipes import (
+    CHOCOLATE_CAKE_RECIPES,
+    add_recipe,
+    build_shopping_list,
+    scale_recipe
+)
+from ingredient_store import Ingredient, IngredientStore, format_ingredient
+from shopping_list import ShoppingListEngine, from_base_unit, to_base_unit
+
+def test_unit_normalization():
+    """Test converting to and from base units"""
+    assert to_base_unit(Fraction(1, 2), "cup") == (24, "teaspoon")
+    assert to_base_unit(2, "tablespoon") == (6, "teaspoon")
+    assert to_base_unit(3, None) == (3, None)
+    assert from_base_unit(Fraction(84), "teaspoon") == (Fraction(7, 4), "cup")
+    assert from_base_unit(Fraction(6), "teaspoon") == (2, "tablespoon")
+    assert from_base_unit(Fraction(1, 2), "teaspoon") == (Fraction(1, 2), "teaspoon")
+    assert from_base_unit(Fraction(32), "oz") == (2, "lb")
+
+def test_scale_recipe():
+    """Test scaling a single recipe to a new number of servings"""
+    scaled = scale_recipe("classic_chocolate", 16)
+    assert scaled[0] == Ingredient(4, "cup", "all-purpose flour", None)
+    assert format_ingredient(scaled[2]) == "1 1/2 cups unsweetened cocoa powder"
+    assert format_ingredient(scale_recipe("classic_chocolate", 4)[6]) == "1 large egg"
+    assert format_ingredient(scale_recipe("classic_chocolate", 12)[6]) == "3 large eggs"
+    assert format_ingredient(Ingredient(1, None, "egg yolks", "beaten")) == "1 egg yolk, beaten"
+    assert format_ingredient(Ingredient(2, None, "cherry", None)) == "2 cherries"
+    assert format_ingredient(Ingredient(None, None, "eggs to glaze", None)) == "eggs to glaze"
+    assert format_ingredient(scale_recipe("classic_chocolate", 2)[6]) == "1/2 large egg"
+    assert scale_recipe("missing", 4) is None
+
+def test_shopping_list_aggregates_across_recipes():
+    """Test that identical items are summed in normalized units"""
+    shopping = build_shopping_list([
+        ("classic_chocolate", 16),
+        ("vegan_chocolate", 4),
+        ("german_chocolate", 6)
+    ])
+    by_item = {ingredient.item: ingredient for ingredient in shopping}
+    # 2 tsp * 2 + 1 tsp / 2 + 1 tsp / 2 = 5 tsp
+    assert by_item["baking soda"] == Ingredient(Fraction(5, 3), "tablespoon", "baking soda", None)
+    # 2 cups * 2 + 1 1/2 cups / 2 = 4 3/4 cups
+    assert by_item["all-purpose flour"] == Ingredient(Fraction(19, 4), "cup", "all-purpose flour", None)
+    assert [ingredient.item for ingredient in shopping] == sorted(by_item)
+
+def test_repeated_requests_and_missing_quantities():
+    """Test merging repeated requests and items without quantities"""
+    recipes = {"plain": {"name": "Plain Cake", "servings": 4,
+                         "ingredients": ["1 cup flour", "salt to taste", "1 tablespoon flour"]}}
+    engine = ShoppingListEngine(recipes, IngredientStore(recipes))
+    shopping = engine.shopping_list([("plain", 4), ("plain", 8)])
+    assert shopping == [
+        Ingredient(Fraction(3, 1) + Fraction(3, 16), "cup", "flour", None),
+        Ingredient(None, None, "salt to taste", None)
+    ]
+    assert engine.shopping_list([]) == []
+
+def test_non_integer_servings():
+    """Test scaling and shopping for fractional servings"""
+    # classic_chocolate serves 8 with 2 cups of flour
+    assert scale_recipe("classic_chocolate", 2.5)[0] == Ingredient(Fraction(5, 8), "cup", "all-purpose flour", None)
+    assert scale_recipe("classic_chocolate", Fraction(4, 3))[0].quantity == Fraction(1, 3)
+    shopping = build_shopping_list([("classic_chocolate", 4.0), ("classic_chocolate", 0.5)])
+    by_item = {ingredient.item: ingredient for ingredient in shopping}
+    assert by_item["all-purpose flour"] == Ingredient(Fraction(9, 8), "cup", "all-purpose flour", None)
+
+def test_add_recipe_refreshes_scaling():
+    """Test that replacing a recipe is reflected in later scaling"""
+    original = CHOCOLATE_CAKE_RECIPES["vegan_chocolate"]
+    build_shopping_list([("vegan_chocolate", 8)])
+    try:
+        add_recipe("vegan_chocolate", dict(original, ingredients=["2 cups oat flour"]))
+        assert build_shopping_list([("vegan_chocolate", 16)]) == [Ingredient(4, "cup", "oat flour", None)]
+    finally:
+        add_recipe("vegan_chocolate", original)
+    assert len(build_shopping_list([("vegan_chocolate", 8)])) == len(original["ingredients"])
+
+if __name__ == "__main__":
+    # Run tests manually if pytest is not available
+    test_functions = [
+        test_unit_normalization,
+        test_scale_recipe,
+        test_shopping_list_aggregates_across_recipes,
+        test_repeated_requests_and_missing_quantities,
+        test_non_integer_servings,
+        test_add_recipe_refreshes_scaling
+    ]
+    
+    print("Running shopping list tests...")
+    for test_func in test_functions:
+        try:
+            test_func()
+            print(f"✓ {test_func.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test_func.__name__}: {e}")
+        except Exception as e:
+            print(f"✗ {test_func.__name__}: Unexpected error - {e}")
+    
+    print("Tests completed!")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test module for temperature_converter.py
+Tests scalar and batch conversions and the streaming mode
+"""
+
+import sys
+import os
+import io
+import math
+import random
+from array import array
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import temperature_converter
+from temperature_converter import (
+    TRANSFORMS,
+    celsius_to_fahrenheit,
+    celsius_to_fahrenheit_batch,
+    convert,
+    convert_batch,
+    fahrenheit_to_celsius,
+    fahrenheit_to_celsius_batch,
+    register_scale,
+    run_stream,
+    stream_binary,
+    stream_text
+)
+
+def test_scalar_conversions():
+    """Test the single-value conversions"""
+    assert celsius_to_fahrenheit(100) == 212
+    assert fahrenheit_to_celsius(32) == 0
+    assert celsius_to_fahrenheit(-40) == -40
+
+def test_celsius_fahrenheit_agree_on_every_path():
+    """Test scalar, generic and batch C<->F results agree bit for bit, within an ulp of the formulas"""
+    rng = random.Random(9)
+    readings = [rng.uniform(-500.0, 500.0) for _ in range(2000)]
+    fahrenheit = [celsius_to_fahrenheit(value) for value in readings]
+    celsius = [fahrenheit_to_celsius(value) for value in readings]
+    assert [convert(value, 'c', 'f') for value in readings] == fahrenheit
+    assert list(celsius_to_fahrenheit_batch(array('d', readings))) == fahrenheit
+    assert [convert(value, 'F', 'C') for value in readings] == celsius
+    assert list(convert_batch(array('d', readings), 'F', 'C')) == celsius
+    for value, result in zip(readings, fahrenheit):
+        assert math.isclose(result, (value * 9/5) + 32, rel_tol=1e-15, abs_tol=1e-13)
+    for value, result in zip(readings, celsius):
+        assert math.isclose(result, (value - 32) * 5/9, rel_tol=1e-15, abs_tol=1e-13)
+
+def test_convert_between_all_scales():
+    """Test chained conversions through the precomposed transforms"""
+    assert convert(0, 'C', 'K') == 273.15
+    assert convert(0, 'K', 'R') == 0
+    assert abs(convert(491.67, 'R', 'C')) < 1e-9
+    assert abs(convert(373.15, 'k', 'f') - 212) < 1e-9
+    assert TRANSFORMS[('C', 'F')] == (1.8, 32.0)
+    for source, target in TRANSFORMS:
+        assert abs(convert(convert(25.0, source, target), target, source) - 25.0) < 1e-9
+
+def test_convert_unknown_scale():
+    """Test that unknown scales are reported by name"""
+    try:
+        convert(1.0, 'C', 'X')
+    except ValueError as error:
+        assert "X" in str(error)
+    else:
+        raise AssertionError("expected ValueError")
+
+def test_register_scale(monkeypatch):
+    """Test that a new scale can convert to and from every existing one"""
+    monkeypatch.setattr(temperature_converter, "SCALES", dict(temperature_converter.SCALES))
+    monkeypatch.setattr(temperature_converter, "TRANSFORMS", dict(TRANSFORMS))
+    register_scale('re', 'Reaumur', 1.25, 273.15)
+    assert convert(80, 'RE', 'C') == 100
+    assert abs(convert(212, 'F', 'Re') - 80) < 1e-9
+    assert list(convert_batch(array('d', [0.0, 80.0]), 'Re', 'K')) == [273.15, 373.15]
+
+def test_batch_returns_new_array():
+    """Test that batch conversion leaves the input alone by default"""
+    values = array('d', [0.0, 100.0, -40.0])
+    result = celsius_to_fahrenheit_batch(values)
+    assert list(result) == [32.0, 212.0, -40.0]
+    assert list(values) == [0.0, 100.0, -40.0]
+    assert result.typecode == 'd'
+
+def test_batch_in_place_over_memoryview(monkeypatch):
+    """Test in-place conversion through a memoryview across several batches"""
+    monkeypatch.setattr(temperature_converter, "BATCH_SIZE", 2)
+    raw = bytearray(array('d', [32.0, 212.0, 98.6, -40.0, 50.0]).tobytes())
+    view = memoryview(raw).cast('d')
+    assert fahrenheit_to_celsius_batch(view, out=view) is view
+    result = array('d', bytes(raw))
+    expected = [fahrenheit_to_celsius(value) for value in [32.0, 212.0, 98.6, -40.0, 50.0]]
+    assert list(result) == expected
+
+def test_batch_out_length_mismatch():
+    """Test that an output buffer of the wrong size is rejected"""
+    try:
+        celsius_to_fahrenheit_batch(array('d', [1.0, 2.0]), out=array('d', [0.0]))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+def test_batch_numpy_in_place():
+    """Test the NumPy path when NumPy is installed"""
+    import pytest
+    numpy = pytest.importorskip("numpy")
+    values = numpy.array([0.0, 100.0])
+    assert celsius_to_fahrenheit_batch(values, out=values) is values
+    assert values.tolist() == [32.0, 212.0]
+    readings = [random.Random(9).uniform(-500.0, 500.0) for _ in range(2000)]
+    assert (fahrenheit_to_celsius_batch(numpy.array(readings)).tolist()
+            == [fahrenheit_to_celsius(value) for value in readings])
+
+def test_stream_text_chunks(monkeypatch):
+    """Test that readings split across chunks are converted once each"""
+    monkeypatch.setattr(temperature_converter, "CHUNK_BYTES", 4)
+    sink = io.StringIO()
+    count = stream_text(io.StringIO("0\n100\n\n-40\n37"), sink,
+                        celsius_to_fahrenheit_batch, precision=1)
+    assert count == 4
+    assert sink.getvalue() == "32.0\n212.0\n-40.0\n98.6\n"
+
+def test_stream_binary_chunks(monkeypatch):
+    """Test binary streaming when chunks split float64 values"""
+    monkeypatch.setattr(temperature_converter, "CHUNK_BYTES", 12)
+    readings = array('d', [float(value) for value in range(-50, 50)])
+    sink = io.BytesIO()
+    count = stream_binary(io.BytesIO(readings.tobytes()), sink,
+                          celsius_to_fahrenheit_batch)
+    assert count == len(readings)
+    result = array('d', sink.getvalue())
+    assert list(result) == [celsius_to_fahrenheit(value) for value in readings]
+
+def test_stream_binary_rejects_partial_reading():
+    """Test that truncated binary input is reported"""
+    try:
+        stream_binary(io.BytesIO(b"\0" * 12), io.BytesIO(), celsius_to_fahrenheit_batch)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+def test_run_stream_reports_throughput(monkeypatch, capsys):
+    """Test the command-line streaming mode"""
+    monkeypatch.setattr(sys, "stdin", io.StringIO("212\n32\n"))
+    assert run_stream(["--from", "F", "--to", "c"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out == "100.00\n0.00\n"
+    assert "Converted 2 readings" in captured.err
+    assert "readings/s" in captured.err
+
+def test_run_stream_reports_bad_line(monkeypatch, capsys):
+    """Test that a non-numeric line stops the stream with its line number"""
+    monkeypatch.setattr(temperature_converter, "CHUNK_BYTES", 8)
+    monkeypatch.setattr(sys, "stdin", io.StringIO("212\n32\n\n50\nwarm\n14\n"))
+    assert run_stream(["--from", "F", "--to", "C"]) == 1
+    captured = capsys.readouterr()
+    assert captured.out == "100.00\n0.00\n"
+    assert captured.err == "Error: line 5: not a temperature reading: 'warm'\n"
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__]))
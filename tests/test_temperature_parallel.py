@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test module for temperature_parallel.py
+Tests record-aligned splitting and multi-process file conversion
+"""
+
+import sys
+import os
+import io
+from array import array
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import temperature_parallel
+from temperature_converter import celsius_to_fahrenheit_batch, stream_text
+from temperature_parallel import convert_files, split_ranges
+
+def test_split_ranges_text_ends_on_newlines(tmp_path):
+    """Test that text ranges cover the file and end after a newline"""
+    path = tmp_path / "readings.txt"
+    path.write_text("".join(f"{value}.5\n" for value in range(100)) + "7")
+    data = path.read_bytes()
+    ranges = split_ranges(str(path), 50)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end] == b"\n"
+    assert len(ranges) > 1
+
+def test_split_ranges_binary(tmp_path):
+    """Test that binary ranges hold whole float64 readings"""
+    path = tmp_path / "readings.f64"
+    path.write_bytes(array('d', range(10)).tobytes())
+    assert split_ranges(str(path), 30, binary=True) == [(0, 24), (24, 48), (48, 72), (72, 80)]
+    path.write_bytes(b"\0" * 9)
+    try:
+        split_ranges(str(path), 30, binary=True)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+def test_convert_files_text(tmp_path, monkeypatch):
+    """Test that split text files are converted and joined in order"""
+    monkeypatch.setattr(temperature_parallel, "MIN_RANGE_BYTES", 64)
+    first = tmp_path / "first.txt"
+    first.write_text("".join(f"{value}\n" for value in range(-40, 60)))
+    empty = tmp_path / "empty.txt"
+    empty.write_text("")
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+
+    counts = convert_files([str(first), str(empty)], str(output_dir), 'C', 'F', workers=2)
+    assert counts == [100, 0]
+    expected = io.StringIO()
+    stream_text(io.StringIO(first.read_text()), expected, celsius_to_fahrenheit_batch)
+    assert (output_dir / "first.txt").read_text() == expected.getvalue()
+    assert (output_dir / "empty.txt").read_text() == ""
+    assert sorted(os.listdir(output_dir)) == ["empty.txt", "first.txt"]
+
+def test_convert_files_binary(tmp_path, monkeypatch):
+    """Test that binary ranges are converted in place in the output file"""
+    monkeypatch.setattr(temperature_parallel, "MIN_RANGE_BYTES", 64)
+    readings = array('d', [value / 4 for value in range(-400, 400)])
+    path = tmp_path / "readings.f64"
+    path.write_bytes(readings.tobytes())
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+
+    assert convert_files([str(path)], str(output_dir), 'C', 'K', binary=True, workers=3) == [800]
+    result = array('d', (output_dir / "readings.f64").read_bytes())
+    assert list(result) == [value + 273.15 for value in readings]
+
+def test_convert_files_refuses_to_overwrite_input(tmp_path):
+    """Test that inputs inside the output directory are rejected"""
+    path = tmp_path / "readings.txt"
+    path.write_text("1\n")
+    try:
+        convert_files([str(path)], str(tmp_path), 'C', 'F', workers=1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    assert path.read_text() == "1\n"
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__]))